@@ -0,0 +1,53 @@
+'''
+End to end latency of a root query with six independent fields that
+each wait on a slow backend, resolved in order and with
+``Schema(parallel=True)``.
+
+    python benchmarks/parallel_fields.py
+'''
+import time
+
+import graphene
+from graphene.core.pools import ThreadResolverPool
+
+FIELDS = 6
+LATENCY = 0.05
+
+
+def backend(name):
+    def resolver(self, args, info):
+        time.sleep(LATENCY)
+        return name
+    return resolver
+
+
+Query = type('Query', (graphene.ObjectType, ), {
+    'field{}'.format(i): graphene.String(resolver=backend(str(i)))
+    for i in range(FIELDS)
+})
+
+QUERY = '{ %s }' % ' '.join('field{}'.format(i) for i in range(FIELDS))
+
+
+def bench(name, schema, runs=10):
+    schema.execute(QUERY)
+    start = time.time()
+    for _ in range(runs):
+        result = schema.execute(QUERY)
+        assert not result.errors, result.errors
+    elapsed = (time.time() - start) / runs
+    print('{:>28} {:>10.1f} ms'.format(name, elapsed * 1000))
+    return elapsed
+
+
+def main():
+    sequential = bench('sequential', graphene.Schema(query=Query))
+    for max_concurrency in (2, 3, FIELDS):
+        schema = graphene.Schema(query=Query, parallel=True, max_concurrency=max_concurrency,
+                                 thread_pool=ThreadResolverPool(max_workers=FIELDS))
+        elapsed = bench('parallel, {} at a time'.format(max_concurrency), schema)
+        print('{:>28} {:>10.2f} x'.format('speedup', sequential / elapsed))
+
+
+if __name__ == '__main__':
+    main()
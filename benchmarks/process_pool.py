@@ -0,0 +1,91 @@
+'''
+Scaling of a CPU bound field across cores with ``run_in='process'``.
+
+Resolves ``score`` for a list of items inline, in a thread pool (which
+the GIL serializes) and in process pools of growing size, with and
+without batching of the calls.
+
+    python benchmarks/process_pool.py
+'''
+import multiprocessing
+import time
+
+import graphene
+from graphene.core.pools import ProcessResolverPool
+
+ITEMS = 64
+ROUNDS = 200000
+
+
+def score(seed):
+    value = seed
+    for i in range(ROUNDS):
+        value = (value * 1103515245 + 12345) % 2147483648
+    return value
+
+
+class SyncItem(graphene.ObjectType):
+    score = graphene.Int(run_in='sync')
+
+    def resolve_score(self, args, info):
+        return score(self.seed)
+
+
+class ThreadItem(graphene.ObjectType):
+    score = graphene.Int(run_in='thread')
+
+    def resolve_score(self, args, info):
+        return score(self.seed)
+
+
+class ProcessItem(graphene.ObjectType):
+    score = graphene.Int(run_in='process')
+
+    def resolve_score(self, args, info):
+        return score(self.seed)
+
+
+class Seed(object):
+
+    def __init__(self, seed):
+        self.seed = seed
+
+
+def build_schema(item_type, **kwargs):
+    class Query(graphene.ObjectType):
+        items = graphene.Field(item_type.List())
+
+        def resolve_items(self, args, info):
+            return [Seed(i) for i in range(ITEMS)]
+
+    return graphene.Schema(query=Query, **kwargs)
+
+
+def bench(name, schema):
+    start = time.time()
+    result = schema.execute('{ items { score } }')
+    elapsed = time.time() - start
+    assert not result.errors, result.errors
+    assert len(result.data['items']) == ITEMS
+    print('{:>32} {:>10.3f} s'.format(name, elapsed))
+    return elapsed
+
+
+def main():
+    baseline = bench('inline', build_schema(SyncItem))
+    bench('thread pool', build_schema(ThreadItem))
+    workers = 1
+    while workers <= multiprocessing.cpu_count():
+        for batch_size in (1, 8):
+            pool = ProcessResolverPool(max_workers=workers, batch_size=batch_size)
+            schema = build_schema(ProcessItem, process_pool=pool)
+            # Start the workers before timing
+            pool.executor.submit(score, 0).result()
+            elapsed = bench('{} processes, batch size {}'.format(workers, batch_size), schema)
+            print('{:>32} {:>10.2f} x'.format('speedup', baseline / elapsed))
+            pool.shutdown()
+        workers *= 2
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,54 @@
+'''
+Per element cost of serializing ``List(Float)`` results.
+
+Compares a field resolving plain python floats, a list of NumPy scalars
+(what the executor iterated before typed buffers were converted in bulk),
+a NumPy array and an ``array.array``.
+
+    python benchmarks/scalar_lists.py
+'''
+import array
+import time
+
+import graphene
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+def build_schema(values):
+    class Query(graphene.ObjectType):
+        values = graphene.List(graphene.Float())
+
+        def resolve_values(self, args, info):
+            return values
+
+    return graphene.Schema(query=Query)
+
+
+def bench(name, values, size):
+    schema = build_schema(values)
+    start = time.time()
+    result = schema.execute('{ values }')
+    elapsed = time.time() - start
+    assert not result.errors, result.errors
+    assert len(result.data['values']) == size
+    print('{:>10} {:>24} {:>10.3f} s {:>10.1f} ns/element'.format(
+        size, name, elapsed, elapsed / size * 1e9))
+
+
+def main():
+    for size in (10 ** 5, 10 ** 6):
+        floats = [i / 3.0 for i in range(size)]
+        bench('list of floats', floats, size)
+        bench('array.array', array.array('d', floats), size)
+        if numpy is not None:
+            ndarray = numpy.array(floats)
+            bench('list of numpy scalars', list(ndarray), size)
+            bench('numpy.ndarray', ndarray, size)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,62 @@
+'''
+Time and peak memory of encoding a big response with ``json.dumps``
+and with the streaming ``ResponseEncoder`` of the schema.
+
+    python benchmarks/streaming_encoder.py
+'''
+import json
+import time
+import tracemalloc
+
+from graphql import parse
+
+import graphene
+
+ROWS = 20000
+
+
+class Row(graphene.ObjectType):
+    id = graphene.ID()
+    name = graphene.String()
+    score = graphene.Float()
+    rank = graphene.Int()
+    active = graphene.Boolean()
+
+
+class Query(graphene.ObjectType):
+    rows = graphene.List(Row)
+
+    def resolve_rows(self, args, info):
+        return [Row(id=i, name='row {}'.format(i), score=i / 3.0, rank=i, active=i % 2 == 0) for i in range(ROWS)]
+
+
+QUERY = '{ rows { id name score rank active } }'
+
+
+def bench(name, encode):
+    schema = graphene.Schema(query=Query)
+    response = {'data': schema.execute(QUERY).data}
+    tracemalloc.start()
+    start = time.time()
+    size = encode(schema, response)
+    elapsed = time.time() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    print('{:>10} {:>10.1f} ms {:>10.1f} MB peak {:>10} bytes'.format(name, elapsed * 1000, peak / 1e6, size))
+
+
+def dumps(schema, response):
+    return len(json.dumps(response, separators=(',', ':')))
+
+
+def stream(schema, response):
+    return sum(len(chunk) for chunk in schema.response_encoder.iterencode(response, parse(QUERY)))
+
+
+def main():
+    bench('dumps', dumps)
+    bench('stream', stream)
+
+
+if __name__ == '__main__':
+    main()
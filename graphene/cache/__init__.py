@@ -0,0 +1,7 @@
+from .backends import BaseCache, LRUCache
+from .coalescing import OperationCoalescer
+from .fields import CacheStats, FieldCache
+from .responses import CacheControl, ResponseCache
+
+__all__ = ['BaseCache', 'LRUCache', 'CacheStats', 'FieldCache', 'CacheControl',
+           'ResponseCache', 'OperationCoalescer']
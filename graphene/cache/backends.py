@@ -0,0 +1,68 @@
+import time
+from collections import OrderedDict
+from threading import Lock
+
+
+class BaseCache(object):
+    '''
+    Interface of the stores used by the caches of graphene.
+
+    Keys are strings, so external stores (memcached, redis...) can be
+    plugged in by implementing ``get``, ``set``, ``delete`` and ``clear``.
+    A ``ttl`` of None means the value does not expire.
+    '''
+
+    def get(self, key, default=None):
+        raise NotImplementedError('get is not implemented in {}'.format(self.__class__.__name__))
+
+    def set(self, key, value, ttl=None):
+        raise NotImplementedError('set is not implemented in {}'.format(self.__class__.__name__))
+
+    def delete(self, key):
+        raise NotImplementedError('delete is not implemented in {}'.format(self.__class__.__name__))
+
+    def clear(self):
+        raise NotImplementedError('clear is not implemented in {}'.format(self.__class__.__name__))
+
+
+class LRUCache(BaseCache):
+    '''
+    In process store that keeps at most ``max_size`` values, dropping the
+    least recently used ones first. Expired values are dropped when read.
+    '''
+
+    def __init__(self, max_size=1024, timer=time.time):
+        self.max_size = max_size
+        self.timer = timer
+        self._data = OrderedDict()
+        self._lock = Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            try:
+                expires, value = self._data.pop(key)
+            except KeyError:
+                return default
+            if expires is not None and expires <= self.timer():
+                return default
+            self._data[key] = (expires, value)
+            return value
+
+    def set(self, key, value, ttl=None):
+        expires = None if ttl is None else self.timer() + ttl
+        with self._lock:
+            self._data.pop(key, None)
+            self._data[key] = (expires, value)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
@@ -0,0 +1,129 @@
+import hashlib
+from threading import Event, Lock
+
+from graphql.utils.get_operation_ast import get_operation_ast
+from promise import Promise, is_thenable
+
+from .fields import freeze
+from .responses import get_document_hash, is_authenticated
+
+try:
+    from threading import get_ident
+except ImportError:
+    from thread import get_ident
+
+
+class InFlight(object):
+
+    def __init__(self):
+        self.thread = get_ident()
+        self.event = Event()
+        self.done = False
+        self.result = None
+        self.error = None
+        self.callbacks = []
+
+
+class OperationCoalescer(object):
+    '''
+    Lets identical query operations that run at the same time share one
+    execution: the first one is executed and the others wait for its
+    result, blocking the thread or, with ``return_promise``, through a
+    promise that does not block the event loop.
+
+    Operations are identical when the document, operation name,
+    variables and ``scope(context)`` are. Mutations, subscriptions and
+    contexts for which ``bypass(context)`` is true are always executed.
+    By default only the operations of anonymous users are coalesced,
+    pass ``bypass=None`` and a ``scope`` (the user, for example) to
+    coalesce the others.
+    '''
+
+    def __init__(self, scope=None, bypass=is_authenticated):
+        self.scope = scope
+        self.bypass = bypass
+        self.executed = 0
+        self.collapsed = 0
+        self._calls = {}
+        self._lock = Lock()
+
+    @property
+    def in_flight(self):
+        return len(self._calls)
+
+    def get_key(self, document_ast, operation_name, variable_values, context_value):
+        scope = self.scope(context_value) if self.scope else None
+        key = repr((operation_name, freeze(variable_values or {}), scope))
+        return get_document_hash(document_ast), hashlib.sha1(key.encode('utf-8')).hexdigest()
+
+    def execute(self, document_ast, operation_name, variable_values, context_value,
+                execute, return_promise=False):
+        operation = get_operation_ast(document_ast, operation_name)
+        if not operation or operation.operation != 'query' or (self.bypass and self.bypass(context_value)):
+            return execute()
+        key = self.get_key(document_ast, operation_name, variable_values, context_value)
+        with self._lock:
+            call = self._calls.get(key)
+            if call is None:
+                call = self._calls[key] = InFlight()
+                self.executed += 1
+                leader = True
+            elif not return_promise and call.thread == get_ident():
+                # Waiting would block the thread that has to finish the call
+                call = None
+            else:
+                self.collapsed += 1
+                leader = False
+        if call is None:
+            return execute()
+        if leader:
+            return self.lead(key, call, execute)
+        return self.follow(call, return_promise)
+
+    def lead(self, key, call, execute):
+        try:
+            result = execute()
+        except Exception as e:
+            self.finish(key, call, error=e)
+            raise
+        if is_thenable(result):
+            result = Promise.resolve(result)
+            result.then(
+                lambda resolved: self.finish(key, call, resolved),
+                lambda error: self.finish(key, call, error=error)
+            )
+            return result
+        self.finish(key, call, result)
+        return result
+
+    def finish(self, key, call, result=None, error=None):
+        with self._lock:
+            if self._calls.get(key) is call:
+                del self._calls[key]
+            call.result = result
+            call.error = error
+            call.done = True
+            callbacks, call.callbacks = call.callbacks, []
+        call.event.set()
+        for resolve, reject in callbacks:
+            if error is not None:
+                reject(error)
+            else:
+                resolve(result)
+
+    def follow(self, call, return_promise):
+        if return_promise:
+            def executor(resolve, reject):
+                with self._lock:
+                    if not call.done:
+                        call.callbacks.append((resolve, reject))
+                        return
+                if call.error is not None:
+                    reject(call.error)
+                else:
+                    resolve(call.result)
+            return Promise(executor)
+        call.event.wait()
+        if call.error is not None:
+            raise call.error
+        return call.result
@@ -0,0 +1,148 @@
+import hashlib
+from collections import defaultdict
+from functools import wraps
+
+import six
+from promise import Promise, is_thenable
+
+from ..core.classtypes.objecttype import ObjectType
+from .backends import LRUCache
+
+NOT_CACHED = object()
+
+
+class CacheStats(object):
+
+    def __init__(self, hits=0, misses=0):
+        self.hits = hits
+        self.misses = misses
+
+    def __repr__(self):
+        return '<CacheStats hits={} misses={}>'.format(self.hits, self.misses)
+
+
+def freeze(value):
+    if isinstance(value, dict) or hasattr(value, 'items'):
+        return tuple(sorted((k, freeze(v)) for k, v in value.items()))
+    if isinstance(value, (list, tuple)):
+        return tuple(freeze(v) for v in value)
+    return value
+
+
+def get_root_key(root, info):
+    '''
+    Identity of the object a field is resolved on: None for the root
+    types, the class name and id of objects that have an id and
+    NOT_CACHED for anything else.
+    '''
+    schema = info.schema
+    if info.parent_type in (schema.get_query_type(), schema.get_mutation_type(),
+                            schema.get_subscription_type()):
+        return None
+    if isinstance(root, ObjectType) and root._root is not None:
+        root = root._root
+    id = getattr(root, 'id', None)
+    if id is None or callable(id):
+        return NOT_CACHED
+    return root.__class__.__name__, id
+
+
+class FieldCache(object):
+    '''
+    Caches the results of the fields with a ``cache_ttl``.
+
+    The results are stored in ``backend`` (an in process LRUCache by
+    default) under a key made of the field, the object it is resolved
+    on, its arguments and its ``cache_scope``, if any. A ``cache_key``
+    function on the field replaces the object and arguments part.
+
+    ``invalidate(field)`` drops every result of a field by moving it to
+    a new generation of keys; generations are kept in the process, so
+    with a shared backend use ``delete`` to invalidate across processes.
+    '''
+
+    def __init__(self, backend=None, prefix='graphene'):
+        self.backend = backend if backend is not None else LRUCache()
+        self.prefix = prefix
+        self.stats = defaultdict(CacheStats)
+        self._generations = defaultdict(int)
+
+    def make_key(self, field_name, key):
+        digest = hashlib.sha1(repr(freeze(key)).encode('utf-8')).hexdigest()
+        return '{}:{}:{}:{}'.format(self.prefix, field_name, self._generations[field_name], digest)
+
+    def get_key(self, field, root, args, context, info):
+        if field.cache_key:
+            key = field.cache_key(root, args, context, info)
+        else:
+            root_key = get_root_key(root, info)
+            if root_key is NOT_CACHED:
+                return None
+            key = (root_key, args)
+        if key is None:
+            return None
+        if field.cache_scope:
+            key = (key, field.cache_scope(context))
+        return self.make_key(str(field), key)
+
+    def wrap(self, field, resolver):
+        field_name = str(field)
+        backend = self.backend
+
+        @wraps(resolver)
+        def cached_resolver(root, args, context, info):
+            key = self.get_key(field, root, args, context, info)
+            if key is None:
+                return resolver(root, args, context, info)
+            stats = self.stats[field_name]
+            value = backend.get(key, NOT_CACHED)
+            if value is not NOT_CACHED:
+                stats.hits += 1
+                return value
+            stats.misses += 1
+            value = resolver(root, args, context, info)
+            if is_thenable(value):
+                return Promise.resolve(value).then(lambda resolved: self.store(key, resolved, field.cache_ttl))
+            return self.store(key, value, field.cache_ttl)
+        return cached_resolver
+
+    def store(self, key, value, ttl):
+        self.backend.set(key, value, ttl)
+        return value
+
+    def invalidate(self, field):
+        '''
+        Invalidates all the cached results of the given Field (or
+        "ObjectType.field_name" string).
+        '''
+        if not isinstance(field, six.string_types):
+            field = str(field)
+        self._generations[field] += 1
+
+    def delete(self, field, root=None, args=None, context=None, key=None):
+        '''
+        Deletes the result of a field for the given object and arguments
+        (or cache_key result) from the backend.
+        '''
+        if key is None:
+            root_key = None
+            if root is not None:
+                if isinstance(root, ObjectType) and root._root is not None:
+                    root = root._root
+                root_key = (root.__class__.__name__, root.id)
+            key = (root_key, args or {})
+        if field.cache_scope:
+            key = (key, field.cache_scope(context))
+        self.backend.delete(self.make_key(str(field), key))
+
+    def clear(self):
+        self.backend.clear()
+        self.stats.clear()
+
+    @property
+    def hits(self):
+        return sum(stats.hits for stats in self.stats.values())
+
+    @property
+    def misses(self):
+        return sum(stats.misses for stats in self.stats.values())
@@ -0,0 +1,202 @@
+import copy
+import hashlib
+import time
+from threading import Lock, Thread
+
+from graphql.execution.base import get_field_def
+from graphql.language import ast
+from graphql.language.printer import print_ast
+from graphql.type.definition import get_named_type
+from graphql.utils.get_operation_ast import get_operation_ast
+from promise import Promise, is_thenable
+
+from ..utils.selections import get_fragments
+from .backends import LRUCache
+from .fields import freeze
+
+
+class CacheControl(object):
+
+    def __init__(self, max_age, private=False):
+        self.max_age = max_age
+        self.private = private
+
+    def __str__(self):
+        return '{}, max-age={}'.format('private' if self.private else 'public', self.max_age)
+
+    def __repr__(self):
+        return '<CacheControl {}>'.format(self)
+
+
+def set_cache_control(context_value, cache_control):
+    try:
+        # Exposed to the views through the context
+        context_value.cache_control = cache_control
+    except AttributeError:
+        pass
+
+
+def is_authenticated(context_value):
+    '''
+    Whether the context (like a Django request) has an authenticated user.
+    '''
+    user = getattr(context_value, 'user', None)
+    authenticated = getattr(user, 'is_authenticated', False)
+    if callable(authenticated):
+        # A method before Django 1.10
+        authenticated = authenticated()
+    return bool(authenticated)
+
+
+def get_document_hash(document_ast):
+    loc = document_ast.loc
+    if loc and loc.source:
+        body = loc.source.body
+    else:
+        body = print_ast(document_ast)
+    return hashlib.sha1(body.encode('utf-8')).hexdigest()
+
+
+class ResponseCache(object):
+    '''
+    Caches the whole result of query operations.
+
+    Results are keyed on the hash of the document, the operation name, the
+    variables and ``scope(context)``, and kept for the smallest
+    ``cache_ttl`` of the fields selected. Root fields and fields with a
+    selection that have no ``cache_ttl`` count as ``default_ttl``, other
+    fields don't limit the TTL. Operations with a TTL of 0, mutations,
+    subscriptions and contexts for which ``bypass(context)`` is true are
+    always executed. By default only the operations of anonymous users
+    are cached, pass ``bypass=None`` (and a ``scope``) to cache the others.
+
+    Once expired, a result is still served for ``stale_ttl`` seconds while
+    the operation is executed again in the background, with the context
+    returned by ``revalidation_context(context)`` (a shallow copy of the
+    context of the request by default).
+    '''
+
+    def __init__(self, backend=None, scope=None, bypass=is_authenticated, default_ttl=0,
+                 stale_ttl=0, revalidation_context=copy.copy, prefix='graphene-response', timer=time.time):
+        self.backend = backend if backend is not None else LRUCache()
+        self.scope = scope
+        self.bypass = bypass
+        self.revalidation_context = revalidation_context
+        self.default_ttl = default_ttl
+        self.stale_ttl = stale_ttl
+        self.prefix = prefix
+        self.timer = timer
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.bypassed = 0
+        self._max_ages = LRUCache(max_size=256)
+        self._revalidating = set()
+        self._lock = Lock()
+
+    def get_max_age(self, schema, document_ast, operation, document_hash):
+        key = (document_hash, operation.name and operation.name.value)
+        max_age = self._max_ages.get(key)
+        if max_age is None:
+            context = schema, get_fragments(document_ast)
+            root_type = schema.schema.get_query_type()
+            max_age = self.selection_set_max_age(context, root_type, operation.selection_set, None, True)
+            if max_age is None:
+                max_age = self.default_ttl
+            self._max_ages.set(key, max_age)
+        return max_age
+
+    def selection_set_max_age(self, context, parent_type, selection_set, max_age, root=False):
+        schema, fragments = context
+        for selection in selection_set.selections:
+            if isinstance(selection, ast.Field):
+                field_def = get_field_def(schema.schema, parent_type, selection.name.value)
+                if not field_def:
+                    continue
+                field = schema.get_field(parent_type, selection.name.value)
+                ttl = field.cache_ttl if field else None
+                if ttl is None and (root or selection.selection_set):
+                    ttl = self.default_ttl
+                if ttl is not None:
+                    max_age = ttl if max_age is None else min(max_age, ttl)
+                if selection.selection_set:
+                    max_age = self.selection_set_max_age(
+                        context, get_named_type(field_def.type), selection.selection_set, max_age)
+                continue
+            if isinstance(selection, ast.FragmentSpread):
+                selection = fragments[selection.name.value]
+            fragment_type = parent_type
+            if selection.type_condition:
+                fragment_type = schema.schema.get_type(selection.type_condition.name.value)
+            max_age = self.selection_set_max_age(context, fragment_type, selection.selection_set, max_age, root)
+        return max_age
+
+    def get_key(self, document_hash, operation_name, variable_values, scope):
+        key = repr((operation_name, freeze(variable_values or {}), scope))
+        return '{}:{}:{}'.format(self.prefix, document_hash, hashlib.sha1(key.encode('utf-8')).hexdigest())
+
+    def execute(self, schema, document_ast, operation_name, variable_values, context_value,
+                execute, return_promise=False):
+        '''
+        Returns the cached result of the operation, calling ``execute``
+        to get it when it is not cached.
+        '''
+        operation = get_operation_ast(document_ast, operation_name)
+        if not operation or operation.operation != 'query' or (self.bypass and self.bypass(context_value)):
+            self.bypassed += 1
+            return execute()
+        document_hash = get_document_hash(document_ast)
+        max_age = self.get_max_age(schema, document_ast, operation, document_hash)
+        if not max_age:
+            self.bypassed += 1
+            return execute()
+
+        scope = self.scope(context_value) if self.scope else None
+        cache_control = CacheControl(max_age, private=scope is not None)
+        key = self.get_key(document_hash, operation_name, variable_values, scope)
+        entry = self.backend.get(key)
+        if entry is not None:
+            result, expires = entry
+            if expires > self.timer():
+                self.hits += 1
+            else:
+                self.stale_hits += 1
+                self.revalidate(key, execute, max_age, context_value)
+            set_cache_control(context_value, cache_control)
+            return Promise.resolve(result) if return_promise else result
+
+        self.misses += 1
+        result = execute()
+        if is_thenable(result):
+            return result.then(lambda resolved: self.store(key, resolved, max_age, context_value, cache_control))
+        return self.store(key, result, max_age, context_value, cache_control)
+
+    def store(self, key, result, max_age, context_value=None, cache_control=None):
+        if not result.errors and not result.invalid:
+            self.backend.set(key, (result, self.timer() + max_age), max_age + self.stale_ttl)
+            set_cache_control(context_value, cache_control)
+        return result
+
+    def revalidate(self, key, execute, max_age, context_value=None):
+        with self._lock:
+            if key in self._revalidating:
+                return
+            self._revalidating.add(key)
+        # The request can be finished before the operation is executed
+        context_value = self.revalidation_context(context_value)
+
+        def run():
+            try:
+                result = execute(context_value=context_value)
+                if is_thenable(result):
+                    result = result.get()
+                self.store(key, result, max_age)
+            finally:
+                with self._lock:
+                    self._revalidating.discard(key)
+        self.start_revalidation(run)
+
+    def start_revalidation(self, run):
+        thread = Thread(target=run)
+        thread.daemon = True
+        thread.start()
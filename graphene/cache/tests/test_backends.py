@@ -0,0 +1,65 @@
+import pytest
+
+from ..backends import BaseCache, LRUCache
+
+
+class Timer(object):
+
+    def __init__(self):
+        self.now = 0
+
+    def __call__(self):
+        return self.now
+
+
+def test_base_cache_not_implemented():
+    with pytest.raises(NotImplementedError):
+        BaseCache().get('key')
+
+
+def test_lru_cache_get_set():
+    cache = LRUCache()
+    cache.set('key', 'value')
+    assert cache.get('key') == 'value'
+    assert cache.get('other') is None
+    assert cache.get('other', 1) == 1
+
+
+def test_lru_cache_caches_none():
+    cache = LRUCache()
+    cache.set('key', None)
+    assert cache.get('key', 1) is None
+
+
+def test_lru_cache_evicts_least_recently_used():
+    cache = LRUCache(max_size=2)
+    cache.set('a', 1)
+    cache.set('b', 2)
+    cache.get('a')
+    cache.set('c', 3)
+    assert cache.get('a') == 1
+    assert cache.get('b') is None
+    assert cache.get('c') == 3
+    assert len(cache) == 2
+
+
+def test_lru_cache_ttl():
+    timer = Timer()
+    cache = LRUCache(timer=timer)
+    cache.set('key', 'value', ttl=10)
+    timer.now = 9
+    assert cache.get('key') == 'value'
+    timer.now = 10
+    assert cache.get('key') is None
+    assert len(cache) == 0
+
+
+def test_lru_cache_delete_clear():
+    cache = LRUCache()
+    cache.set('a', 1)
+    cache.set('b', 2)
+    cache.delete('a')
+    cache.delete('missing')
+    assert cache.get('a') is None
+    cache.clear()
+    assert cache.get('b') is None
@@ -0,0 +1,160 @@
+import time
+from threading import Event, Thread
+
+from graphql import parse
+from promise import Promise
+
+import graphene
+
+from ..coalescing import OperationCoalescer
+
+
+def wait_for(condition, timeout=5):
+    start = time.time()
+    while not condition():
+        assert time.time() - start < timeout, 'Timed out'
+        time.sleep(0.001)
+
+
+calls = []
+release = Event()
+promises = []
+
+
+class Query(graphene.ObjectType):
+    slow = graphene.String(name=graphene.String())
+    deferred = graphene.String()
+    email = graphene.String()
+
+    def resolve_slow(self, args, info):
+        calls.append(args.get('name'))
+        release.wait(5)
+        return 'Hello {}'.format(args.get('name'))
+
+    def resolve_deferred(self, args, info):
+        calls.append('deferred')
+        promise = Promise()
+        promises.append(promise)
+        return promise
+
+    @graphene.with_context
+    def resolve_email(self, args, context, info):
+        calls.append('email')
+        release.wait(5)
+        return context.user.email
+
+
+class Mutation(graphene.ObjectType):
+    slow = graphene.String()
+
+    def resolve_slow(self, args, info):
+        calls.append('mutation')
+        return 'mutation'
+
+
+class User(object):
+    is_authenticated = True
+
+    def __init__(self, email):
+        self.email = email
+
+
+class Context(object):
+
+    def __init__(self, user):
+        self.user = user
+
+
+def setup_function(function):
+    del calls[:]
+    del promises[:]
+    release.clear()
+
+
+def make_schema(**kwargs):
+    return graphene.Schema(query=Query, mutation=Mutation, coalescer=OperationCoalescer(**kwargs))
+
+
+def run_in_threads(count, target):
+    results = [None] * count
+
+    def run(i):
+        results[i] = target(i)
+    threads = [Thread(target=run, args=(i, )) for i in range(count)]
+    for thread in threads:
+        thread.start()
+    return threads, results
+
+
+def test_coalescer_shares_concurrent_execution():
+    schema = make_schema()
+    coalescer = schema.coalescer
+    threads, results = run_in_threads(5, lambda i: schema.execute('{ slow(name: "a") }'))
+    wait_for(lambda: coalescer.collapsed == 4)
+    release.set()
+    for thread in threads:
+        thread.join()
+    assert calls == ['a']
+    assert all(result is results[0] for result in results)
+    assert results[0].data == {'slow': 'Hello a'}
+    assert (coalescer.executed, coalescer.in_flight) == (1, 0)
+
+
+def test_coalescer_keys_on_variables_and_scope():
+    schema = make_schema(scope=lambda context: context['user'])
+    coalescer = schema.coalescer
+    release.set()
+    query = 'query Slow($name: String) { slow(name: $name) }'
+    schema.execute(query, variable_values={'name': 'a'}, context_value={'user': 1})
+    schema.execute(query, variable_values={'name': 'b'}, context_value={'user': 1})
+    schema.execute(query, variable_values={'name': 'a'}, context_value={'user': 2})
+    assert calls == ['a', 'b', 'a']
+    assert coalescer.collapsed == 0
+
+
+def test_coalescer_bypasses_authenticated_users():
+    schema = make_schema()
+    coalescer = schema.coalescer
+    users = [Context(User('a@example.com')), Context(User('b@example.com'))]
+    threads, results = run_in_threads(2, lambda i: schema.execute('{ email }', context_value=users[i]))
+    wait_for(lambda: len(calls) == 2)
+    release.set()
+    for thread in threads:
+        thread.join()
+    assert [result.data for result in results] == [{'email': 'a@example.com'}, {'email': 'b@example.com'}]
+    assert (coalescer.executed, coalescer.collapsed) == (0, 0)
+
+
+def test_coalescer_bypasses_mutations():
+    schema = make_schema(bypass=lambda context: context == 'bypass')
+    coalescer = schema.coalescer
+    release.set()
+    schema.execute('mutation { slow }')
+    schema.execute('{ slow }', context_value='bypass')
+    assert calls == ['mutation', None]
+    assert coalescer.executed == 0
+
+
+def test_coalescer_promises():
+    schema = make_schema()
+    coalescer = schema.coalescer
+    first = schema.execute('{ deferred }', return_promise=True)
+    second = schema.execute('{ deferred }', return_promise=True)
+    assert calls == ['deferred']
+    assert coalescer.collapsed == 1
+    promises[0].do_resolve('done')
+    assert first.get().data == second.get().data == {'deferred': 'done'}
+    assert coalescer.in_flight == 0
+
+
+def test_coalescer_does_not_wait_in_leader_thread():
+    coalescer = OperationCoalescer()
+    document_ast = parse('{ slow }')
+
+    def inner():
+        return 'inner'
+
+    def outer():
+        return coalescer.execute(document_ast, None, None, None, inner)
+    assert coalescer.execute(document_ast, None, None, None, outer) == 'inner'
+    assert (coalescer.executed, coalescer.collapsed) == (1, 0)
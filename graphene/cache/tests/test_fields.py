@@ -0,0 +1,165 @@
+from promise import Promise
+
+import graphene
+from graphene import relay
+
+from ..backends import BaseCache
+from ..fields import FieldCache
+
+
+class DictCache(BaseCache):
+    '''Stand-in for an external store.'''
+
+    def __init__(self):
+        self.data = {}
+
+    def get(self, key, default=None):
+        return self.data.get(key, default)
+
+    def set(self, key, value, ttl=None):
+        assert isinstance(key, str)
+        self.data[key] = value
+
+    def delete(self, key):
+        self.data.pop(key, None)
+
+    def clear(self):
+        self.data.clear()
+
+
+def make_schema(field_cache=None):
+    calls = []
+
+    class Item(relay.Node):
+        name = graphene.String(cache_ttl=60)
+        price = graphene.Int(cache_ttl=60, cache_scope=lambda context: context['user'])
+
+        def resolve_name(self, args, info):
+            calls.append(('name', self.id))
+            return 'item {}'.format(self.id)
+
+        @graphene.with_context
+        def resolve_price(self, args, context, info):
+            calls.append(('price', self.id))
+            return int(self.id) * 10
+
+        @classmethod
+        def get_node(cls, id, info):
+            return cls(id=id)
+
+    class Query(graphene.ObjectType):
+        hello = graphene.String(name=graphene.String(), cache_ttl=60)
+        deferred = graphene.String(cache_ttl=60)
+        uncached = graphene.String()
+        item = graphene.Field(Item, id=graphene.String(), cache_ttl=60)
+
+        def resolve_hello(self, args, info):
+            calls.append(('hello', args.get('name')))
+            return 'Hello {}'.format(args.get('name'))
+
+        def resolve_deferred(self, args, info):
+            calls.append(('deferred', None))
+            return Promise.resolve('deferred')
+
+        def resolve_uncached(self, args, info):
+            calls.append(('uncached', None))
+            return 'uncached'
+
+        def resolve_item(self, args, info):
+            return Item(id=args['id'])
+
+    schema = graphene.Schema(query=Query, field_cache=field_cache)
+    return schema, Query, Item, calls
+
+
+def test_field_cache_reuses_results():
+    schema, Query, Item, calls = make_schema()
+    for _ in range(2):
+        result = schema.execute('{ a: hello(name: "a") b: hello(name: "b") uncached }')
+        assert not result.errors
+        assert result.data == {'a': 'Hello a', 'b': 'Hello b', 'uncached': 'uncached'}
+    assert calls == [('hello', 'a'), ('hello', 'b'), ('uncached', None), ('uncached', None)]
+    stats = schema.field_cache.stats['Query.hello']
+    assert (stats.hits, stats.misses) == (2, 2)
+
+
+def test_field_cache_thenable_results():
+    schema, Query, Item, calls = make_schema()
+    for _ in range(2):
+        result = schema.execute('{ deferred }')
+        assert result.data == {'deferred': 'deferred'}
+    assert calls == [('deferred', None)]
+
+
+def test_field_cache_keyed_by_object_and_scope():
+    schema, Query, Item, calls = make_schema()
+    query = '{ item(id: "%s") { name price } }'
+    schema.execute(query % 1, context_value={'user': 'a'})
+    schema.execute(query % 2, context_value={'user': 'a'})
+    result = schema.execute(query % 1, context_value={'user': 'b'})
+    assert result.data == {'item': {'name': 'item 1', 'price': 10}}
+    schema.execute(query % 1, context_value={'user': 'b'})
+    assert calls == [
+        ('name', '1'), ('price', '1'),
+        ('name', '2'), ('price', '2'),
+        ('price', '1'),
+    ]
+
+
+def test_field_cache_invalidate():
+    schema, Query, Item, calls = make_schema()
+    schema.execute('{ hello(name: "a") }')
+    schema.field_cache.invalidate(Query._meta.fields_map['hello'])
+    schema.execute('{ hello(name: "a") }')
+    schema.field_cache.invalidate('Query.hello')
+    schema.execute('{ hello(name: "a") }')
+    assert calls == [('hello', 'a')] * 3
+
+
+def test_field_cache_delete():
+    backend = DictCache()
+    schema, Query, Item, calls = make_schema(FieldCache(backend))
+    schema.execute('{ a: hello(name: "a") b: hello(name: "b") }')
+    assert len(backend.data) == 2
+    schema.field_cache.delete(Query._meta.fields_map['hello'], args={'name': 'a'})
+    schema.execute('{ a: hello(name: "a") b: hello(name: "b") }')
+    assert calls == [('hello', 'a'), ('hello', 'b'), ('hello', 'a')]
+
+    schema.execute('{ item(id: "1") { name } }')
+    schema.field_cache.delete(Item._meta.fields_map['name'], root=Item(id='1'))
+    schema.execute('{ item(id: "1") { name } }')
+    assert calls[-2:] == [('name', '1'), ('name', '1')]
+
+
+def test_field_cache_skips_objects_without_id():
+    class Pet(graphene.ObjectType):
+        name = graphene.String(cache_ttl=60)
+
+    class Query(graphene.ObjectType):
+        pet = graphene.Field(Pet)
+
+        def resolve_pet(self, args, info):
+            return Pet(name='Lassie')
+
+    schema = graphene.Schema(query=Query)
+    result = schema.execute('{ pet { name } }')
+    assert result.data == {'pet': {'name': 'Lassie'}}
+    assert not schema.field_cache.stats
+
+
+def test_field_cache_custom_key():
+    calls = []
+
+    class Query(graphene.ObjectType):
+        hello = graphene.String(name=graphene.String(), cache_ttl=60,
+                                cache_key=lambda root, args, context, info: 'hello')
+
+        def resolve_hello(self, args, info):
+            calls.append(args.get('name'))
+            return 'Hello {}'.format(args.get('name'))
+
+    schema = graphene.Schema(query=Query)
+    schema.execute('{ hello(name: "a") }')
+    result = schema.execute('{ hello(name: "b") }')
+    assert result.data == {'hello': 'Hello a'}
+    assert calls == ['a']
@@ -0,0 +1,247 @@
+import graphene
+
+from ..backends import LRUCache
+from ..fields import FieldCache
+from ..responses import CacheControl, ResponseCache
+
+
+class Timer(object):
+
+    def __init__(self):
+        self.now = 0
+
+    def __call__(self):
+        return self.now
+
+
+class Context(object):
+
+    def __init__(self, user=None):
+        self.user = user
+
+
+class User(object):
+
+    def __init__(self, is_authenticated):
+        self.is_authenticated = is_authenticated
+
+
+class OldUser(object):
+
+    def is_authenticated(self):
+        return True
+
+
+class SyncResponseCache(ResponseCache):
+
+    def start_revalidation(self, run):
+        run()
+
+
+calls = []
+
+
+class Pet(graphene.ObjectType):
+    name = graphene.String()
+
+
+class Query(graphene.ObjectType):
+    hello = graphene.String(name=graphene.String(), cache_ttl=60)
+    short = graphene.String(cache_ttl=10)
+    uncached = graphene.String()
+    pet = graphene.Field(Pet)
+    cached_pet = graphene.Field(Pet, cache_ttl=30)
+    fails = graphene.String(cache_ttl=60)
+    context = graphene.String(cache_ttl=60)
+
+    def resolve_hello(self, args, info):
+        calls.append('hello')
+        return 'Hello {}'.format(args.get('name'))
+
+    def resolve_short(self, args, info):
+        calls.append('short')
+        return 'short'
+
+    def resolve_uncached(self, args, info):
+        calls.append('uncached')
+        return 'uncached'
+
+    def resolve_pet(self, args, info):
+        calls.append('pet')
+        return Pet(name='Lassie')
+
+    def resolve_cached_pet(self, args, info):
+        calls.append('cached_pet')
+        return Pet(name='Lassie')
+
+    def resolve_fails(self, args, info):
+        calls.append('fails')
+        raise Exception('Fails')
+
+    @graphene.with_context
+    def resolve_context(self, args, context, info):
+        calls.append(context)
+        return str(context.user)
+
+
+class CreatePet(graphene.Mutation):
+    name = graphene.String()
+
+    class Input:
+        pass
+
+    @classmethod
+    def mutate(cls, instance, args, info):
+        calls.append('mutate')
+        return CreatePet(name='Lassie')
+
+
+class Mutation(graphene.ObjectType):
+    create_pet = graphene.Field(CreatePet)
+
+
+def setup_function(function):
+    del calls[:]
+
+
+def make_schema(**kwargs):
+    timer = kwargs.pop('timer', Timer())
+    cache_class = kwargs.pop('cache_class', ResponseCache)
+    response_cache = cache_class(timer=timer, **kwargs)
+    # Results of the fields are not kept, so only the response cache is tested
+    field_cache = FieldCache(LRUCache(max_size=0))
+    schema = graphene.Schema(query=Query, mutation=Mutation, field_cache=field_cache,
+                             response_cache=response_cache)
+    return schema, response_cache, timer
+
+
+def test_response_cache_hit():
+    schema, response_cache, timer = make_schema()
+    query = 'query Hello($name: String) { hello(name: $name) }'
+    for _ in range(2):
+        context = Context()
+        result = schema.execute(query, variable_values={'name': 'a'}, context_value=context)
+        assert result.data == {'hello': 'Hello a'}
+        assert str(context.cache_control) == 'public, max-age=60'
+    schema.execute(query, variable_values={'name': 'b'})
+    assert calls == ['hello', 'hello']
+    assert (response_cache.hits, response_cache.misses) == (1, 2)
+
+
+def test_response_cache_minimum_ttl():
+    schema, response_cache, timer = make_schema()
+    context = Context()
+    schema.execute('{ hello short }', context_value=context)
+    assert context.cache_control.max_age == 10
+    timer.now = 10
+    schema.execute('{ hello short }')
+    assert calls == ['hello', 'short'] * 2
+
+
+def test_response_cache_default_ttl():
+    schema, response_cache, timer = make_schema()
+    for _ in range(2):
+        schema.execute('{ pet { name } }')
+        schema.execute('{ cachedPet { name } }')
+        schema.execute('{ uncached }')
+        # The root fields without cache_ttl count as default_ttl too
+        schema.execute('{ cachedPet { name } uncached }')
+    assert calls == ['pet', 'cached_pet', 'uncached', 'cached_pet', 'uncached', 'pet', 'uncached', 'cached_pet',
+                     'uncached']
+
+    del calls[:]
+    schema, response_cache, timer = make_schema(default_ttl=5)
+    context = Context()
+    for _ in range(2):
+        schema.execute('{ uncached pet { name } }', context_value=context)
+    assert calls == ['uncached', 'pet']
+    assert context.cache_control.max_age == 5
+
+
+def test_response_cache_bypasses_mutations_and_errors():
+    schema, response_cache, timer = make_schema()
+    for _ in range(2):
+        context = Context()
+        schema.execute('mutation { createPet { name } }', context_value=context)
+        result = schema.execute('{ fails }', context_value=context)
+        assert result.errors
+        assert not hasattr(context, 'cache_control')
+    assert calls == ['mutate', 'fails'] * 2
+
+
+def test_response_cache_scope_and_bypass():
+    schema, response_cache, timer = make_schema(
+        scope=lambda context: context.user,
+        bypass=lambda context: context.user == 'admin')
+    for user in ['a', 'b', 'a', 'admin', 'admin']:
+        context = Context(user)
+        schema.execute('{ hello }', context_value=context)
+    assert calls == ['hello'] * 4
+    assert response_cache.bypassed == 2
+    assert not hasattr(context, 'cache_control')
+
+    context = Context('a')
+    schema.execute('{ hello }', context_value=context)
+    assert context.cache_control.private
+
+
+def test_response_cache_anonymous_only():
+    schema, response_cache, timer = make_schema()
+    for user in [None, User(False), User(True), OldUser(), None]:
+        schema.execute('{ hello }', context_value=Context(user))
+    assert calls == ['hello'] * 3
+    assert response_cache.bypassed == 2
+    assert response_cache.hits == 2
+
+
+def test_response_cache_revalidation_context():
+    schema, response_cache, timer = make_schema(stale_ttl=30, cache_class=SyncResponseCache)
+    context = Context()
+    schema.execute('{ context }', context_value=context)
+    timer.now = 70
+    schema.execute('{ context }', context_value=context)
+    first, revalidation = calls
+    assert first is context
+    # A copy, so the request can be finished
+    assert revalidation is not context
+    assert isinstance(revalidation, Context)
+
+    del calls[:]
+    schema, response_cache, timer = make_schema(
+        stale_ttl=30, cache_class=SyncResponseCache, revalidation_context=lambda context: Context('fresh'))
+    schema.execute('{ context }', context_value=Context())
+    timer.now = 70
+    result = schema.execute('{ context }', context_value=Context())
+    assert result.data == {'context': 'None'}
+    timer.now = 80
+    result = schema.execute('{ context }', context_value=Context())
+    assert result.data == {'context': 'fresh'}
+
+
+def test_response_cache_stale_while_revalidate():
+    schema, response_cache, timer = make_schema(stale_ttl=30, cache_class=SyncResponseCache)
+    schema.execute('{ hello }')
+    timer.now = 70
+    result = schema.execute('{ hello }')
+    assert result.data == {'hello': 'Hello None'}
+    assert response_cache.stale_hits == 1
+    assert calls == ['hello', 'hello']
+    timer.now = 100
+    schema.execute('{ hello }')
+    assert response_cache.hits == 1
+    timer.now = 200
+    schema.execute('{ hello }')
+    assert calls == ['hello'] * 3
+
+
+def test_response_cache_return_promise():
+    schema, response_cache, timer = make_schema()
+    for _ in range(2):
+        result = schema.execute('{ hello }', return_promise=True).get()
+        assert result.data == {'hello': 'Hello None'}
+    assert calls == ['hello']
+
+
+def test_cache_control_str():
+    assert str(CacheControl(10)) == 'public, max-age=10'
+    assert str(CacheControl(10, private=True)) == 'private, max-age=10'
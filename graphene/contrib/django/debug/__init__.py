@@ -1,4 +1,5 @@
 from .middleware import DjangoDebugMiddleware
+from .sql.nplusone import NPlusOneError
 from .types import DjangoDebug
 
-__all__ = ['DjangoDebugMiddleware', 'DjangoDebug']
+__all__ = ['DjangoDebugMiddleware', 'DjangoDebug', 'NPlusOneError']
@@ -1,17 +1,32 @@
 from promise import Promise
 from django.db import connections
 
-from .sql.tracking import unwrap_cursor, wrap_cursor
+from ....utils.paths import PathTracker
+from .sql.nplusone import NPlusOneError, find_repeated_queries, normalize_sql
+from .sql.tracking import Sampler, SQLQuery, unwrap_cursor, wrap_cursor
 from .types import DjangoDebug
 
 
 class DjangoDebugContext(object):
 
-    def __init__(self):
+    def __init__(self, sampled=True, n_plus_one_threshold=1, strict=False):
         self.debug_promise = None
         self.promises = []
-        self.enable_instrumentation()
-        self.object = DjangoDebug(sql=[])
+        self.queries = []
+        self.sampled = sampled
+        self.n_plus_one_threshold = n_plus_one_threshold
+        self.strict = strict
+        # The path of the field being resolved
+        self.current_field = None
+        self.paths = PathTracker()
+        self.shape_counts = {}
+        self.n_plus_one_error = None
+        if sampled:
+            self.enable_instrumentation()
+        else:
+            # Left by a previous request that did not select the debug field
+            self.disable_instrumentation()
+        self.object = DjangoDebug(_root=self)
 
     def get_debug_promise(self):
         if not self.debug_promise:
@@ -19,9 +34,32 @@ class DjangoDebugContext(object):
         return self.debug_promise.then(self.on_resolve_all_promises)
 
     def on_resolve_all_promises(self, values):
+        if not self.sampled:
+            return None
         self.disable_instrumentation()
+        self.paths.clear()
         return self.object
 
+    def record(self, query):
+        self.queries.append(query)
+        if not self.strict:
+            return
+        query = SQLQuery(query)
+        key = query.field, normalize_sql(query.raw_sql)
+        count = self.shape_counts[key] = self.shape_counts.get(key, 0) + 1
+        if count > self.n_plus_one_threshold and not self.n_plus_one_error:
+            # Raised by the middleware, not in the middle of the query
+            self.n_plus_one_error = NPlusOneError('{} issued the same query more than {} times: {}'.format(
+                query.field, self.n_plus_one_threshold, key[1]))
+
+    def raise_n_plus_one_error(self):
+        error, self.n_plus_one_error = self.n_plus_one_error, None
+        if error:
+            raise error
+
+    def get_repeated_queries(self):
+        return find_repeated_queries(map(SQLQuery, self.queries), self.n_plus_one_threshold)
+
     def add_promise(self, promise):
         if self.debug_promise and not self.debug_promise.is_fulfilled:
             self.promises.append(promise)
@@ -37,6 +75,27 @@ class DjangoDebugContext(object):
 
 
 class DjangoDebugMiddleware(object):
+    '''
+    Records the SQL queries of the requests for the DjangoDebug field.
+    With a ``sample_rate`` of N only one of every N requests is
+    recorded, the field is null in the others.
+
+    The queries are attributed to the path of the field being resolved
+    when they are issued, and the field paths (without the list indices)
+    that issue the same query (but for its literals) more than
+    ``n_plus_one_threshold`` times are reported in ``nPlusOne``. In
+    ``strict`` mode they raise NPlusOneError instead, failing the field,
+    to catch N+1 queries in tests.
+
+    It is an extension of the schema too, that stops recording the
+    queries once the operation is executed, even when the debug field
+    is not selected.
+    '''
+
+    def __init__(self, sample_rate=1, n_plus_one_threshold=1, strict=False):
+        self.sampler = Sampler(sample_rate)
+        self.n_plus_one_threshold = n_plus_one_threshold
+        self.strict = strict
 
     def resolve(self, next, root, args, context, info):
         django_debug = getattr(context, 'django_debug', None)
@@ -44,13 +103,36 @@ class DjangoDebugMiddleware(object):
             if context is None:
                 raise Exception('DjangoDebug cannot be executed in None contexts')
             try:
-                context.django_debug = DjangoDebugContext()
+                context.django_debug = DjangoDebugContext(
+                    sampled=self.sampler(),
+                    n_plus_one_threshold=self.n_plus_one_threshold,
+                    strict=self.strict
+                )
             except Exception:
                 raise Exception('DjangoDebug need the context to be writable, context received: {}.'.format(
                     context.__class__.__name__
                 ))
+        django_debug = context.django_debug
         if info.schema.graphene_schema.T(DjangoDebug) == info.return_type:
-            return context.django_debug.get_debug_promise()
+            return django_debug.get_debug_promise()
+        if not django_debug.sampled:
+            return next(root, args, context, info)
+        path = django_debug.paths.get_path(root, info)
+        django_debug.current_field = path
         promise = next(root, args, context, info)
-        context.django_debug.add_promise(promise)
+        if promise.is_fulfilled:
+            # Lists are completed later, they are evaluated here so their
+            # query is attributed to the field
+            value = django_debug.paths.add_value(path, promise.value, info)
+            if value is not promise.value:
+                promise = Promise.resolve(value)
+        else:
+            promise = promise.then(lambda value: django_debug.paths.add_value(path, value, info))
+        django_debug.raise_n_plus_one_error()
+        django_debug.add_promise(promise)
         return promise
+
+    def on_result(self, request, result):
+        django_debug = getattr(request.context_value, 'django_debug', None)
+        if django_debug:
+            django_debug.disable_instrumentation()
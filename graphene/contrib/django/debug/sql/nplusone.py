@@ -0,0 +1,59 @@
+import re
+from collections import OrderedDict
+
+STRING_RE = re.compile(r"'(?:[^']|'')*'")
+NUMBER_RE = re.compile(r'\b\d+(?:\.\d+)?\b')
+PLACEHOLDER_RE = re.compile(r'%(?:\(\w+\))?s')
+PLACEHOLDERS_RE = re.compile(r'\(\s*\?(?:\s*,\s*\?)*\s*\)')
+SPACES_RE = re.compile(r'\s+')
+
+
+def normalize_sql(sql):
+    '''
+    Shape of a SQL statement: literals and placeholders are replaced
+    by ?, and lists of them (as in IN (...)) by a single one.
+    '''
+    sql = STRING_RE.sub('?', sql)
+    sql = NUMBER_RE.sub('?', sql)
+    sql = PLACEHOLDER_RE.sub('?', sql)
+    sql = PLACEHOLDERS_RE.sub('(?)', sql)
+    return SPACES_RE.sub(' ', sql).strip()
+
+
+class NPlusOneError(Exception):
+    pass
+
+
+class RepeatedQuery(object):
+    '''
+    The queries with the same shape issued while resolving a field.
+    '''
+
+    def __init__(self, field, sql):
+        self.field = field
+        self.sql = sql
+        self.count = 0
+        self.duration = 0
+
+    def add(self, query):
+        self.count += 1
+        self.duration += query.duration
+
+    def __str__(self):
+        return '{} ran {} times: {}'.format(self.field, self.count, self.sql)
+
+
+def find_repeated_queries(queries, threshold):
+    '''
+    Groups the SQLQuery of a request by field and shape, and returns the
+    groups of more than ``threshold`` queries, the largest first.
+    '''
+    groups = OrderedDict()
+    for query in queries:
+        key = query.field, normalize_sql(query.raw_sql)
+        group = groups.get(key)
+        if group is None:
+            group = groups[key] = RepeatedQuery(*key)
+        group.add(query)
+    repeated = [group for group in groups.values() if group.count > threshold]
+    return sorted(repeated, key=lambda group: -group.count)
@@ -2,13 +2,14 @@
 from __future__ import absolute_import, unicode_literals
 
 import json
+from itertools import count
 from threading import local
 from time import time
 
 from django.utils import six
 from django.utils.encoding import force_text
 
-from .types import DjangoDebugSQL, DjangoDebugPostgreSQL
+from .....utils.paths import format_path
 
 
 class SQLQueryTriggered(Exception):
@@ -38,11 +39,13 @@ def wrap_cursor(connection, panel):
     if not hasattr(connection, '_graphene_cursor'):
         connection._graphene_cursor = connection.cursor
 
-        def cursor():
-            return state.Wrapper(connection._graphene_cursor(), connection, panel)
+    # Rewrapped if a previous request did not unwrap it (it did not
+    # select the debug field), so the queries go to the current one
+    def cursor():
+        return state.Wrapper(connection._graphene_cursor(), connection, panel)
 
-        connection.cursor = cursor
-        return cursor
+    connection.cursor = cursor
+    return cursor
 
 
 def unwrap_cursor(connection):
@@ -65,6 +68,21 @@ class ExceptionCursorWrapper(object):
         raise SQLQueryTriggered()
 
 
+class CursorState(object):
+    '''
+    The attributes of a cursor that the backends format the last executed
+    query from (psycopg2, MySQLdb and cx_Oracle), which the next query
+    overwrites.
+    '''
+    attributes = ('query', '_last_executed', 'statement')
+
+    def __init__(self, cursor):
+        for name in self.attributes:
+            value = getattr(cursor, name, None)
+            if value is not None:
+                setattr(self, name, value)
+
+
 class NormalCursorWrapper(object):
     """
     Wraps a cursor and logs queries.
@@ -77,76 +95,36 @@ class NormalCursorWrapper(object):
         # logger must implement a ``record`` method
         self.logger = logger
 
-    def _quote_expr(self, element):
-        if isinstance(element, six.string_types):
-            return "'%s'" % force_text(element).replace("'", "''")
-        else:
-            return repr(element)
-
-    def _quote_params(self, params):
-        if not params:
-            return params
-        if isinstance(params, dict):
-            return dict((key, self._quote_expr(value))
-                        for key, value in params.items())
-        return list(map(self._quote_expr, params))
-
-    def _decode(self, param):
-        try:
-            return force_text(param, strings_only=True)
-        except UnicodeDecodeError:
-            return '(encoded string)'
-
     def _record(self, method, sql, params):
         start_time = time()
         try:
             return method(sql, params)
         finally:
             stop_time = time()
-            duration = (stop_time - start_time)
-            _params = ''
-            try:
-                _params = json.dumps(list(map(self._decode, params)))
-            except Exception:
-                pass  # object not JSON serializable
-
             alias = getattr(self.db, 'alias', 'default')
-            conn = self.db.connection
-            vendor = getattr(conn, 'vendor', 'unknown')
-
-            params = {
-                'vendor': vendor,
-                'alias': alias,
-                'sql': self.db.ops.last_executed_query(
-                    self.cursor, sql, self._quote_params(params)),
-                'duration': duration,
-                'raw_sql': sql,
-                'params': _params,
-                'start_time': start_time,
-                'stop_time': stop_time,
-                'is_slow': duration > 10,
-                'is_select': sql.lower().strip().startswith('select'),
-            }
-
+            vendor = getattr(self.db.connection, 'vendor', 'unknown')
+            extra = None
             if vendor == 'postgresql':
-                # If an erroneous query was ran on the connection, it might
-                # be in a state where checking isolation_level raises an
-                # exception.
-                try:
-                    iso_level = conn.isolation_level
-                except conn.InternalError:
-                    iso_level = 'unknown'
-                params.update({
-                    'trans_id': self.logger.get_transaction_id(alias),
-                    'trans_status': conn.get_transaction_status(),
-                    'iso_level': iso_level,
-                    'encoding': conn.encoding,
-                })
-                _sql = DjangoDebugPostgreSQL(**params)
-            else:
-                _sql = DjangoDebugSQL(**params)
-            # We keep `sql` to maintain backwards compatibility
-            self.logger.object.sql.append(_sql)
+                extra = self._get_postgresql_state(alias)
+            # Kept raw, SQLQuery formats it only if the debug field is selected
+            self.logger.record((self.db.ops, CursorState(self.cursor), vendor, alias, sql, params,
+                                start_time, stop_time, self.logger.current_field, extra))
+
+    def _get_postgresql_state(self, alias):
+        conn = self.db.connection
+        # If an erroneous query was ran on the connection, it might
+        # be in a state where checking isolation_level raises an
+        # exception.
+        try:
+            iso_level = conn.isolation_level
+        except conn.InternalError:
+            iso_level = 'unknown'
+        return {
+            'trans_id': self.logger.get_transaction_id(alias),
+            'trans_status': conn.get_transaction_status(),
+            'iso_level': iso_level,
+            'encoding': conn.encoding,
+        }
 
     def callproc(self, procname, params=()):
         return self._record(self.cursor.callproc, procname, params)
@@ -168,3 +146,68 @@ class NormalCursorWrapper(object):
 
     def __exit__(self, type, value, traceback):
         self.close()
+
+
+class SQLQuery(object):
+    '''
+    A query recorded by NormalCursorWrapper, formatted on access.
+    '''
+
+    def __init__(self, query):
+        (self.ops, self.cursor_state, self.vendor, self.alias, self.raw_sql, self.raw_params,
+         self.start_time, self.stop_time, path, extra) = query
+        self.path = list(path) if path is not None else None
+        self.field = format_path(path) if path is not None else None
+        self.duration = self.stop_time - self.start_time
+        self.is_slow = self.duration > 10
+        self.is_select = self.raw_sql.lower().strip().startswith('select')
+        if extra:
+            self.__dict__.update(extra)
+
+    def _quote_expr(self, element):
+        if isinstance(element, six.string_types):
+            return "'%s'" % force_text(element).replace("'", "''")
+        else:
+            return repr(element)
+
+    def _quote_params(self, params):
+        if not params:
+            return params
+        if isinstance(params, dict):
+            return dict((key, self._quote_expr(value))
+                        for key, value in params.items())
+        return list(map(self._quote_expr, params))
+
+    def _decode(self, param):
+        try:
+            return force_text(param, strings_only=True)
+        except UnicodeDecodeError:
+            return '(encoded string)'
+
+    @property
+    def sql(self):
+        executed_query = self.ops.last_executed_query(
+            self.cursor_state, self.raw_sql, self._quote_params(self.raw_params))
+        return force_text(executed_query, errors='replace')
+
+    @property
+    def params(self):
+        try:
+            return json.dumps(list(map(self._decode, self.raw_params)))
+        except Exception:
+            return ''  # object not JSON serializable
+
+
+class Sampler(object):
+    '''
+    Picks one of every ``rate`` requests.
+    '''
+
+    def __init__(self, rate=1):
+        assert rate >= 1, 'The sample rate has to be at least 1, not {!r}'.format(rate)
+        self.rate = rate
+        self._counter = count()
+
+    def __call__(self):
+        # next() on a count is atomic in CPython
+        return next(self._counter) % self.rate == 0
@@ -1,4 +1,4 @@
-from .....core import Boolean, Float, ObjectType, String
+from .....core import Boolean, Float, Int, ObjectType, String
 
 
 class DjangoDebugBaseSQL(ObjectType):
@@ -12,6 +12,9 @@ class DjangoDebugBaseSQL(ObjectType):
     stop_time = Float()
     is_slow = Boolean()
     is_select = Boolean()
+    field = String(description='The path of the field being resolved when the query was issued, '
+                               'without the list indices (like reporters.articles).')
+    path = String().List
 
 
 class DjangoDebugSQL(DjangoDebugBaseSQL):
@@ -23,3 +26,10 @@ class DjangoDebugPostgreSQL(DjangoDebugBaseSQL):
     trans_status = String()
     iso_level = String()
     encoding = String()
+
+
+class DjangoDebugRepeatedSQL(ObjectType):
+    field = String(description='The path of the field, without the list indices.')
+    sql = String(description='The shape of the queries, without literals.')
+    count = Int()
+    duration = Float()
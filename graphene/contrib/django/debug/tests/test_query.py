@@ -4,8 +4,10 @@ import graphene
 from graphene.contrib.django import DjangoConnectionField, DjangoNode
 from graphene.contrib.django.utils import DJANGO_FILTER_INSTALLED
 
-from ...tests.models import Reporter
+from ...tests.models import Article, Reporter
 from ..middleware import DjangoDebugMiddleware
+from ..sql.nplusone import normalize_sql
+from ..sql.tracking import NormalCursorWrapper, SQLQuery
 from ..types import DjangoDebug
 
 
@@ -217,3 +219,165 @@ def test_should_query_connectionfilter():
     assert 'COUNT' in result.data['__debug']['sql'][0]['rawSql']
     query = str(Reporter.objects.all()[:1].query)
     assert result.data['__debug']['sql'][1]['rawSql'] == query
+
+
+def test_should_sample_requests():
+    Reporter(last_name='ABA').save()
+
+    class Query(graphene.ObjectType):
+        reporters = graphene.String().List
+        debug = graphene.Field(DjangoDebug, name='__debug')
+
+        def resolve_reporters(self, *args, **kwargs):
+            return [r.last_name for r in Reporter.objects.all()]
+
+    query = '{ reporters __debug { sql { rawSql } } }'
+    schema = graphene.Schema(query=Query, middlewares=[DjangoDebugMiddleware(sample_rate=3)])
+    results = [schema.execute(query, context_value=context()) for _ in range(4)]
+    assert [bool(result.data['__debug']) for result in results] == [True, False, False, True]
+    assert all(result.data['reporters'] == ['ABA'] for result in results)
+    assert len(results[0].data['__debug']['sql']) == 1
+
+
+def test_should_format_selected_fields_only(monkeypatch):
+    from django.db import connection
+    Reporter(last_name='ABA').save()
+    formatted = []
+    last_executed_query = connection.ops.last_executed_query
+
+    def tracked_last_executed_query(*args):
+        formatted.append(args)
+        return last_executed_query(*args)
+    monkeypatch.setattr(connection.ops, 'last_executed_query', tracked_last_executed_query)
+
+    class Query(graphene.ObjectType):
+        reporters = graphene.String().List
+        debug = graphene.Field(DjangoDebug, name='__debug')
+
+        def resolve_reporters(self, *args, **kwargs):
+            return [r.last_name for r in Reporter.objects.filter(last_name='ABA')]
+
+    schema = graphene.Schema(query=Query, middlewares=[DjangoDebugMiddleware()])
+    result = schema.execute('{ reporters __debug { sql { rawSql isSelect } } }', context_value=context())
+    assert not result.errors
+    assert result.data['__debug']['sql'][0]['isSelect']
+    assert not formatted
+
+    result = schema.execute('{ reporters __debug { sql { sql params } } }', context_value=context())
+    assert not result.errors
+    assert len(formatted) == 1
+    assert result.data['__debug']['sql'][0]['params'] == '["ABA"]'
+    assert 'ABA' in result.data['__debug']['sql'][0]['sql']
+
+
+def test_should_format_queries_with_their_cursor_state():
+    class Cursor(object):
+        query = None
+
+        def execute(self, sql, params):
+            self.query = sql % tuple(params)
+
+    class Operations(object):
+        def last_executed_query(self, cursor, sql, params):
+            # Like psycopg2, the query is read from the cursor
+            return cursor.query
+
+    class Connection(object):
+        vendor = 'unknown'
+
+    class Database(object):
+        alias = 'default'
+        connection = Connection()
+        ops = Operations()
+
+    class Logger(object):
+        current_field = None
+
+        def __init__(self):
+            self.queries = []
+
+        def record(self, query):
+            self.queries.append(query)
+
+    logger = Logger()
+    cursor = NormalCursorWrapper(Cursor(), Database(), logger)
+    cursor.execute('SELECT %s', [1])
+    cursor.execute('SELECT %s', [2])
+    assert [SQLQuery(query).sql for query in logger.queries] == ['SELECT 1', 'SELECT 2']
+
+
+def test_normalize_sql():
+    assert normalize_sql(
+        "SELECT \"id\" FROM \"article\"\n WHERE \"reporter_id\" IN (%s, %s, %s) AND x = 'a''b' LIMIT 21"
+    ) == 'SELECT "id" FROM "article" WHERE "reporter_id" IN (?) AND x = ? LIMIT ?'
+    assert normalize_sql('SELECT 1 WHERE a = %(a)s') == 'SELECT ? WHERE a = ?'
+
+
+def get_n_plus_one_schema(**kwargs):
+    class ArticleType(graphene.ObjectType):
+        headline = graphene.String()
+
+    class ReporterType(graphene.ObjectType):
+        last_name = graphene.String()
+        articles = graphene.List(ArticleType)
+
+        def resolve_articles(self, args, info):
+            return self.articles.all()
+
+    class Query(graphene.ObjectType):
+        reporters = graphene.List(ReporterType)
+        debug = graphene.Field(DjangoDebug, name='__debug')
+
+        def resolve_reporters(self, args, info):
+            return Reporter.objects.all()
+
+    return graphene.Schema(query=Query, middlewares=[DjangoDebugMiddleware(**kwargs)])
+
+
+def create_articles():
+    for i in range(3):
+        reporter = Reporter.objects.create(last_name='Reporter {}'.format(i))
+        Article.objects.create(headline='Article {}'.format(i), reporter=reporter, pub_date='2016-01-01')
+
+
+def test_should_report_n_plus_one():
+    create_articles()
+    schema = get_n_plus_one_schema(n_plus_one_threshold=2)
+    result = schema.execute('''
+        { reporters { lastName articles { headline } }
+          __debug { sql { field path } nPlusOne { field sql count } } }
+    ''', context_value=context())
+    assert not result.errors
+    debug = result.data['__debug']
+    assert [query['field'] for query in debug['sql']] == ['reporters'] + ['reporters.articles'] * 3
+    assert [query['path'] for query in debug['sql']] == [['reporters']] + [
+        ['reporters', str(i), 'articles'] for i in range(3)]
+    assert len(debug['nPlusOne']) == 1
+    repeated = debug['nPlusOne'][0]
+    assert repeated['field'] == 'reporters.articles'
+    assert repeated['count'] == 3
+    assert '= ?' in repeated['sql']
+
+    schema = get_n_plus_one_schema(n_plus_one_threshold=3)
+    result = schema.execute('{ reporters { articles { headline } } __debug { nPlusOne { field } } }',
+                            context_value=context())
+    assert result.data['__debug']['nPlusOne'] == []
+
+
+def test_should_fail_n_plus_one_in_strict_mode():
+    create_articles()
+    schema = get_n_plus_one_schema(n_plus_one_threshold=2, strict=True)
+    result = schema.execute('{ reporters { lastName } }', context_value=context())
+    assert not result.errors
+    result = schema.execute('{ reporters { articles { headline } } }', context_value=context())
+    assert len(result.errors) == 1
+    assert 'reporters.articles issued the same query more than 2 times' in str(result.errors[0])
+
+
+def test_should_stop_recording_without_debug_field():
+    from django.db import connection
+    create_articles()
+    schema = get_n_plus_one_schema()
+    result = schema.execute('{ reporters { lastName } }', context_value=context())
+    assert not result.errors
+    assert not hasattr(connection, '_graphene_cursor')
@@ -1,7 +1,19 @@
 from ....core.classtypes.objecttype import ObjectType
 from ....core.types import Field
-from .sql.types import DjangoDebugBaseSQL
+from .sql.tracking import SQLQuery
+from .sql.types import DjangoDebugBaseSQL, DjangoDebugRepeatedSQL
 
 
 class DjangoDebug(ObjectType):
     sql = Field(DjangoDebugBaseSQL.List())
+    n_plus_one = Field(
+        DjangoDebugRepeatedSQL.List(),
+        description='The fields that issued the same query more times than the threshold of the middleware.'
+    )
+
+    def resolve_sql(self, args, info):
+        # The queries are recorded raw, and only formatted when selected
+        return [SQLQuery(query) for query in self.queries]
+
+    def resolve_n_plus_one(self, args, info):
+        return self.get_repeated_queries()
@@ -1,5 +1,6 @@
 from ....utils import to_snake_case
 from ..fields import DjangoConnectionField
+from .filterset import set_filterset_codec
 from .utils import get_filtering_args_from_filterset, get_filterset_class
 
 
@@ -34,7 +35,8 @@ class DjangoFilterConnectionField(DjangoConnectionField):
                     filter_kwargs[filterset_class.order_by_field]
                 )
             })
-        return filterset_class(data=filter_kwargs, queryset=qs)
+        filterset = filterset_class(data=filter_kwargs, queryset=qs)
+        return set_filterset_codec(filterset, info.schema.graphene_schema.global_id_codec)
 
     def get_filter_kwargs(self, args):
         return {k: v for k, v in args.items() if k in self.filtering_args}
@@ -7,22 +7,33 @@ from django_filters.filterset import FilterSet, FilterSetMetaclass
 
 from graphene.contrib.django.forms import (GlobalIDFormField,
                                            GlobalIDMultipleChoiceField)
-from graphql_relay.node.node import from_global_id
+from graphene.relay.codecs import default_codec
 
 
-class GlobalIDFilter(Filter):
+class GlobalIDCodecMixin(object):
+    # Replaced by the schema codec in DjangoFilterConnectionField.get_queryset
+    codec = default_codec
+
+    @property
+    def field(self):
+        field = super(GlobalIDCodecMixin, self).field
+        field.codec = self.codec
+        return field
+
+
+class GlobalIDFilter(GlobalIDCodecMixin, Filter):
     field_class = GlobalIDFormField
 
     def filter(self, qs, value):
-        _type, _id = from_global_id(value)
+        _type, _id = self.codec.decode(value)
         return super(GlobalIDFilter, self).filter(qs, _id)
 
 
-class GlobalIDMultipleChoiceFilter(MultipleChoiceFilter):
+class GlobalIDMultipleChoiceFilter(GlobalIDCodecMixin, MultipleChoiceFilter):
     field_class = GlobalIDMultipleChoiceField
 
     def filter(self, qs, value):
-        gids = [from_global_id(v)[1] for v in value]
+        gids = [decoded[1] for decoded in self.codec.decode_many(value) if decoded]
         return super(GlobalIDMultipleChoiceFilter, self).filter(qs, gids)
 
 
@@ -88,6 +99,15 @@ class GrapheneFilterSet(six.with_metaclass(GrapheneFilterSetMetaclass, GrapheneF
     """
 
 
+def set_filterset_codec(filterset, codec):
+    """ Make the Global ID filters of a filterset instance use the given codec
+    """
+    for filter in filterset.filters.values():
+        if isinstance(filter, GlobalIDCodecMixin):
+            filter.codec = codec
+    return filterset
+
+
 def setup_filterset(filterset_class):
     """ Wrap a provided filterset in Graphene-specific functionality
     """
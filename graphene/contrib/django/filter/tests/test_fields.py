@@ -8,7 +8,7 @@ from graphene.contrib.django.forms import (GlobalIDFormField,
                                            GlobalIDMultipleChoiceField)
 from graphene.contrib.django.tests.models import Article, Pet, Reporter
 from graphene.contrib.django.utils import DJANGO_FILTER_INSTALLED
-from graphene.relay import NodeField
+from graphene.relay import CompactGlobalIDCodec, NodeField
 
 pytestmark = []
 if DJANGO_FILTER_INSTALLED:
@@ -213,6 +213,44 @@ def test_filter_filterset_related_results():
     assert len(result.data['allReporters']['edges'][1]['node']['articles']['edges']) == 1
 
 
+def test_filter_global_id_schema_codec():
+    class ReporterFilterNode(DjangoNode):
+
+        class Meta:
+            model = Reporter
+
+    class ArticleFilterNode(DjangoNode):
+
+        class Meta:
+            model = Article
+            filter_fields = ['reporter']
+
+    class Query(ObjectType):
+        all_articles = DjangoFilterConnectionField(ArticleFilterNode)
+        reporter = NodeField(ReporterFilterNode)
+
+    r1 = Reporter.objects.create(first_name='r1', last_name='r1', email='r1@test.com')
+    r2 = Reporter.objects.create(first_name='r2', last_name='r2', email='r2@test.com')
+    Article.objects.create(headline='a1', pub_date=datetime.now(), reporter=r1)
+    Article.objects.create(headline='a2', pub_date=datetime.now(), reporter=r2)
+
+    schema = Schema(query=Query, global_id_codec=CompactGlobalIDCodec())
+    query = '''
+    query {
+        allArticles(reporter: "%s") {
+            edges {
+                node {
+                    headline
+                }
+            }
+        }
+    }
+    ''' % schema.global_id_codec.encode('ReporterFilterNode', r2.pk)
+    result = schema.execute(query)
+    assert not result.errors
+    assert result.data['allArticles']['edges'] == [{'node': {'headline': 'a2'}}]
+
+
 def test_global_id_field_implicit():
     field = DjangoFilterConnectionField(ArticleNode, fields=['id'])
     filterset_class = field.filterset_class
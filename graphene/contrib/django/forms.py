@@ -1,10 +1,8 @@
-import binascii
-
 from django.core.exceptions import ValidationError
 from django.forms import CharField, Field, IntegerField, MultipleChoiceField
 from django.utils.translation import ugettext_lazy as _
 
-from graphql_relay import from_global_id
+from ...relay.codecs import InvalidGlobalID, default_codec
 
 
 class GlobalIDFormField(Field):
@@ -12,13 +10,17 @@ class GlobalIDFormField(Field):
         'invalid': _('Invalid ID specified.'),
     }
 
+    def __init__(self, *args, **kwargs):
+        self.codec = kwargs.pop('codec', default_codec)
+        super(GlobalIDFormField, self).__init__(*args, **kwargs)
+
     def clean(self, value):
         if not value and not self.required:
             return None
 
         try:
-            _type, _id = from_global_id(value)
-        except (TypeError, ValueError, UnicodeDecodeError, binascii.Error):
+            _type, _id = self.codec.decode(value)
+        except InvalidGlobalID:
             raise ValidationError(self.error_messages['invalid'])
 
         try:
@@ -36,7 +38,11 @@ class GlobalIDMultipleChoiceField(MultipleChoiceField):
         'invalid_list': _('Enter a list of values.'),
     }
 
+    def __init__(self, *args, **kwargs):
+        self.codec = kwargs.pop('codec', default_codec)
+        super(GlobalIDMultipleChoiceField, self).__init__(*args, **kwargs)
+
     def valid_value(self, value):
         # Clean will raise a validation error if there is a problem
-        GlobalIDFormField().clean(value)
+        GlobalIDFormField(codec=self.codec).clean(value)
         return True
@@ -1,7 +1,9 @@
 from django.core.exceptions import ValidationError
 from py.test import raises
 
-from graphene.contrib.django.forms import GlobalIDFormField
+from graphene.contrib.django.forms import (GlobalIDFormField,
+                                           GlobalIDMultipleChoiceField)
+from graphene.relay import CompactGlobalIDCodec
 
 
 # 'TXlUeXBlOjEwMA==' -> 'MyType', 100
@@ -30,7 +32,31 @@ def test_global_id_none_optional():
     field.clean(None)
 
 
+def test_global_id_positional_args():
+    # The arguments of Field are still accepted positionally
+    field = GlobalIDFormField(False)
+    field.clean(None)
+    field = GlobalIDMultipleChoiceField((), False)
+    field.clean([])
+
+
 def test_global_id_bad_int():
     field = GlobalIDFormField()
     with raises(ValidationError):
         field.clean('TXlUeXBlOmFiYw==')
+
+
+def test_global_id_codec():
+    codec = CompactGlobalIDCodec(tags={'MyType': 1})
+    field = GlobalIDFormField(codec=codec)
+    field.clean(codec.encode('MyType', 100))
+    with raises(ValidationError):
+        field.clean('TXlUeXBlOjEwMA==')
+
+
+def test_global_id_multiple_codec():
+    codec = CompactGlobalIDCodec(tags={'MyType': 1})
+    field = GlobalIDMultipleChoiceField(codec=codec)
+    field.clean(codec.encode_many('MyType', [1, 2]))
+    with raises(ValidationError):
+        field.clean(['TXlUeXBlOjEwMA=='])
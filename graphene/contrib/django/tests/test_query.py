@@ -199,3 +199,34 @@ def test_should_node():
     result = schema.execute(query)
     assert not result.errors
     assert result.data == expected
+
+
+def test_should_resolve_interface_from_model_instances():
+    class ReporterNode(DjangoNode):
+
+        class Meta:
+            model = Reporter
+
+    class Query(graphene.ObjectType):
+        nodes = graphene.List(relay.Node)
+
+        def resolve_nodes(self, args, info):
+            return Reporter.objects.all()
+
+    Reporter.objects.create(first_name='ABA', last_name='X', email='aba@x.com')
+    schema = graphene.Schema(query=Query)
+    schema.register(ReporterNode)
+    query = '''
+        query {
+          nodes {
+            id
+            ... on ReporterNode {
+              firstName
+            }
+          }
+        }
+    '''
+    result = schema.execute(query)
+    assert not result.errors
+    assert result.data['nodes'][0]['firstName'] == 'ABA'
+    assert schema.get_type_for_instance(Reporter()) == schema.T(ReporterNode)
@@ -1,9 +1,13 @@
+from threading import current_thread
+
 from django.conf.urls import url
 
 import graphene
 from graphene import Schema
+from graphene.cache import ResponseCache
 from graphene.contrib.django.types import DjangoNode
-from graphene.contrib.django.views import GraphQLView
+from graphene.contrib.django.views import GraphQLView, MetricsView
+from graphene.metrics import MetricsRegistry
 
 from .models import Article, Reporter
 
@@ -37,9 +41,62 @@ class Query(graphene.ObjectType):
         return Human()
 
 
+class CachedQuery(graphene.ObjectType):
+    human = graphene.Field(Human, cache_ttl=30)
+
+    def resolve_human(self, args, info):
+        return Human()
+
+
+def resolve_thread(*args):
+    return current_thread().name
+
+
+class BatchQuery(graphene.ObjectType):
+    context = graphene.String()
+    thread = graphene.String(resolver=resolve_thread)
+    echo = graphene.String(value=graphene.String())
+
+    @graphene.with_context
+    def resolve_context(self, args, context, info):
+        return str(id(context.loaders))
+
+    def resolve_echo(self, args, info):
+        return args.get('value')
+
+
+class BatchMutation(graphene.ObjectType):
+    thread = graphene.String(resolver=resolve_thread)
+
+
+class BatchView(GraphQLView):
+
+    def get_context(self, request):
+        # Shared by the operations of a batch
+        request.loaders = {}
+        return request
+
+
 schema = Schema(query=Query)
+cached_schema = Schema(query=CachedQuery, response_cache=ResponseCache())
+batch_schema = Schema(query=BatchQuery, mutation=BatchMutation)
+traced_batch_schema = Schema(query=BatchQuery, mutation=BatchMutation, tracing=True)
+incremental_schema = Schema(query=Query, incremental=True)
+
 
+metrics = MetricsRegistry()
+measured_schema = Schema(query=Query, metrics=metrics, tracing=True)
+profiled_schema = Schema(query=Query, mutation=BatchMutation, profiling=True)
 
 urlpatterns = [
+    url(r'^graphql-metrics', MetricsView.as_view(registry=metrics)),
+    url(r'^graphql-measured', GraphQLView.as_view(schema=measured_schema)),
+    url(r'^graphql-profiled', GraphQLView.as_view(schema=profiled_schema, profile_header='X-GraphQL-Profile')),
+    url(r'^graphql-cached', GraphQLView.as_view(schema=cached_schema)),
+    url(r'^graphql-streaming', GraphQLView.as_view(schema=schema, streaming=True)),
+    url(r'^graphql-batch-concurrent', BatchView.as_view(schema=batch_schema, batch=True, batch_concurrency=2)),
+    url(r'^graphql-batch-traced', BatchView.as_view(schema=traced_batch_schema, batch=True, batch_concurrency=2)),
+    url(r'^graphql-batch', BatchView.as_view(schema=batch_schema, batch=True)),
+    url(r'^graphql-multipart', GraphQLView.as_view(schema=incremental_schema, multipart=True)),
     url(r'^graphql', GraphQLView.as_view(schema=schema)),
 ]
@@ -1,4 +1,8 @@
 import json
+import sys
+from threading import current_thread
+
+import pytest
 
 
 def format_response(response):
@@ -55,3 +59,137 @@ def test_client_post_good_query_graphql(settings, client):
         }
     }
     assert json_response == expected_json
+
+
+def test_client_cache_control(settings, client):
+    settings.ROOT_URLCONF = 'graphene.contrib.django.tests.test_urls'
+    response = client.get('/graphql-cached', {'query': '{ human { headline } }'})
+    assert format_response(response) == {'data': {'human': {'headline': None}}}
+    assert response['Cache-Control'] == 'public, max-age=30'
+    response = client.get('/graphql', {'query': '{ human { headline } }'})
+    assert not response.has_header('Cache-Control')
+
+
+def test_client_streaming(settings, client):
+    settings.ROOT_URLCONF = 'graphene.contrib.django.tests.test_urls'
+    response = client.get('/graphql-streaming', {'query': '{ human { headline raises } }'})
+    assert response.streaming
+    json_response = json.loads(b''.join(response.streaming_content).decode())
+    assert json_response['errors'][0]['message'] == 'This field should raise exception'
+    assert json_response['data'] == {'human': {'headline': None, 'raises': None}}
+    response = client.get('/graphql-streaming', {'query': '{ human { unknown } }'})
+    assert response.status_code == 400
+    response = client.get('/graphql-streaming')
+    assert format_response(response)['errors'][0]['message'] == 'Must provide query string.'
+
+
+def test_client_multipart(settings, client):
+    settings.ROOT_URLCONF = 'graphene.contrib.django.tests.test_urls'
+    query = '{ human { headline ... on Human @defer(label: "raises") { raises } } }'
+    response = client.get('/graphql-multipart', {'query': query}, HTTP_ACCEPT='multipart/mixed')
+    assert response['Content-Type'] == 'multipart/mixed; boundary="-"'
+    content = b''.join(response.streaming_content).decode()
+    parts = content.split('\r\n---')
+    assert parts[-1] == '--\r\n'
+    payloads = [json.loads(part.split('\r\n\r\n', 1)[1]) for part in parts[1:-1]]
+    assert payloads[0] == {'data': {'human': {'headline': None}}, 'hasNext': True}
+    assert payloads[1]['errors'][0]['message'] == 'This field should raise exception'
+    assert payloads[1]['data'] == {'raises': None}
+    assert (payloads[1]['path'], payloads[1]['label']) == (['human'], 'raises')
+    assert payloads[2] == {'hasNext': False}
+    response = client.get('/graphql-multipart', {'query': query})
+    assert format_response(response)['data'] == {'human': {'headline': None, 'raises': None}}
+
+
+def test_client_batch(settings, client):
+    settings.ROOT_URLCONF = 'graphene.contrib.django.tests.test_urls'
+    operations = [
+        {'query': '{ context thread }'},
+        {'query': '{ unknown }'},
+        {'query': 'query Echo($value: String) { echo(value: $value) }', 'variables': {'value': 'hi'}},
+        {'query': '{ context }'},
+        'query',
+    ]
+    response = client.post('/graphql-batch', json.dumps(operations), 'application/json')
+    results = format_response(response)
+    assert len(results) == 5
+    assert results[0]['data']['context'] == results[3]['data']['context']
+    assert results[0]['data']['thread'] == current_thread().name
+    assert results[1]['errors'][0]['message'] == 'Cannot query field "unknown" on type "BatchQuery".'
+    assert results[2] == {'data': {'echo': 'hi'}}
+    assert results[4] == {'errors': [{'message': 'Batched operations must be objects.'}]}
+    response = client.post('/graphql-batch', '[{"query": ', 'application/json')
+    assert response.status_code == 400
+
+
+def test_client_batch_concurrent(settings, client):
+    pytest.importorskip('concurrent.futures')
+    settings.ROOT_URLCONF = 'graphene.contrib.django.tests.test_urls'
+    operations = [
+        {'query': '{ thread context }'},
+        {'query': '{ thread context }'},
+        {'query': 'mutation { thread }'},
+        {'query': '{ echo(value: "last") }'},
+    ]
+    response = client.post('/graphql-batch-concurrent', json.dumps(operations), 'application/json')
+    results = [result['data'] for result in format_response(response)]
+    assert results[0]['thread'] != current_thread().name
+    assert results[0]['context'] == results[1]['context']
+    assert results[2:] == [{'thread': current_thread().name}, {'echo': 'last'}]
+
+
+def test_client_batch_extensions(settings, client):
+    pytest.importorskip('concurrent.futures')
+    settings.ROOT_URLCONF = 'graphene.contrib.django.tests.test_urls'
+    operations = [
+        {'query': '{ thread context }'},
+        {'query': '{ echo(value: "a") }'},
+        {'query': '{ unknown }'},
+        {'query': 'mutation { thread }'},
+    ]
+    response = client.post('/graphql-batch-traced', json.dumps(operations), 'application/json')
+    results = format_response(response)
+    # Every operation is traced on its own, even when run concurrently
+    paths = [[resolver['path'] for resolver in result['extensions']['tracing']['execution']['resolvers']]
+             for result in results if 'data' in result]
+    assert paths == [[['thread'], ['context']], [['echo']], [['thread']]]
+    assert results[2]['errors'][0]['message'] == 'Cannot query field "unknown" on type "BatchQuery".'
+
+
+def test_client_metrics(settings, client):
+    settings.ROOT_URLCONF = 'graphene.contrib.django.tests.test_urls'
+    response = client.get('/graphql-measured', {'query': 'query Headline { human { headline } }'})
+    json_response = format_response(response)
+    assert json_response['data'] == {'human': {'headline': None}}
+    resolvers = json_response['extensions']['tracing']['execution']['resolvers']
+    assert [resolver['path'] for resolver in resolvers] == [['human'], ['human', 'headline']]
+
+    response = client.get('/graphql-metrics')
+    assert response['Content-Type'].startswith('text/plain; version=0.0.4')
+    metrics = response.content.decode()
+    assert 'graphql_operations_total{operation_type="query",operation_name="Headline"} 1.0' in metrics
+    assert 'graphql_field_duration_seconds_count{field="Human.headline"} 1' in metrics
+
+
+def test_client_profile_header(settings, client):
+    settings.ROOT_URLCONF = 'graphene.contrib.django.tests.test_urls'
+    response = client.get('/graphql-profiled', {'query': '{ human { headline } }'})
+    assert 'extensions' not in format_response(response)
+
+    response = client.get('/graphql-profiled', {'query': '{ human { headline } }'}, HTTP_X_GRAPHQL_PROFILE='sampling')
+    json_response = format_response(response)
+    assert json_response['data'] == {'human': {'headline': None}}
+    assert json_response['extensions']['profile']['mode'] == 'sampling'
+
+    response = client.get('/graphql-profiled', {'query': '{ human { headline } }'}, HTTP_X_GRAPHQL_PROFILE='1')
+    profile = format_response(response)['extensions']['profile']
+    assert profile['mode'] == 'cprofile'
+    assert sorted(field['path'] for field in profile['fields']) == ['human', 'human.headline']
+
+
+def test_client_profile_get_mutation(settings, client):
+    settings.ROOT_URLCONF = 'graphene.contrib.django.tests.test_urls'
+    response = client.get('/graphql-profiled', {'query': 'mutation { thread }'}, HTTP_X_GRAPHQL_PROFILE='1')
+    assert response.status_code == 405
+    # Rejected before the profiler is started
+    assert sys.getprofile() is None
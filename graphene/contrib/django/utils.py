@@ -15,13 +15,7 @@ except (ImportError, AttributeError):
 
 
 def get_type_for_model(schema, model):
-    schema = schema
-    types = schema.types.values()
-    for _type in types:
-        type_model = hasattr(_type, '_meta') and getattr(
-            _type._meta, 'model', None)
-        if model == type_model:
-            return _type
+    return schema.get_type_for_model(model)
 
 
 def get_reverse_fields(model):
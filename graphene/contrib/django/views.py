@@ -1,8 +1,45 @@
+import copy
+import json
+from collections import OrderedDict
+
+from django.db import connections
+from django.http import HttpResponse, StreamingHttpResponse
+from django.http.response import HttpResponseBadRequest, HttpResponseNotAllowed
+from django.views.generic import View
+from graphql import Source, parse
+from graphql.execution import ExecutionResult
 from graphql_django_view import GraphQLView as BaseGraphQLView
+from graphql_django_view import HttpError
+
+from ...core.extensions import ExecutionRequest
+from ...core.incremental import IncrementalExecutionResult
+
+try:
+    from concurrent.futures import ThreadPoolExecutor
+except ImportError:
+    ThreadPoolExecutor = None
+
+MULTIPART_BOUNDARY = '-'
 
 
 class GraphQLView(BaseGraphQLView):
     graphene_schema = None
+    # Stream the JSON of the responses instead of encoding it at once
+    streaming = False
+    # Deliver the patches of @defer and @stream as a multipart/mixed
+    # response to the clients that accept it (with an incremental schema)
+    multipart = False
+    # Accept a JSON array of operations. Each operation gets a shallow
+    # copy of the context, so what get_context puts in it (like the
+    # DataLoaders) is shared by the batch, but not what is set in it while
+    # an operation is executed (like the state of the extensions)
+    batch = False
+    # Run the queries of a batch in up to batch_concurrency threads
+    batch_concurrency = 0
+    # Profile the operations of the requests with this header (like
+    # X-GraphQL-Profile: sampling) with the ProfilingMiddleware of the
+    # schema. Disabled by default, as the profiles expose the code
+    profile_header = None
 
     def __init__(self, schema, **kwargs):
         super(GraphQLView, self).__init__(
@@ -11,3 +48,271 @@ class GraphQLView(BaseGraphQLView):
             executor=schema.executor,
             **kwargs
         )
+        self.document_ast = None
+        self.operation_name = None
+        self.incremental = False
+
+    def dispatch(self, request, *args, **kwargs):
+        if self.is_batch(request):
+            return self.dispatch_batch(request)
+        if request.method.lower() in ('get', 'post'):
+            response = self.dispatch_graphql(request)
+        else:
+            response = super(GraphQLView, self).dispatch(request, *args, **kwargs)
+        cache_control = getattr(request, 'cache_control', None)
+        if cache_control and response.status_code == 200:
+            response['Cache-Control'] = str(cache_control)
+        return response
+
+    def can_stream(self, request):
+        return (self.streaming and request.method.lower() in ('get', 'post') and
+                not self.pretty and not request.GET.get('pretty'))
+
+    def accepts_multipart(self, request):
+        return (self.multipart and request.method.lower() in ('get', 'post') and
+                'multipart/mixed' in request.META.get('HTTP_ACCEPT', ''))
+
+    def is_batch(self, request):
+        return (self.batch and request.method.lower() == 'post' and
+                self.get_content_type(request) == 'application/json' and
+                request.body.lstrip()[:1] == b'[')
+
+    def dispatch_batch(self, request):
+        try:
+            operations = json.loads(request.body.decode('utf-8'))
+        except ValueError:
+            operations = None
+        if not isinstance(operations, list):
+            response = HttpResponseBadRequest(content_type='application/json')
+            response.content = self.json_encode(request, {
+                'errors': [{'message': 'POST body sent invalid JSON.'}]
+            })
+            return response
+
+        context = self.get_request_context(request)
+        root_value = self.get_root_value(request)
+        operations = [self.prepare_operation(request, data, root_value, context) for data in operations]
+        results = self.execute_batch(operations)
+        return HttpResponse(
+            content=self.json_encode(request, [self.get_response_data(result) for result in results]),
+            content_type='application/json'
+        )
+
+    def prepare_operation(self, request, data, root_value, context):
+        '''
+        Returns a function that executes an operation of a batch, and
+        whether the operation only reads (is a query).
+        '''
+        def error(*errors):
+            return (lambda: ExecutionResult(errors=list(errors), invalid=True)), True
+
+        if not isinstance(data, dict):
+            return error(Exception('Batched operations must be objects.'))
+        try:
+            query, variables, operation_name = self.get_graphql_params(request, data)
+        except HttpError as e:
+            return error(e)
+        if not query:
+            return error(Exception('Must provide query string.'))
+        execution_request = ExecutionRequest(
+            query, root_value, variables, self.get_operation_context(context), operation_name)
+        try:
+            # Parsed here to find the queries, execute_request reports the errors
+            execution_request.document_ast = parse(Source(query, name='GraphQL request'))
+        except Exception:
+            pass
+
+        def run():
+            return self.graphene_schema.execute_request(execution_request, self.execute_operation)
+        operation = execution_request.operation
+        return run, bool(operation and operation.operation == 'query')
+
+    def get_operation_context(self, context):
+        return copy.copy(context)
+
+    def execute_operation(self, execution_request):
+        try:
+            return self.graphene_schema.execute_document(
+                execution_request.document_ast,
+                root_value=execution_request.root_value,
+                variable_values=execution_request.variable_values,
+                operation_name=execution_request.operation_name,
+                context_value=execution_request.context_value
+            )
+        except Exception as e:
+            return ExecutionResult(errors=[e], invalid=True)
+
+    def execute_batch(self, operations):
+        '''
+        Executes the operations of a batch, returning their results in
+        order. Consecutive queries run concurrently when
+        batch_concurrency is set, mutations run alone and in order.
+        '''
+        results = [None] * len(operations)
+        queries = []
+        for index, (run, read_only) in enumerate(operations):
+            if read_only and self.batch_concurrency:
+                queries.append(index)
+                continue
+            self.execute_concurrently(operations, queries, results)
+            queries = []
+            results[index] = run()
+        self.execute_concurrently(operations, queries, results)
+        return results
+
+    def execute_concurrently(self, operations, indexes, results):
+        if len(indexes) < 2:
+            for index in indexes:
+                results[index] = operations[index][0]()
+            return
+        assert ThreadPoolExecutor, 'Executing batches concurrently requires concurrent.futures (the futures package)'
+        with ThreadPoolExecutor(max_workers=min(len(indexes), self.batch_concurrency)) as executor:
+            futures = [executor.submit(run_in_thread, operations[index][0]) for index in indexes]
+            for index, future in zip(indexes, futures):
+                results[index] = future.result()
+
+    def dispatch_graphql(self, request):
+        self.incremental = self.accepts_multipart(request)
+        try:
+            execution_result = self.execute_graphql_request(request)
+        except HttpError as e:
+            response = e.response
+            response['Content-Type'] = 'application/json'
+            response.content = self.json_encode(request, {
+                'errors': [self.format_error(e)]
+            })
+            return response
+
+        if isinstance(execution_result, IncrementalExecutionResult):
+            return StreamingHttpResponse(
+                self.iter_multipart(request, execution_result),
+                content_type='multipart/mixed; boundary="{}"'.format(MULTIPART_BOUNDARY)
+            )
+
+        response = self.get_response_data(execution_result)
+        status_code = 400 if execution_result.invalid else 200
+        if not self.can_stream(request):
+            return HttpResponse(
+                status=status_code,
+                content=self.json_encode(request, response),
+                content_type='application/json'
+            )
+        encoder = self.graphene_schema.response_encoder
+        return StreamingHttpResponse(
+            encoder.iterencode(response, self.document_ast, self.operation_name),
+            status=status_code,
+            content_type='application/json'
+        )
+
+    def get_response_data(self, execution_result):
+        response = OrderedDict()
+        if execution_result.errors:
+            response['errors'] = [self.format_error(e) for e in execution_result.errors]
+        if not execution_result.invalid:
+            response['data'] = execution_result.data
+        extensions = getattr(execution_result, 'extensions', None)
+        if extensions:
+            response['extensions'] = extensions
+        return response
+
+    def get_patch_data(self, patch):
+        response = self.get_response_data(patch)
+        response['path'] = patch.path
+        if patch.label is not None:
+            response['label'] = patch.label
+        return response
+
+    def iter_multipart(self, request, execution_result):
+        '''
+        Yields the parts of a multipart/mixed response with the initial
+        payload and every patch as they are executed.
+        '''
+        response = self.get_response_data(execution_result)
+        response['hasNext'] = True
+        yield self.get_part(request, response)
+        for patch in execution_result.patches:
+            response = self.get_patch_data(patch)
+            response['hasNext'] = True
+            yield self.get_part(request, response)
+        yield self.get_part(request, {'hasNext': False})
+        yield '\r\n--{}--\r\n'.format(MULTIPART_BOUNDARY)
+
+    def get_part(self, request, response):
+        return '\r\n--{}\r\nContent-Type: application/json; charset=utf-8\r\n\r\n{}'.format(
+            MULTIPART_BOUNDARY, self.json_encode(request, response))
+
+    def execute_graphql_request(self, request):
+        # As in graphql_django_view, with the extensions of the schema
+        query, variables, operation_name = self.get_graphql_params(request, self.parse_body(request))
+        if not query:
+            raise HttpError(HttpResponseBadRequest('Must provide query string.'))
+
+        def run(execution_request):
+            try:
+                return self.execute(
+                    execution_request.document_ast,
+                    root_value=execution_request.root_value,
+                    variable_values=execution_request.variable_values,
+                    operation_name=execution_request.operation_name,
+                    context_value=execution_request.context_value
+                )
+            except Exception as e:
+                return ExecutionResult(errors=[e], invalid=True)
+
+        context = self.get_request_context(request)
+        execution_request = ExecutionRequest(query, self.get_root_value(request), variables, context, operation_name)
+        if request.method.lower() == 'get':
+            try:
+                # Rejected before the extensions start, execute_request
+                # reports the syntax errors
+                execution_request.document_ast = parse(Source(query, name='GraphQL request'))
+            except Exception:
+                pass
+            operation_ast = execution_request.operation
+            if operation_ast and operation_ast.operation != 'query':
+                raise HttpError(HttpResponseNotAllowed(
+                    ['POST'], 'Can only perform a {} operation from a POST request.'.format(
+                        operation_ast.operation)
+                ))
+        return self.graphene_schema.execute_request(execution_request, run)
+
+    def get_request_context(self, request):
+        context = self.get_context(request)
+        profile = self.get_profile_mode(request)
+        if profile:
+            try:
+                context.graphene_profile = profile
+            except AttributeError:
+                pass
+        return context
+
+    def get_profile_mode(self, request):
+        if self.profile_header:
+            return request.META.get('HTTP_' + self.profile_header.upper().replace('-', '_'))
+
+    def execute(self, document_ast, *args, **kwargs):
+        # Kept to encode the data with the serializers of its types
+        self.document_ast = document_ast
+        self.operation_name = kwargs.get('operation_name')
+        if self.incremental:
+            return self.graphene_schema.execute_incremental(document_ast, *args, **kwargs)
+        return self.graphene_schema.execute_document(document_ast, *args, **kwargs)
+
+
+class MetricsView(View):
+    '''
+    Renders a MetricsRegistry in the Prometheus text format.
+    '''
+    registry = None
+
+    def get(self, request, *args, **kwargs):
+        return HttpResponse(self.registry.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
+
+
+def run_in_thread(run):
+    try:
+        return run()
+    finally:
+        # Django opens a connection in every thread that uses the database
+        for connection in connections.all():
+            connection.close()
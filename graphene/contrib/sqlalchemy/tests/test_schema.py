@@ -1,6 +1,8 @@
 from py.test import raises
 
+from graphene import Schema
 from graphene.contrib.sqlalchemy import SQLAlchemyObjectType
+from graphene.contrib.sqlalchemy.utils import get_type_for_model
 from tests.utils import assert_equal_lists
 
 from .models import Reporter
@@ -43,3 +45,16 @@ def test_should_map_only_few_fields():
         Reporter2._meta.fields_map.keys(),
         ['id', 'email']
     )
+
+
+def test_get_type_for_model():
+    schema = Schema()
+
+    class ReporterType3(SQLAlchemyObjectType):
+
+        class Meta:
+            model = Reporter
+
+    assert get_type_for_model(schema, Reporter) is None
+    schema.register(ReporterType3)
+    assert get_type_for_model(schema, Reporter) == ReporterType3
@@ -5,6 +5,7 @@ from sqlalchemy.inspection import inspect as sqlalchemyinspect
 from sqlalchemy.orm.exc import NoResultFound
 
 from ...core.classtypes.objecttype import ObjectType, ObjectTypeMeta
+from ...relay.codecs import default_codec
 from ...relay.types import Node, NodeMeta
 from ...relay.connection import Connection
 from .converter import (convert_sqlalchemy_column,
@@ -110,9 +111,9 @@ class SQLAlchemyNode(six.with_metaclass(
     class Meta:
         abstract = True
 
-    def to_global_id(self):
+    def to_global_id(self, codec=default_codec):
         id_ = getattr(self.instance, self._meta.identifier)
-        return self.global_id(id_)
+        return self.global_id(id_, codec)
 
     @classmethod
     def get_node(cls, id, info=None):
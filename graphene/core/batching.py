@@ -0,0 +1,199 @@
+from functools import partial, wraps
+
+from graphql.execution.base import ResolveInfo, get_field_def
+from graphql.execution.values import get_argument_values
+from graphql.language import ast
+from graphql.type import GraphQLList, GraphQLNonNull
+from promise import Promise, is_thenable
+
+from ..utils.selections import get_response_key
+from ..utils.wrap_resolver_function import wrap_resolver_function
+from .classtypes.base import FieldsClassType
+from .classtypes.objecttype import ObjectType
+from .types.scalars import coerce_list
+
+
+def has_batch_fields(objecttype):
+    return any(getattr(field, 'batch', False) for field in objecttype._meta.local_fields)
+
+
+def get_batch_target(schema, type):
+    '''
+    For a field of the given GraphQL type, returns the ObjectType with
+    batch fields of the items of the list it resolves to, and the
+    attribute of the items that holds them (the node of Relay edges).
+    '''
+    if isinstance(type, GraphQLNonNull):
+        type = type.of_type
+    if not isinstance(type, GraphQLList):
+        return
+    while isinstance(type, (GraphQLList, GraphQLNonNull)):
+        type = type.of_type
+    objecttype = schema.objecttype(type)
+    if not objecttype or not issubclass(objecttype, FieldsClassType):
+        return
+    if has_batch_fields(objecttype):
+        return objecttype, None
+    node_type = getattr(objecttype, 'node_type', None)
+    if node_type and has_batch_fields(node_type):
+        return node_type, 'node'
+
+
+def get_batch_function(resolver):
+    # The resolvers of batch fields get a list of objects instead of self
+    if getattr(resolver, '__self__', True) is None:
+        resolver = resolver.__func__
+    return wrap_resolver_function(resolver)
+
+
+def get_item(index, values):
+    return values[index]
+
+
+def get_list_depth(type):
+    depth = 0
+    while isinstance(type, (GraphQLList, GraphQLNonNull)):
+        if isinstance(type, GraphQLList):
+            depth += 1
+        type = type.of_type
+    return depth
+
+
+def iter_slots(items, depth):
+    '''
+    Yields the lists holding the objects of (nested) lists, with the
+    index of every object. The nested lists are copied into lists, so
+    their objects can be replaced.
+    '''
+    for index, item in enumerate(items):
+        if depth <= 1:
+            yield items, index
+        elif item is not None:
+            item = items[index] = list(item)
+            for slot in iter_slots(item, depth - 1):
+                yield slot
+
+
+def collect_selections(info, selection_sets, path=None, fields=None):
+    '''
+    Returns the field ASTs selected in the given selection sets (or in
+    the selection of their ``path`` field) by response key.
+    '''
+    if fields is None:
+        fields = {}
+    for selection_set in selection_sets:
+        if not selection_set:
+            continue
+        for selection in selection_set.selections:
+            if isinstance(selection, ast.Field):
+                if path is None:
+                    fields.setdefault(get_response_key(selection), selection)
+                elif selection.name.value == path:
+                    collect_selections(info, [selection.selection_set], None, fields)
+                continue
+            if isinstance(selection, ast.FragmentSpread):
+                selection = info.fragments[selection.name.value]
+            collect_selections(info, [selection.selection_set], path, fields)
+    return fields
+
+
+def prefetch_batch_fields(objecttype, path, items, context, info):
+    '''
+    Resolves the batch fields selected in the items of a list with one
+    call of their resolver for all of them, and keeps the results in
+    the items.
+    '''
+    if items is None:
+        return items
+    items = list(items)
+    schema = info.schema.graphene_schema
+    graphql_type = schema.T(objecttype)
+    roots = []
+    for slots, index in iter_slots(items, get_list_depth(info.return_type)):
+        item = slots[index]
+        root = item if path is None or item is None else getattr(item, path)
+        if root is None:
+            continue
+        if not isinstance(root, objecttype):
+            root = objecttype(_root=root)
+            if path is None:
+                slots[index] = root
+            else:
+                setattr(item, path, root)
+        root.__dict__.setdefault('_batch_results', {})
+        roots.append(root)
+    if not roots:
+        return items
+
+    selections = collect_selections(info, [field_ast.selection_set for field_ast in info.field_asts], path)
+    for response_key, field_ast in selections.items():
+        field = schema.get_field(graphql_type, field_ast.name.value)
+        if not field or not getattr(field, 'batch', False):
+            continue
+        field_def = get_field_def(info.schema, graphql_type, field_ast.name.value)
+        args = get_argument_values(field_def.args, field_ast.arguments, info.variable_values)
+        field_info = ResolveInfo(
+            field_ast.name.value,
+            [field_ast],
+            field_def.type,
+            graphql_type,
+            schema=info.schema,
+            fragments=info.fragments,
+            root_value=info.root_value,
+            operation=info.operation,
+            variable_values=info.variable_values,
+        )
+        resolve = schema.resolver_with_middleware(get_batch_function(field.resolver))
+        try:
+            results = Promise.resolve(resolve(roots, args, context, field_info))
+        except Exception as e:
+            # Reported in the field of every object, as a rejected promise
+            results = Promise.reject(e)
+        if results.is_fulfilled:
+            results = results.get()
+        if is_thenable(results):
+            for index, root in enumerate(roots):
+                root._batch_results[response_key] = results.then(partial(get_item, index))
+            continue
+        results = coerce_list(results)
+        assert len(results) == len(roots), 'The batch resolver of {} returned {} results for {} objects'.format(
+            field, len(results), len(roots))
+        for root, result in zip(roots, results):
+            root._batch_results[response_key] = result
+    return items
+
+
+def prefetch_resolver(resolver, objecttype, path):
+    @wraps(resolver)
+    def inner(root, args, context, info):
+        result = resolver(root, args, context, info)
+        if is_thenable(result):
+            return Promise.resolve(result).then(
+                lambda items: prefetch_batch_fields(objecttype, path, items, context, info))
+        return prefetch_batch_fields(objecttype, path, result, context, info)
+    return inner
+
+
+def batch_resolver(field, resolver):
+    '''
+    Resolver of a batch field for a single object: the result computed
+    for the whole list the object is in, or a batch of one.
+    '''
+    batch_function = get_batch_function(resolver)
+    object_type = field.object_type
+
+    @wraps(resolver)
+    def inner(instance, args, context, info):
+        if isinstance(instance, ObjectType):
+            results = instance.__dict__.get('_batch_results')
+            if results:
+                key = get_response_key(info.field_asts[0])
+                if key in results:
+                    return results[key]
+        else:
+            instance = object_type(_root=instance)
+        results = batch_function([instance], args, context, info)
+        if is_thenable(results):
+            return Promise.resolve(results).then(partial(get_item, 0))
+        return coerce_list(results)[0]
+    return inner
@@ -38,7 +38,7 @@ class Interface(six.with_metaclass(InterfaceMeta, ObjectType)):
 
     @classmethod
     def _resolve_type(cls, schema, instance, *args):
-        return schema.T(instance.__class__)
+        return schema.get_type_for_instance(instance)
 
     @classmethod
     def internal_type(cls, schema):
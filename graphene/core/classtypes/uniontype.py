@@ -27,7 +27,7 @@ class UnionType(six.with_metaclass(UnionTypeMeta, FieldsClassType)):
 
     @classmethod
     def _resolve_type(cls, schema, instance, *args):
-        return schema.T(instance.__class__)
+        return schema.get_type_for_instance(instance)
 
     @classmethod
     def internal_type(cls, schema):
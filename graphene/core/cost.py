@@ -0,0 +1,136 @@
+from graphql.error import GraphQLError
+from graphql.execution.base import get_field_def, get_operation_root_type
+from graphql.execution.values import get_argument_values, get_variable_values
+from graphql.language import ast
+from graphql.type.definition import get_named_type
+from graphql.utils.get_operation_ast import get_operation_ast
+
+from ..utils.selections import get_fragments
+
+
+class QueryComplexityError(GraphQLError):
+
+    def __init__(self, message, query_cost, max_cost=None, max_depth=None, nodes=None):
+        super(QueryComplexityError, self).__init__(message, nodes)
+        self.query_cost = query_cost
+        self.max_cost = max_cost
+        self.max_depth = max_depth
+
+    @property
+    def cost(self):
+        return self.query_cost.cost
+
+    @property
+    def depth(self):
+        return self.query_cost.depth
+
+
+class QueryCost(object):
+
+    def __init__(self, cost=0, depth=0):
+        self.cost = cost
+        self.depth = depth
+
+    def __repr__(self):
+        return '<QueryCost cost={} depth={}>'.format(self.cost, self.depth)
+
+
+class QueryCostAnalyzer(object):
+    '''
+    Computes the cost of an operation from the parsed document, before it
+    is executed.
+
+    Every field costs its ``cost`` hint (``default_cost`` when not given),
+    and the cost of its selection is multiplied by the number of items it
+    resolves to: the ``first``/``last`` arguments of a ConnectionField, or
+    ``default_list_size`` when none is given. Fragments on abstract types
+    are all added up, so the result is an upper bound.
+    '''
+
+    def __init__(self, max_cost=None, max_depth=None, default_cost=1, default_list_size=100):
+        self.max_cost = max_cost
+        self.max_depth = max_depth
+        self.default_cost = default_cost
+        self.default_list_size = default_list_size
+
+    def analyze(self, schema, document_ast, operation_name=None, variable_values=None):
+        graphql_schema = schema.schema
+        operation = get_operation_ast(document_ast, operation_name)
+        if not operation:
+            # The executor reports the missing operation
+            return QueryCost()
+        fragments = get_fragments(document_ast)
+        variables = get_variable_values(
+            graphql_schema, operation.variable_definitions or [], variable_values or {})
+        root_type = get_operation_root_type(graphql_schema, operation)
+        cost, depth = self.selection_set_cost(
+            (schema, fragments, variables), root_type, operation.selection_set, 1, 0)
+        return QueryCost(cost, depth)
+
+    def check(self, schema, document_ast, operation_name=None, variable_values=None):
+        '''
+        Returns the cost of the operation, raising a QueryComplexityError if
+        it is over the maximum cost or depth.
+        '''
+        query_cost = self.analyze(schema, document_ast, operation_name, variable_values)
+        if self.max_depth is not None and query_cost.depth > self.max_depth:
+            raise QueryComplexityError(
+                'Query depth {} exceeds the maximum depth of {}.'.format(query_cost.depth, self.max_depth),
+                query_cost, max_cost=self.max_cost, max_depth=self.max_depth)
+        if self.max_cost is not None and query_cost.cost > self.max_cost:
+            raise QueryComplexityError(
+                'Query cost {} exceeds the maximum cost of {}.'.format(query_cost.cost, self.max_cost),
+                query_cost, max_cost=self.max_cost, max_depth=self.max_depth)
+        return query_cost
+
+    def selection_set_cost(self, context, parent_type, selection_set, multiplier, depth):
+        schema, fragments, variables = context
+        total_cost = 0
+        max_depth = depth
+        for selection in selection_set.selections:
+            if isinstance(selection, ast.Field):
+                cost, selection_depth = self.field_cost(context, parent_type, selection, multiplier, depth)
+            else:
+                if isinstance(selection, ast.FragmentSpread):
+                    selection = fragments[selection.name.value]
+                fragment_type = parent_type
+                if selection.type_condition:
+                    fragment_type = schema.schema.get_type(selection.type_condition.name.value)
+                cost, selection_depth = self.selection_set_cost(
+                    context, fragment_type, selection.selection_set, multiplier, depth)
+            total_cost += cost
+            max_depth = max(max_depth, selection_depth)
+        return total_cost, max_depth
+
+    def field_cost(self, context, parent_type, field_ast, multiplier, depth):
+        schema, fragments, variables = context
+        depth += 1
+        field_def = get_field_def(schema.schema, parent_type, field_ast.name.value)
+        if not field_def:
+            return 0, depth
+        field = schema.get_field(parent_type, field_ast.name.value)
+        cost = self.default_cost
+        if field and field.cost is not None:
+            cost = field.cost
+        cost *= multiplier
+        if not field_ast.selection_set:
+            return cost, depth
+
+        field_multiplier = 1
+        if field:
+            args = get_argument_values(field_def.args, field_ast.arguments, variables)
+            field_multiplier = field.get_cost_multiplier(args)
+            if field_multiplier is None:
+                field_multiplier = self.default_list_size
+        selection_cost, depth = self.selection_set_cost(
+            context, get_named_type(field_def.type), field_ast.selection_set,
+            multiplier * field_multiplier, depth)
+        return cost + selection_cost, depth
+
+
+def get_query_cost(context):
+    '''
+    Returns the QueryCost computed for the operation being executed with
+    the given context, if the schema has a cost analyzer.
+    '''
+    return getattr(context, 'query_cost', None)
@@ -0,0 +1,285 @@
+import json
+
+from graphql.language import ast
+from graphql.type import (GraphQLBoolean, GraphQLEnumType, GraphQLFloat,
+                          GraphQLID, GraphQLInt, GraphQLInterfaceType,
+                          GraphQLList, GraphQLNonNull, GraphQLObjectType,
+                          GraphQLString, GraphQLUnionType)
+from graphql.utils.get_operation_ast import get_operation_ast
+
+from ..utils.selections import get_fragments, get_response_key
+
+encode_string = json.encoder.encode_basestring_ascii
+INFINITY = float('inf')
+
+
+def dumps(value):
+    return json.dumps(value, separators=(',', ':'))
+
+
+def encode_int(value):
+    return str(int(value))
+
+
+def encode_float(value):
+    value = float(value)
+    if value != value or value in (INFINITY, -INFINITY):
+        return dumps(value)
+    return repr(value)
+
+
+def encode_boolean(value):
+    return 'true' if value else 'false'
+
+
+def nullable(encode):
+    def inner(value):
+        if value is None:
+            return 'null'
+        return encode(value)
+    return inner
+
+
+def leaf_list(encode):
+    def inner(value):
+        return '[' + ','.join(map(encode, value)) + ']'
+    return inner
+
+
+SCALAR_ENCODERS = {
+    GraphQLString: encode_string,
+    GraphQLID: encode_string,
+    GraphQLInt: encode_int,
+    GraphQLFloat: encode_float,
+    GraphQLBoolean: encode_boolean,
+}
+
+
+class EncodingState(object):
+    '''
+    Selections of the operation being encoded. The fields selected in an
+    object type are collected once for every selection set they come
+    from, and reused for all the objects of that type.
+    '''
+
+    def __init__(self, schema, fragments):
+        self.schema = schema
+        self.fragments = fragments
+        self.plans = {}
+
+    def get_plan(self, serializer, selection_sets):
+        '''
+        Returns how every field selected in the given selection sets of
+        the type of the serializer is encoded, by response key.
+        '''
+        key = (serializer.type, tuple(map(id, selection_sets or ())))
+        plan = self.plans.get(key)
+        if plan is None:
+            fields = self.collect_fields(serializer.type, selection_sets or (), {})
+            plan = self.plans[key] = {
+                response_key: serializer.get_field(response_key, name, children)
+                for response_key, (name, children) in fields.items()
+            }
+        return plan
+
+    def collect_fields(self, type, selection_sets, plan):
+        for selection_set in selection_sets:
+            if not selection_set:
+                continue
+            for selection in selection_set.selections:
+                if isinstance(selection, ast.Field):
+                    response_key = get_response_key(selection)
+                    name, children = plan.get(response_key, (selection.name.value, ()))
+                    if selection.selection_set:
+                        children += (selection.selection_set, )
+                    plan[response_key] = (name, children)
+                    continue
+                if isinstance(selection, ast.FragmentSpread):
+                    selection = self.fragments.get(selection.name.value)
+                    if not selection:
+                        continue
+                if self.does_fragment_apply(type, selection.type_condition):
+                    self.collect_fields(type, [selection.selection_set], plan)
+        return plan
+
+    def does_fragment_apply(self, type, type_condition):
+        if not type_condition or type_condition.name.value == type.name:
+            return True
+        condition = self.schema.get_type(type_condition.name.value)
+        if isinstance(condition, (GraphQLInterfaceType, GraphQLUnionType)):
+            return self.schema.is_possible_type(condition, type)
+        return False
+
+
+class ObjectSerializer(object):
+    '''
+    Serializer of the results of a GraphQL object type, with an encoder
+    precompiled for every field of the type.
+    '''
+
+    def __init__(self, type):
+        self.type = type
+        self.fields = {'__typename': (True, encode_string)}
+
+    def compile(self, encoder):
+        for name, field in self.type.get_fields().items():
+            self.fields[name] = encoder.compile(field.type)
+
+    def get_field(self, response_key, name, children):
+        leaf, encode = self.fields.get(name, GENERIC)
+        return encode_string(response_key) + ':', leaf, encode, children
+
+    def iterencode(self, value, selection_sets, state):
+        plan = state.get_plan(self, selection_sets)
+        parts = ['{']
+        separator = ''
+        for key, item in value.items():
+            field = plan.get(key)
+            if field is None:
+                field = plan[key] = self.get_field(key, key, None)
+            prefix, leaf, encode, children = field
+            if item is None:
+                parts.append(separator + prefix + 'null')
+            elif leaf:
+                parts.append(separator + prefix + encode(item))
+            else:
+                parts.append(separator + prefix)
+                yield ''.join(parts)
+                parts = []
+                for chunk in encode(item, children, state):
+                    yield chunk
+            separator = ','
+        parts.append('}')
+        yield ''.join(parts)
+
+
+def iterencode_generic(value, selection_sets=None, state=None):
+    return json.JSONEncoder(separators=(',', ':')).iterencode(value)
+
+
+GENERIC = (False, iterencode_generic)
+
+
+class ResponseEncoder(object):
+    '''
+    Encodes GraphQL responses as JSON in chunks of about ``chunk_size``
+    characters, so big results can be streamed without building the
+    whole document in memory.
+
+    The values of the fields are encoded with serializers precompiled
+    for every object type of the schema, which know the kind of every
+    scalar ahead of time. The data is only encoded with them when the
+    document of the operation is given, otherwise it is encoded as
+    plain JSON.
+    '''
+
+    def __init__(self, schema, chunk_size=64 * 1024):
+        self.schema = schema
+        self.chunk_size = chunk_size
+        self._serializers = {}
+
+    def get_serializer(self, type):
+        serializer = self._serializers.get(type)
+        if serializer is None:
+            # Registered before compiling the fields, for recursive types
+            serializer = self._serializers[type] = ObjectSerializer(type)
+            serializer.compile(self)
+        return serializer
+
+    def compile(self, type):
+        '''
+        Returns whether values of the given GraphQL type are leaves, and
+        the function that encodes them.
+        '''
+        if isinstance(type, GraphQLNonNull):
+            type = type.of_type
+        if isinstance(type, GraphQLList):
+            leaf, encode = self.compile(type.of_type)
+            if leaf:
+                return True, leaf_list(nullable(encode))
+            return False, self.list_encoder(encode)
+        if type in SCALAR_ENCODERS:
+            return True, SCALAR_ENCODERS[type]
+        if isinstance(type, GraphQLEnumType):
+            return True, encode_string
+        if isinstance(type, GraphQLObjectType):
+            return False, self.get_serializer(type).iterencode
+        if isinstance(type, (GraphQLInterfaceType, GraphQLUnionType)):
+            return False, self.iterencode_abstract
+        return True, dumps
+
+    def list_encoder(self, encode):
+        def iterencode_list(value, selection_sets, state):
+            yield '['
+            first = True
+            for item in value:
+                if first:
+                    first = False
+                else:
+                    yield ','
+                if item is None:
+                    yield 'null'
+                    continue
+                for chunk in encode(item, selection_sets, state):
+                    yield chunk
+            yield ']'
+        return iterencode_list
+
+    def iterencode_abstract(self, value, selection_sets, state):
+        # The type of abstract values is only known if __typename is selected
+        type = state.schema.get_type(value.get('__typename')) if '__typename' in value else None
+        if isinstance(type, GraphQLObjectType):
+            return self.get_serializer(type).iterencode(value, selection_sets, state)
+        return iterencode_generic(value)
+
+    def get_root_type(self, schema, operation):
+        if operation.operation == 'mutation':
+            return schema.get_mutation_type()
+        if operation.operation == 'subscription':
+            return schema.get_subscription_type()
+        return schema.get_query_type()
+
+    def iterencode_response(self, response, document_ast=None, operation_name=None):
+        operation = document_ast and get_operation_ast(document_ast, operation_name)
+        first = True
+        yield '{'
+        for key, value in response.items():
+            if first:
+                first = False
+            else:
+                yield ','
+            yield encode_string(key) + ':'
+            if key != 'data' or value is None or not operation:
+                for chunk in iterencode_generic(value):
+                    yield chunk
+                continue
+            schema = self.schema.schema
+            state = EncodingState(schema, get_fragments(document_ast))
+            serializer = self.get_serializer(self.get_root_type(schema, operation))
+            for chunk in serializer.iterencode(value, [operation.selection_set], state):
+                yield chunk
+        yield '}'
+
+    def iterencode(self, response, document_ast=None, operation_name=None):
+        '''
+        Yields the JSON of a response (a mapping with the ``data`` and
+        ``errors`` of an execution result) in chunks.
+        '''
+        chunks = []
+        size = 0
+        for chunk in self.iterencode_response(response, document_ast, operation_name):
+            chunks.append(chunk)
+            size += len(chunk)
+            if size >= self.chunk_size:
+                yield ''.join(chunks)
+                chunks = []
+                size = 0
+        if chunks:
+            yield ''.join(chunks)
+
+    def encode(self, response, document_ast=None, operation_name=None):
+        return ''.join(self.iterencode(response, document_ast, operation_name))
+
+    def dump(self, response, fp, document_ast=None, operation_name=None):
+        for chunk in self.iterencode(response, document_ast, operation_name):
+            fp.write(chunk)
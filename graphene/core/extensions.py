@@ -0,0 +1,149 @@
+from graphql import Source, parse, validate
+from graphql.execution import ExecutionResult
+from graphql.utils.get_operation_ast import get_operation_ast
+from promise import Promise, is_thenable
+
+from ..metrics import clock
+from ..utils.awaitables import iscoroutine, promise_from_awaitable
+
+
+class Extension(object):
+    '''
+    Base class of the extensions of a Schema, that observe the phases of
+    the operations run with Schema.execute (and GraphQLView).
+
+    The hooks get the ExecutionRequest of the operation:
+    ``on_request_start`` before it is parsed, ``on_parse`` once it is
+    parsed, ``on_validate`` once it is validated (even with errors),
+    ``on_execute`` before it is executed and ``on_result`` with its
+    result, returning the result to use instead or None.
+
+    A hook can return a Promise, or a coroutine in execute_async, and the
+    operation goes on when it resolves. Extensions do not need to
+    subclass Extension, the hooks they do not have are skipped.
+    '''
+
+    def on_request_start(self, request):
+        pass
+
+    def on_parse(self, request):
+        pass
+
+    def on_validate(self, request):
+        pass
+
+    def on_execute(self, request):
+        pass
+
+    def on_result(self, request, result):
+        pass
+
+
+class ExecutionRequest(object):
+    '''
+    An operation going through its phases. The extensions can keep
+    their own state in it. The ``document_ast`` of a request that is
+    already parsed can be set, so it is not parsed again.
+    '''
+
+    def __init__(self, request_string, root_value=None, variable_values=None,
+                 context_value=None, operation_name=None):
+        self.request_string = request_string
+        self.root_value = root_value
+        self.variable_values = variable_values
+        self.context_value = context_value
+        self.operation_name = operation_name
+        self.document_ast = None
+        self.validation_errors = None
+        self.start = clock()
+
+    @property
+    def operation(self):
+        if self.document_ast:
+            return get_operation_ast(self.document_ast, self.operation_name)
+
+
+def get_pending(value):
+    if iscoroutine(value):
+        return promise_from_awaitable(value)
+    if is_thenable(value):
+        return value
+
+
+def run_hooks(extensions, name, *args):
+    '''
+    Calls the hook of every extension, returning a Promise if any of
+    them has to be waited for.
+    '''
+    pending = []
+    for extension in extensions:
+        hook = getattr(extension, name, None)
+        value = hook and get_pending(hook(*args))
+        if value is not None:
+            pending.append(value)
+    if pending:
+        return Promise.all(pending)
+
+
+def run_result_hooks(extensions, request, result):
+    for index, extension in enumerate(extensions):
+        hook = getattr(extension, 'on_result', None)
+        if not hook:
+            continue
+        value = hook(request, result)
+        pending = get_pending(value)
+        if pending is not None:
+            rest = extensions[index + 1:]
+            return Promise.resolve(pending).then(
+                lambda value: run_result_hooks(rest, request, result if value is None else value))
+        if value is not None:
+            result = value
+    return result
+
+
+def after(pending, callback, *args):
+    if pending is not None:
+        return Promise.resolve(pending).then(lambda _: callback(*args))
+    return callback(*args)
+
+
+def then(value, callback):
+    if is_thenable(value):
+        return Promise.resolve(value).then(callback)
+    return callback(value)
+
+
+def execute_request(schema, request, execute, return_promise=False):
+    '''
+    Parses, validates and executes (with ``execute(request)``) an
+    operation, calling the hooks of the extensions of the schema.
+    '''
+    extensions = schema.extensions
+
+    def finish(result):
+        return run_result_hooks(extensions, request, result)
+
+    def run_parse():
+        if request.document_ast is None:
+            try:
+                request.document_ast = parse(Source(request.request_string, 'GraphQL request'))
+            except Exception as e:
+                return finish(ExecutionResult(errors=[e], invalid=True))
+        return after(run_hooks(extensions, 'on_parse', request), run_validate)
+
+    def run_validate():
+        try:
+            request.validation_errors = validate(schema.schema, request.document_ast)
+        except Exception as e:
+            return finish(ExecutionResult(errors=[e], invalid=True))
+        return after(run_hooks(extensions, 'on_validate', request), run_execute)
+
+    def run_execute():
+        if request.validation_errors:
+            return finish(ExecutionResult(errors=request.validation_errors, invalid=True))
+        return after(run_hooks(extensions, 'on_execute', request), lambda: then(execute(request), finish))
+
+    result = after(run_hooks(extensions, 'on_request_start', request), run_parse)
+    if not return_promise and is_thenable(result):
+        return Promise.resolve(result).get()
+    return result
@@ -0,0 +1,463 @@
+import copy
+from collections import deque
+
+from graphql.execution.base import (ExecutionContext, collect_fields,
+                                    get_field_def)
+from graphql.execution.executor import (complete_value_catching_error,
+                                        execute_fields,
+                                        get_default_resolve_type_fn)
+from graphql.execution.executors.sync import SyncExecutor
+from graphql.execution.values import get_argument_values
+from graphql.language import ast
+from graphql.pyutils.default_ordered_dict import DefaultOrderedDict
+from graphql.type import (GraphQLArgument, GraphQLBoolean, GraphQLInt,
+                          GraphQLInterfaceType, GraphQLList, GraphQLNonNull,
+                          GraphQLString, GraphQLUnionType)
+from graphql.type.definition import get_named_type
+from graphql.type.directives import DirectiveLocation, GraphQLDirective
+from graphql.utils.get_operation_ast import get_operation_ast
+from promise import Promise
+
+from ..utils.paths import PathTracker, is_leaf_type
+from ..utils.selections import get_fragments, get_response_key
+from .results import ExecutionResult
+
+try:
+    StopAsyncIteration = StopAsyncIteration
+except NameError:
+    class StopAsyncIteration(Exception):
+        pass
+
+GraphQLDeferDirective = GraphQLDirective(
+    name='defer',
+    description='Delivers the fragment after the initial payload.',
+    args={
+        'if': GraphQLArgument(GraphQLBoolean, default_value=True),
+        'label': GraphQLArgument(GraphQLString),
+    },
+    locations=[
+        DirectiveLocation.FRAGMENT_SPREAD,
+        DirectiveLocation.INLINE_FRAGMENT,
+    ]
+)
+
+GraphQLStreamDirective = GraphQLDirective(
+    name='stream',
+    description='Delivers the items of a list (or the edges of a connection) '
+                'after the first initialCount ones after the initial payload.',
+    args={
+        'initialCount': GraphQLArgument(GraphQLInt, default_value=0),
+        'if': GraphQLArgument(GraphQLBoolean, default_value=True),
+        'label': GraphQLArgument(GraphQLString),
+    },
+    locations=[
+        DirectiveLocation.FIELD,
+    ]
+)
+
+
+def get_directive_values(directive, node, variable_values):
+    '''
+    Returns the arguments of the directive in the node, or None when the
+    directive is not there or is disabled with ``if: false``.
+    '''
+    for directive_ast in node.directives or ():
+        if directive_ast.name.value == directive.name:
+            values = get_argument_values(directive.args, directive_ast.arguments, variable_values)
+            if values.get('if'):
+                return values
+
+
+def get_keys(path):
+    return tuple(key for key in path if not isinstance(key, int))
+
+
+class Incremental(object):
+    '''
+    A deferred fragment or a streamed list field, and the selections
+    (fields and fragments) that lead to it from the operation.
+
+    The values it is resolved against are captured while the operation
+    is executed: the values of the field the fragment is in (the parents)
+    or the whole list of the streamed field.
+    '''
+
+    def __init__(self, path, node, label=None, initial_count=None):
+        self.path = path
+        self.node = node
+        self.label = label
+        self.initial_count = initial_count
+        fields = [node for node in path if isinstance(node, ast.Field)]
+        if self.is_stream:
+            fields.append(node)
+        # The field whose values are captured, None for the root
+        self.field = fields[-1] if fields else None
+        self.keys = tuple(get_response_key(field) for field in fields)
+        self.values = []
+
+    @property
+    def is_stream(self):
+        return self.initial_count is not None
+
+    def add_value(self, path, value, info):
+        self.values.append((path, value, info))
+
+
+class IncrementalPlan(object):
+    '''
+    The deferred fragments and streamed fields of a query operation.
+
+    The initial payload is the result of a copy of the document without
+    the deferred fragments, where the streamed lists are cut to their
+    initial count. The copies of the nodes are shared by the initial
+    payload and the patches, so the values of the fields are captured
+    wherever they are resolved.
+    '''
+
+    def __init__(self, schema, document_ast, operation, variable_values):
+        self.schema = schema
+        self.operation = operation
+        self.variable_values = variable_values or {}
+        self.fragments = get_fragments(document_ast)
+        self.deferred = []
+        self.streams = []
+        self.collect(schema.get_query_type(), operation.selection_set, [], False)
+        self.copies = {}
+        self.removed = set(id(deferred.node) for deferred in self.deferred)
+        self.fragment_definitions = [self.strip(fragment) for fragment in self.fragments.values()]
+        self.captured = {}
+        for incremental in self.patches:
+            if incremental.field is not None:
+                self.captured.setdefault(id(self.strip(incremental.field)), []).append(incremental)
+
+    def __bool__(self):
+        return bool(self.deferred or self.streams)
+
+    __nonzero__ = __bool__
+
+    @property
+    def patches(self):
+        # The streamed items are delivered before the deferred fragments
+        # that could be in them
+        return self.streams + self.deferred
+
+    def collect(self, type, selection_set, path, nested):
+        for selection in selection_set.selections:
+            if isinstance(selection, ast.Field):
+                field_def = type and get_field_def(self.schema, type, selection.name.value)
+                field_type = field_def and field_def.type
+                stream = not nested and get_directive_values(GraphQLStreamDirective, selection, self.variable_values)
+                if stream and field_type:
+                    self.add_stream(selection, field_type, path, stream)
+                if selection.selection_set:
+                    self.collect(get_named_type(field_type), selection.selection_set,
+                                 path + [selection], nested or bool(stream))
+                continue
+            defer = get_directive_values(GraphQLDeferDirective, selection, self.variable_values)
+            if defer:
+                self.deferred.append(Incremental(path, selection, defer.get('label')))
+            fragment = selection
+            if isinstance(selection, ast.FragmentSpread):
+                fragment = self.fragments[selection.name.value]
+            fragment_type = type
+            if fragment.type_condition:
+                fragment_type = self.schema.get_type(fragment.type_condition.name.value)
+            self.collect(fragment_type, fragment.selection_set, path + [selection], nested or bool(defer))
+
+    def add_stream(self, field_ast, field_type, path, stream):
+        if isinstance(field_type, GraphQLNonNull):
+            field_type = field_type.of_type
+        initial_count = max(stream.get('initialCount'), 0)
+        if isinstance(field_type, GraphQLList):
+            self.streams.append(Incremental(path, field_ast, stream.get('label'), initial_count))
+            return
+        # The edges of connections are streamed
+        edges = field_type.get_fields().get('edges') if hasattr(field_type, 'get_fields') else None
+        edges_type = edges and edges.type
+        if isinstance(edges_type, GraphQLNonNull):
+            edges_type = edges_type.of_type
+        if not isinstance(edges_type, GraphQLList):
+            return
+        for selection in field_ast.selection_set.selections if field_ast.selection_set else ():
+            if isinstance(selection, ast.Field) and selection.name.value == 'edges':
+                self.streams.append(Incremental(path + [field_ast], selection, stream.get('label'), initial_count))
+
+    def strip(self, node):
+        '''
+        Returns the copy of the node without the deferred fragments.
+        '''
+        if not getattr(node, 'selection_set', None):
+            return node
+        stripped = self.copies.get(id(node))
+        if stripped is None:
+            stripped = copy.copy(node)
+            stripped.loc = None
+            stripped.selection_set = ast.SelectionSet(selections=[
+                self.strip(selection) for selection in node.selection_set.selections
+                if id(selection) not in self.removed
+            ])
+            self.copies[id(node)] = stripped
+        return stripped
+
+    def get_initial_document(self):
+        operation = self.strip(self.operation)
+        return ast.Document(definitions=[operation] + self.fragment_definitions)
+
+    def get_captured(self, path, info):
+        '''
+        Returns the deferred fragments and streamed fields whose values
+        are captured in the field.
+        '''
+        captured = self.captured.get(id(info.field_asts[0]))
+        if not captured:
+            return ()
+        keys = get_keys(path)
+        # The same fragment can be spread in other paths
+        return [incremental for incremental in captured if incremental.keys == keys]
+
+
+def expand_lists(value, path):
+    if isinstance(value, list):
+        for index, item in enumerate(value):
+            for location in expand_lists(item, path + [index]):
+                yield location
+    elif value is not None:
+        yield value, path
+
+
+def get_runtime_type(exe_context, return_type, value, info):
+    type = get_named_type(return_type)
+    if isinstance(type, (GraphQLInterfaceType, GraphQLUnionType)):
+        if type.resolve_type:
+            return type.resolve_type(value, exe_context.context_value, info)
+        return get_default_resolve_type_fn(value, exe_context.context_value, info, type)
+    return type
+
+
+class ExecutionPatch(ExecutionResult):
+    '''
+    The result of a deferred fragment or of an item of a streamed list,
+    and where it goes in the data of the initial payload.
+    '''
+    __slots__ = 'path', 'label'
+
+    def __init__(self, data=None, errors=None, path=None, label=None):
+        super(ExecutionPatch, self).__init__(data, errors)
+        self.path = path
+        self.label = label
+
+
+class ExecutionPatches(object):
+    '''
+    Iterator of the patches of an incremental result. Every deferred
+    fragment or streamed field is executed when its first patch is
+    requested, with ``next()`` or (with asyncio) ``async for``, against
+    the values captured when its parents were resolved.
+    '''
+
+    def __init__(self, schema, plan, executor, root_value=None, variable_values=None,
+                 context_value=None, operation_name=None):
+        self.schema = schema
+        self.plan = plan
+        self.executor = executor
+        self.root_value = root_value
+        self.variable_values = variable_values
+        self.context_value = context_value
+        self.operation_name = operation_name
+        self.pending = deque(plan.patches)
+        self.patches = deque()
+        self.loop = None
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        while not self.patches:
+            if not self.pending:
+                self.executor.finish()
+                raise StopIteration()
+            promise = self.execute(self.pending.popleft())
+            self.executor.wait_until_finished()
+            self.patches.extend(promise.get())
+        return self.patches.popleft()
+
+    next = __next__
+
+    def __aiter__(self):
+        return self
+
+    def __anext__(self):
+        from ..utils.awaitables import asyncio, awaiting_in, future_from_promise
+        loop = self.loop or asyncio.get_event_loop()
+        with awaiting_in(loop):
+            return future_from_promise(self.next_promise(), loop)
+
+    def next_promise(self):
+        if self.patches:
+            return Promise.resolve(self.patches.popleft())
+        if not self.pending:
+            self.executor.finish()
+            return Promise.rejected(StopAsyncIteration())
+
+        def add_patches(patches):
+            self.patches.extend(patches)
+            return self.next_promise()
+        return self.execute(self.pending.popleft()).then(add_patches)
+
+    def get_context(self):
+        return ExecutionContext(
+            self.schema.schema,
+            self.plan.get_initial_document(),
+            self.root_value,
+            self.context_value,
+            self.variable_values or {},
+            self.operation_name,
+            self.executor
+        )
+
+    def execute(self, incremental):
+        '''
+        Returns a promise for the patches of the deferred fragment or
+        streamed field. Each patch has its own errors.
+        '''
+        exe_context = self.get_context()
+        patches = []
+        for path, value, info in incremental.values:
+            if incremental.is_stream:
+                list_type = info.return_type
+                if isinstance(list_type, GraphQLNonNull):
+                    list_type = list_type.of_type
+                for index in range(incremental.initial_count, len(value)):
+                    patches.append(self.execute_patch(
+                        exe_context, incremental, list(path) + [index],
+                        complete_value_catching_error, list_type.of_type, info.field_asts, info, value[index]))
+                continue
+            return_type = info.return_type if info else exe_context.schema.get_query_type()
+            selection_set = ast.SelectionSet(selections=[self.plan.strip(incremental.node)])
+            # The root value of the operation can be None
+            parents = expand_lists(value, list(path)) if info else [(value, [])]
+            for parent, parent_path in parents:
+                patches.append(self.execute_patch(
+                    exe_context, incremental, parent_path,
+                    execute_selection_set, return_type, selection_set, info, parent))
+        return Promise.all(patches).then(lambda patches: [patch for patch in patches if patch])
+
+    def execute_patch(self, exe_context, incremental, path, execute, *args):
+        # The errors of every patch are kept apart
+        exe_context = copy.copy(exe_context)
+        exe_context.errors = []
+
+        def on_rejected(error):
+            exe_context.errors.append(error)
+            return None
+
+        def get_patch(data):
+            if not data and not exe_context.errors and not incremental.is_stream:
+                # The fragment does not apply to the type of the parent
+                return None
+            return ExecutionPatch(data, exe_context.errors or None, path=path, label=incremental.label)
+        return Promise(
+            lambda resolve, reject: resolve(execute(exe_context, *args))
+        ).catch(on_rejected).then(get_patch)
+
+
+def execute_selection_set(exe_context, return_type, selection_set, info, value):
+    runtime_type = get_runtime_type(exe_context, return_type, value, info)
+    fields = collect_fields(exe_context, runtime_type, selection_set, DefaultOrderedDict(list), set())
+    return execute_fields(exe_context, runtime_type, value, fields)
+
+
+class IncrementalExecutionResult(ExecutionResult):
+    '''
+    The initial payload of an operation with deferred fragments or
+    streamed fields, and the iterator of the patches that complete it.
+    '''
+    __slots__ = 'patches',
+
+    def __init__(self, data=None, errors=None, patches=None, extensions=None):
+        super(IncrementalExecutionResult, self).__init__(data, errors, extensions=extensions)
+        self.patches = patches
+
+
+class IncrementalExecutor(object):
+    '''
+    graphql-core executor that captures the values the deferred fragments
+    and streamed fields are resolved against, and cuts the streamed lists
+    of the initial payload to their initial count.
+    '''
+
+    def __init__(self, executor, plan):
+        self.executor = executor
+        self.plan = plan
+        self.paths = PathTracker()
+
+    def wait_until_finished(self):
+        return self.executor.wait_until_finished()
+
+    def finish(self):
+        self.paths.clear()
+
+    def execute(self, fn, root, args, context, info):
+        captured = self.plan.captured.get(id(info.field_asts[0]))
+        if not captured and is_leaf_type(info.return_type):
+            return self.executor.execute(fn, root, args, context, info)
+        path = self.paths.get_path(root, info)
+        result = Promise.resolve(self.executor.execute(fn, root, args, context, info))
+        if result.is_fulfilled:
+            return self.add_value(path, result.value, info)
+        return result.then(lambda value: self.add_value(path, value, info))
+
+    def add_value(self, path, value, info):
+        value = self.paths.add_value(path, value, info)
+        if value is None:
+            return value
+        cut = value
+        for incremental in self.plan.get_captured(path, info):
+            if incremental.is_stream:
+                value = value if isinstance(value, (list, tuple)) else list(value)
+                cut = value[:incremental.initial_count]
+            incremental.add_value(path, value, info)
+        return cut
+
+
+def execute_incremental(schema, document_ast, root_value=None, variable_values=None,
+                        context_value=None, operation_name=None, executor=None, return_promise=False):
+    operation = get_operation_ast(document_ast, operation_name)
+    plan = None
+    if schema.incremental and operation and operation.operation == 'query':
+        plan = IncrementalPlan(schema.schema, document_ast, operation, variable_values)
+    execute_options = dict(
+        root_value=root_value,
+        variable_values=variable_values,
+        context_value=context_value,
+        operation_name=operation_name,
+    )
+    if not plan:
+        return schema.execute_document(
+            document_ast, executor=executor, return_promise=return_promise, **execute_options)
+
+    # The cost of the deferred fragments and streamed items counts too
+    schema.check_cost(document_ast, operation_name, variable_values, context_value)
+    for deferred in plan.deferred:
+        if deferred.field is None:
+            deferred.add_value((), root_value, None)
+    initial_executor = IncrementalExecutor(schema.get_executor(executor) or SyncExecutor(), plan)
+    # The values of the patches are captured while the initial document is
+    # executed, so its result can not come from the response cache or
+    # another operation
+    result = schema.run_document(
+        plan.get_initial_document(),
+        executor=initial_executor,
+        return_promise=return_promise,
+        shared=False,
+        **execute_options
+    )
+    patches = ExecutionPatches(schema, plan, initial_executor, **execute_options)
+
+    def get_result(result):
+        if result.invalid:
+            return result
+        return IncrementalExecutionResult(result.data, result.errors, patches)
+    if return_promise:
+        return Promise.resolve(result).then(get_result)
+    return get_result(result)
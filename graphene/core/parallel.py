@@ -0,0 +1,75 @@
+from collections import deque
+from functools import partial
+from threading import Lock
+
+from promise import Promise
+
+from ..utils.awaitables import call_awaiting_in, get_awaiting_loop, iscoroutinefunction
+
+
+class ParallelExecutor(object):
+    '''
+    graphql-core executor that runs the resolvers of sibling fields
+    concurrently in the thread pool of the schema.
+
+    Only fields with their own resolver are dispatched; default getters,
+    coroutine functions and fields with a ``run_in`` are resolved in
+    place. The coroutines returned by the dispatched resolvers are
+    awaited in the event loop of the operation (see execute_async). The fields of
+    mutations are always resolved in order. At most ``max_concurrency``
+    resolvers of the operation run at the same time, the rest wait for
+    one of them to finish.
+
+    A new executor has to be used for every operation.
+    '''
+
+    def __init__(self, schema, max_concurrency=None):
+        self.schema = schema
+        self.pool = schema.thread_pool
+        self.max_concurrency = max_concurrency or self.pool.max_workers
+        self.loop = None
+        self.in_flight = 0
+        self.dispatched = 0
+        self._pending = deque()
+        self._lock = Lock()
+
+    def wait_until_finished(self):
+        pass
+
+    def is_parallel(self, info):
+        if info.operation.operation == 'mutation':
+            return False
+        field = self.schema.get_field(info.parent_type, info.field_name)
+        if not field or not field.has_custom_resolver() or field.get_run_in(self.schema):
+            return False
+        # They do not block, and are awaited in the event loop anyway
+        resolver = field.resolver
+        return not iscoroutinefunction(getattr(resolver, '__func__', resolver))
+
+    def execute(self, fn, root, args, context, info):
+        if not self.is_parallel(info):
+            return fn(root, args, context, info)
+        # Known in the thread of the operation, not in the workers
+        self.loop = get_awaiting_loop() or self.loop
+        call = ('{}.{}'.format(info.parent_type.name, info.field_name), fn, root, args, context, info)
+        with self._lock:
+            self.dispatched += 1
+            if self.in_flight >= self.max_concurrency:
+                return Promise(lambda resolve, reject: self._pending.append((call, resolve)))
+            self.in_flight += 1
+        return self.start(call)
+
+    def start(self, call):
+        if self.loop:
+            call = (call[0], partial(call_awaiting_in, self.loop, call[1])) + call[2:]
+        promise = self.pool.submit(*call)
+        promise.then(self.release, self.release)
+        return promise
+
+    def release(self, value=None):
+        with self._lock:
+            if not self._pending:
+                self.in_flight -= 1
+                return
+            call, resolve = self._pending.popleft()
+        resolve(self.start(call))
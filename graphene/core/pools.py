@@ -0,0 +1,229 @@
+import multiprocessing
+import pickle
+import time
+from collections import defaultdict
+from functools import wraps
+from threading import Lock, Timer
+
+from promise import Promise
+
+from ..utils.awaitables import promise_from_future
+from ..utils.wrap_resolver_function import wrap_resolver_function
+
+try:
+    from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+except ImportError:
+    ProcessPoolExecutor = ThreadPoolExecutor = None
+
+
+class WaitStats(object):
+    '''
+    Time the calls of a field waited in the queue of a pool before
+    running.
+    '''
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    @property
+    def average(self):
+        return self.total / self.count if self.count else 0.0
+
+    def add(self, wait):
+        self.count += 1
+        self.total += wait
+        if wait > self.max:
+            self.max = wait
+
+    def __repr__(self):
+        return '<WaitStats count={} average={:.6f} max={:.6f}>'.format(self.count, self.average, self.max)
+
+
+class ResolverPool(object):
+    '''
+    Runs resolvers out of the executing thread, returning a Promise for
+    their result.
+    '''
+
+    def __init__(self, max_workers=None, timer=time.time):
+        self.max_workers = max_workers or multiprocessing.cpu_count() * 5
+        self.timer = timer
+        self.queued = 0
+        self.running = 0
+        self.completed = 0
+        self.wait_stats = defaultdict(WaitStats)
+        self._lock = Lock()
+        self._executor = None
+
+    @property
+    def executor(self):
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = self.create_executor()
+        return self._executor
+
+    def create_executor(self):
+        raise NotImplementedError('create_executor is not implemented in {}'.format(self.__class__.__name__))
+
+    def wrap(self, field, resolver):
+        field_name = str(field)
+
+        @wraps(resolver)
+        def inner(root, args, context, info):
+            return self.submit(field_name, resolver, root, args, context, info)
+        return inner
+
+    def submit(self, field_name, fn, *args):
+        submitted = self.timer()
+        with self._lock:
+            self.queued += 1
+
+        def run():
+            started = self.timer()
+            with self._lock:
+                self.queued -= 1
+                self.running += 1
+                self.wait_stats[field_name].add(started - submitted)
+            try:
+                return fn(*args)
+            finally:
+                with self._lock:
+                    self.running -= 1
+                    self.completed += 1
+        return promise_from_future(self.executor.submit(run))
+
+    def shutdown(self, wait=True):
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait)
+            self._executor = None
+
+
+class ThreadResolverPool(ResolverPool):
+    '''
+    Runs blocking resolvers in a ThreadPoolExecutor of ``max_workers``
+    threads, so sibling fields don't wait for each other.
+    '''
+
+    def create_executor(self):
+        assert ThreadPoolExecutor, 'Running resolvers in threads requires concurrent.futures (the futures package)'
+        return ThreadPoolExecutor(max_workers=self.max_workers)
+
+
+def run_batch(object_type, resolver, calls):
+    '''
+    Runs a batch of calls of a resolver in a worker process, where there
+    is no context nor info to give to it.
+    '''
+    started = time.time()
+    resolver = wrap_resolver_function(resolver)
+    results = []
+    for root, args in calls:
+        if not isinstance(root, object_type):
+            root = object_type(_root=root)
+        try:
+            results.append((True, resolver(root, args, None, None)))
+        except Exception as e:
+            results.append((False, e))
+    return started, results
+
+
+class Batch(object):
+
+    def __init__(self, object_type, resolver):
+        self.object_type = object_type
+        self.resolver = resolver
+        self.calls = []
+
+
+class ProcessResolverPool(ResolverPool):
+    '''
+    Runs CPU bound resolvers in a ProcessPoolExecutor.
+
+    The resolver, its root and arguments are pickled to the worker, and
+    it is called with None as context and info. Calls of a field made
+    within ``batch_wait`` seconds are sent together, up to
+    ``batch_size`` calls per task.
+    '''
+
+    def __init__(self, max_workers=None, batch_size=1, batch_wait=0.001, timer=time.time):
+        super(ProcessResolverPool, self).__init__(max_workers or multiprocessing.cpu_count(), timer)
+        self.batch_size = batch_size
+        self.batch_wait = batch_wait
+        self.tasks = 0
+        self._batches = {}
+
+    def create_executor(self):
+        assert ProcessPoolExecutor, 'Running resolvers in processes requires concurrent.futures (the futures package)'
+        return ProcessPoolExecutor(max_workers=self.max_workers)
+
+    def wrap(self, field, resolver):
+        field_name = str(field)
+        object_type = field.object_type
+        resolver = field.get_resolver_fn()
+        try:
+            pickle.dumps((object_type, resolver))
+        except Exception as e:
+            raise AssertionError('The resolver of {} must be picklable to run in a process: {}'.format(field, e))
+
+        @wraps(resolver)
+        def inner(root, args, context, info):
+            return self.submit_call(field_name, object_type, resolver, root, dict(args.items()))
+        return inner
+
+    def submit_call(self, field_name, object_type, resolver, root, args):
+        call = [root, args, self.timer()]
+        promise = Promise(lambda resolve, reject: call.extend((resolve, reject)))
+        with self._lock:
+            self.queued += 1
+            batch = self._batches.get(field_name)
+            if batch is None:
+                batch = self._batches[field_name] = Batch(object_type, resolver)
+                if self.batch_size > 1:
+                    flush = Timer(self.batch_wait, self.flush, (field_name, batch))
+                    flush.daemon = True
+                    flush.start()
+            batch.calls.append(call)
+            full = len(batch.calls) >= self.batch_size
+            if full:
+                del self._batches[field_name]
+        if full:
+            self.dispatch(field_name, batch)
+        return promise
+
+    def flush(self, field_name, batch):
+        with self._lock:
+            if self._batches.get(field_name) is not batch:
+                return
+            del self._batches[field_name]
+        self.dispatch(field_name, batch)
+
+    def dispatch(self, field_name, batch):
+        calls = batch.calls
+        with self._lock:
+            self.queued -= len(calls)
+            self.running += len(calls)
+            self.tasks += 1
+        future = self.executor.submit(
+            run_batch, batch.object_type, batch.resolver, [(root, args) for root, args, _, _, _ in calls])
+        future.add_done_callback(lambda future: self.finish(field_name, calls, future))
+
+    def finish(self, field_name, calls, future):
+        with self._lock:
+            self.running -= len(calls)
+            self.completed += len(calls)
+        error = future.exception()
+        if error is not None:
+            for _, _, _, resolve, reject in calls:
+                reject(error)
+            return
+        started, results = future.result()
+        wait_stats = self.wait_stats[field_name]
+        for (_, _, submitted, resolve, reject), (ok, value) in zip(calls, results):
+            wait_stats.add(started - submitted)
+            if ok:
+                resolve(value)
+            else:
+                reject(value)
@@ -0,0 +1,27 @@
+from collections import OrderedDict
+
+from graphql.execution import ExecutionResult as BaseExecutionResult
+
+
+class ExecutionResult(BaseExecutionResult):
+    '''
+    ExecutionResult with the ``extensions`` entry of the response.
+    '''
+    __slots__ = 'extensions',
+
+    def __init__(self, data=None, errors=None, invalid=False, extensions=None):
+        super(ExecutionResult, self).__init__(data, errors, invalid)
+        self.extensions = extensions
+
+
+def add_extension(result, name, value):
+    '''
+    Adds an entry to the extensions of the result, copying results of
+    graphql-core into one that has them.
+    '''
+    if not isinstance(result, ExecutionResult):
+        result = ExecutionResult(result.data, result.errors, result.invalid)
+    if result.extensions is None:
+        result.extensions = OrderedDict()
+    result.extensions[name] = value
+    return result
@@ -1,14 +1,25 @@
 import inspect
+from functools import partial
 
-from graphql import graphql
+from graphql import execute, graphql
+from graphql.execution import ExecutionResult
 from graphql.type import GraphQLSchema as _GraphQLSchema
+from graphql.type.directives import (GraphQLIncludeDirective,
+                                     GraphQLSkipDirective)
 from graphql.utils.introspection_query import introspection_query
 from graphql.utils.schema_printer import print_schema
+from promise import Promise
 
 from graphene import signals
 
-from ..middlewares import MiddlewareManager, CamelCaseArgsMiddleware
-from .classtypes.base import ClassType
+from ..middlewares import (CamelCaseArgsMiddleware, MiddlewareManager,
+                           ProfilingMiddleware, SlowOperationLog,
+                           TracingMiddleware)
+from .classtypes.base import ClassType, FieldsClassType
+from .classtypes.objecttype import ObjectType, is_objecttype
+from .extensions import ExecutionRequest, execute_request
+from .incremental import (GraphQLDeferDirective, GraphQLStreamDirective,
+                          execute_incremental)
 from .types.base import InstanceType
 
 
@@ -21,21 +32,80 @@ class GraphQLSchema(_GraphQLSchema):
 
 class Schema(object):
     _executor = None
+    _field_cache = None
+    _thread_pool = None
+    _process_pool = None
+    _response_encoder = None
+    _global_id_codec = None
+    _schema = None
 
     def __init__(self, query=None, mutation=None, subscription=None,
-                 name='Schema', executor=None, middlewares=None, auto_camelcase=True, **options):
+                 name='Schema', executor=None, middlewares=None, auto_camelcase=True,
+                 global_id_codec=None, cost_analyzer=None, field_cache=None,
+                 response_cache=None, coalescer=None, run_in=None, thread_pool=None,
+                 process_pool=None, parallel=False, max_concurrency=None, tracing=None, metrics=None,
+                 extensions=None, slow_operation_log=None, profiling=None, incremental=False, **options):
         self._types_names = {}
         self._types = {}
+        self._internal_types = {}
+        self._types_models = {}
+        self._instance_types = {}
+        self._fields = {}
         self.mutation = mutation
         self.query = query
         self.subscription = subscription
         self.name = name
         self.executor = executor
+        self.cost_analyzer = cost_analyzer
+        self._field_cache = field_cache
+        self.response_cache = response_cache
+        self.coalescer = coalescer
+        self.run_in = run_in
+        self._thread_pool = thread_pool
+        self._process_pool = process_pool
+        self.parallel = parallel
+        self.max_concurrency = max_concurrency
+        self.incremental = incremental
+        if global_id_codec:
+            self.global_id_codec = global_id_codec
         if 'plugins' in options:
             raise Exception('Plugins are deprecated, please use middlewares.')
         middlewares = middlewares or []
         if auto_camelcase:
             middlewares.append(CamelCaseArgsMiddleware())
+        if slow_operation_log is not None and not isinstance(slow_operation_log, SlowOperationLog):
+            # The threshold, in seconds
+            slow_operation_log = SlowOperationLog(slow_operation_log)
+        if slow_operation_log:
+            middlewares.append(slow_operation_log)
+        if profiling is True:
+            profiling = ProfilingMiddleware()
+        if profiling:
+            # The resolvers are profiled inside the other middlewares
+            middlewares.insert(0, profiling)
+        if tracing is True:
+            tracing = TracingMiddleware()
+        if tracing:
+            # The outermost middleware, so the others are timed too
+            middlewares.append(tracing)
+        self.tracing = tracing
+        self.metrics = metrics
+        self.slow_operation_log = slow_operation_log
+        self.profiling = profiling
+        self.extensions = list(extensions or [])
+        if slow_operation_log:
+            self.extensions.append(slow_operation_log)
+        if profiling:
+            self.extensions.append(profiling)
+        if tracing:
+            self.extensions.append(tracing)
+        if metrics:
+            metrics.add_schema(self)
+            self.extensions.append(metrics)
+        # The other middlewares that observe the operations too (like
+        # DjangoDebugMiddleware)
+        self.extensions += [middleware for middleware in middlewares
+                            if hasattr(middleware, 'on_result') and middleware not in self.extensions]
         self.auto_camelcase = auto_camelcase
         self.middleware_manager = MiddlewareManager(self, middlewares)
         self.options = options
@@ -47,6 +117,10 @@ class Schema(object):
     def T(self, _type):
         if not _type:
             return
+        try:
+            return self._types[_type]
+        except (KeyError, TypeError):
+            pass
         if isinstance(_type, ClassType):
             _type = type(_type)
         is_classtype = inspect.isclass(_type) and issubclass(_type, ClassType)
@@ -56,11 +130,39 @@ class Schema(object):
                 internal_type = _type.internal_type(self)
                 self._types[_type] = internal_type
                 if is_classtype:
+                    self._internal_types[internal_type] = _type
                     self.register(_type)
             return self._types[_type]
         else:
             return _type
 
+    @property
+    def query(self):
+        return self._query
+
+    @query.setter
+    def query(self, value):
+        self._query = value
+        self._schema = None
+
+    @property
+    def mutation(self):
+        return self._mutation
+
+    @mutation.setter
+    def mutation(self, value):
+        self._mutation = value
+        self._schema = None
+
+    @property
+    def subscription(self):
+        return self._subscription
+
+    @subscription.setter
+    def subscription(self, value):
+        self._subscription = value
+        self._schema = None
+
     @property
     def executor(self):
         return self._executor
@@ -69,16 +171,74 @@ class Schema(object):
     def executor(self, value):
         self._executor = value
 
+    @property
+    def global_id_codec(self):
+        if not self._global_id_codec:
+            from ..relay.codecs import Base64GlobalIDCodec
+            self.global_id_codec = Base64GlobalIDCodec()
+        return self._global_id_codec
+
+    @global_id_codec.setter
+    def global_id_codec(self, value):
+        self._global_id_codec = value.bind(self)
+
+    @property
+    def field_cache(self):
+        if not self._field_cache:
+            from ..cache import FieldCache
+            self._field_cache = FieldCache()
+        return self._field_cache
+
+    @property
+    def thread_pool(self):
+        if not self._thread_pool:
+            from .pools import ThreadResolverPool
+            self._thread_pool = ThreadResolverPool()
+        return self._thread_pool
+
+    @property
+    def process_pool(self):
+        if not self._process_pool:
+            from .pools import ProcessResolverPool
+            self._process_pool = ProcessResolverPool()
+        return self._process_pool
+
+    @property
+    def response_encoder(self):
+        if not self._response_encoder:
+            from .encoder import ResponseEncoder
+            self._response_encoder = ResponseEncoder(self)
+        return self._response_encoder
+
+    def get_resolver_pool(self, run_in):
+        if run_in == 'thread':
+            return self.thread_pool
+        if run_in == 'process':
+            return self.process_pool
+        raise ValueError('Unknown run_in value {!r}, expected "sync", "thread" or "process"'.format(run_in))
+
     @property
     def schema(self):
+        # The built schema is reused until the root types change or a type
+        # is registered (or replaced) after it was built.
+        if self._schema is None:
+            self._fields = {}
+            self._schema = self.build_schema()
+        return self._schema
+
+    def build_schema(self):
         if not self.query:
             raise Exception('You have to define a base query type')
+        directives = [GraphQLIncludeDirective, GraphQLSkipDirective]
+        if self.incremental:
+            directives += [GraphQLDeferDirective, GraphQLStreamDirective]
         return GraphQLSchema(
             self,
             query=self.T(self.query),
             mutation=self.T(self.mutation),
             types=[self.T(_type) for _type in list(self._types_names.values())],
-            subscription=self.T(self.subscription))
+            subscription=self.T(self.subscription),
+            directives=directives)
 
     def register(self, object_type, force=False):
         type_name = object_type._meta.type_name
@@ -86,10 +246,58 @@ class Schema(object):
         if registered_object_type:
             assert registered_object_type == object_type, 'Type {} already registered with other object type'.format(
                 type_name)
-        self._types_names[object_type._meta.type_name] = object_type
+        previous = self._types_names.get(type_name)
+        if previous is not object_type:
+            if previous is not None:
+                # The types built with the replaced one are built again
+                self._types.clear()
+                self._internal_types.clear()
+            self._types_names[type_name] = object_type
+            self.types_changed()
+        model = getattr(object_type._meta, 'model', None)
+        if model is not None and (force or model not in self._types_models):
+            # When several types share a model the first registered one
+            # is used, unless another one is registered with force=True
+            self._types_models[model] = object_type
+            self._instance_types.clear()
         return object_type
 
+    def types_changed(self):
+        '''
+        Discards what is built from the registered types.
+        '''
+        self._schema = None
+        self._fields = {}
+        self._instance_types.clear()
+        if self._global_id_codec:
+            self._global_id_codec.types_changed()
+
+    def get_type_for_model(self, model):
+        return self._types_models.get(model)
+
+    def get_type_for_instance(self, instance):
+        '''
+        Returns the GraphQL object type for an ObjectType instance or for an
+        instance of a model registered in the schema, looking at the MRO of
+        its class only the first time the class is seen.
+        '''
+        cls = instance.__class__
+        internal_type = self._instance_types.get(cls)
+        if internal_type:
+            return internal_type
+        for base in inspect.getmro(cls):
+            if issubclass(base, ObjectType):
+                objecttype = base if is_objecttype(base) else None
+            else:
+                objecttype = self._types_models.get(base)
+            if objecttype:
+                internal_type = self._instance_types[cls] = self.T(objecttype)
+                return internal_type
+
     def objecttype(self, type):
+        objecttype = self._internal_types.get(type)
+        if objecttype:
+            return objecttype
         name = getattr(type, 'name', None)
         if name:
             objecttype = self._types_names.get(name, None)
@@ -97,6 +305,23 @@ class Schema(object):
                     objecttype) and issubclass(objecttype, ClassType):
                 return objecttype
 
+    def get_field(self, type, field_name):
+        '''
+        Returns the Field that defines the field named field_name in the
+        given GraphQL type.
+        '''
+        fields = self._fields.get(type)
+        if fields is None:
+            fields = {}
+            objecttype = self.objecttype(type)
+            if objecttype and issubclass(objecttype, FieldsClassType):
+                group_type = objecttype._meta.fields_group_type
+                # Sorted, so fields replaced at build time win over the originals
+                for field in sorted(group_type):
+                    fields[group_type.get_name(self, field)] = field
+            self._fields[type] = fields
+        return fields.get(field_name)
+
     def __str__(self):
         return print_schema(self.schema)
 
@@ -105,6 +330,9 @@ class Schema(object):
         self.T(self.query)
 
     def get_type(self, type_name):
+        objecttype = self._query and self._types_names.get(type_name)
+        if objecttype:
+            return objecttype
         self.setup()
         if type_name not in self._types_names:
             raise KeyError('Type %r not found in %r' % (type_name, self))
@@ -119,16 +347,146 @@ class Schema(object):
 
     def execute(self, request_string='', root_value=None, variable_values=None,
                 context_value=None, operation_name=None, executor=None, return_promise=False):
-        return graphql(
-            schema=self.schema,
-            request_string=request_string,
+        request = ExecutionRequest(request_string, root_value, variable_values, context_value, operation_name)
+
+        def run(request):
+            try:
+                return self.execute_incremental(
+                    request.document_ast,
+                    root_value=request.root_value,
+                    context_value=request.context_value,
+                    variable_values=request.variable_values,
+                    operation_name=request.operation_name,
+                    executor=executor,
+                    return_promise=return_promise
+                )
+            except Exception as e:
+                return ExecutionResult(
+                    errors=[e],
+                    invalid=True,
+                )
+        return self.execute_request(request, run, return_promise)
+
+    def execute_request(self, request, execute, return_promise=False):
+        '''
+        Parses and validates an ExecutionRequest, and executes it with
+        ``execute(request)``, calling the hooks of the extensions.
+        '''
+        return execute_request(self, request, execute, return_promise)
+
+    def execute_async(self, request_string='', root_value=None, variable_values=None,
+                      context_value=None, operation_name=None, executor=None, loop=None):
+        '''
+        Executes the operation without blocking the event loop, returning
+        a future for the ExecutionResult. Coroutines returned by the
+        resolvers and middlewares are awaited in the loop, so sibling
+        async fields run concurrently.
+        '''
+        from ..utils.awaitables import asyncio, awaiting_in, future_from_promise
+        loop = loop or asyncio.get_event_loop()
+        with awaiting_in(loop):
+            result = self.execute(
+                request_string,
+                root_value=root_value,
+                variable_values=variable_values,
+                context_value=context_value,
+                operation_name=operation_name,
+                executor=executor,
+                return_promise=True
+            )
+
+        def set_loop(result):
+            # The patches of incremental results are awaited in the loop too
+            patches = getattr(result, 'patches', None)
+            if patches is not None:
+                patches.loop = loop
+            return result
+        return future_from_promise(Promise.resolve(result).then(set_loop), loop)
+
+    def execute_incremental(self, document_ast, root_value=None, variable_values=None,
+                            context_value=None, operation_name=None, executor=None, return_promise=False):
+        '''
+        Executes an already parsed and validated document. When the schema
+        is ``incremental`` and a query has deferred fragments or streamed
+        fields, the result is an IncrementalExecutionResult with the
+        initial payload and an iterator of the patches.
+        '''
+        return execute_incremental(
+            self,
+            document_ast,
             root_value=root_value,
+            variable_values=variable_values,
             context_value=context_value,
+            operation_name=operation_name,
+            executor=executor,
+            return_promise=return_promise
+        )
+
+    def get_executor(self, executor=None):
+        executor = executor or self._executor
+        if executor is None and self.parallel:
+            from .parallel import ParallelExecutor
+            executor = ParallelExecutor(self, self.max_concurrency)
+        return executor
+
+    def execute_document(self, document_ast, root_value=None, variable_values=None,
+                         context_value=None, operation_name=None, executor=None, return_promise=False):
+        '''
+        Executes an already parsed and validated document.
+        '''
+        self.check_cost(document_ast, operation_name, variable_values, context_value)
+        return self.run_document(
+            document_ast,
+            root_value=root_value,
             variable_values=variable_values,
+            context_value=context_value,
+            operation_name=operation_name,
+            executor=executor,
+            return_promise=return_promise
+        )
+
+    def check_cost(self, document_ast, operation_name=None, variable_values=None, context_value=None):
+        if self.cost_analyzer:
+            query_cost = self.cost_analyzer.check(self, document_ast, operation_name, variable_values)
+            try:
+                # Exposed to the middlewares through the context
+                context_value.query_cost = query_cost
+            except AttributeError:
+                pass
+
+    def run_document(self, document_ast, root_value=None, variable_values=None,
+                     context_value=None, operation_name=None, executor=None, return_promise=False,
+                     shared=True):
+        '''
+        Executes a document without checking its cost. Its result is only
+        taken from (or given to) the response cache and the coalescer
+        when ``shared``.
+        '''
+        executor = self.get_executor(executor)
+        run = partial(
+            execute,
+            self.schema,
+            document_ast,
+            root_value,
+            # Given as a keyword, so the response cache can revalidate the
+            # result with another context
+            context_value=context_value,
             operation_name=operation_name,
-            executor=executor or self._executor,
+            variable_values=variable_values or {},
+            executor=executor,
             return_promise=return_promise
         )
+        if not shared:
+            return run()
+        if self.response_cache:
+            run = partial(
+                self.response_cache.execute,
+                self, document_ast, operation_name, variable_values, context_value, run, return_promise)
+        if self.coalescer:
+            # Concurrent misses of the response cache are coalesced too
+            return self.coalescer.execute(
+                document_ast, operation_name, variable_values, context_value, run, return_promise)
+        return run()
 
     def introspect(self):
         return graphql(self.schema, introspection_query).data
@@ -0,0 +1,156 @@
+from promise import Promise
+
+import graphene
+from graphene import relay
+
+calls = []
+
+
+class Row(object):
+
+    def __init__(self, id, value):
+        self.id = id
+        self.value = value
+
+
+class Item(relay.Node):
+    value = graphene.Int()
+    double = graphene.Int(batch=True)
+    power = graphene.Int(exponent=graphene.Int(), batch=True)
+    deferred = graphene.Int(batch=True)
+
+    def resolve_double(roots, args, info):
+        calls.append(('double', len(roots)))
+        return [root.value * 2 for root in roots]
+
+    def resolve_power(roots, args, info):
+        calls.append(('power', len(roots)))
+        return [root.value ** args.get('exponent') for root in roots]
+
+    @graphene.with_context
+    def resolve_deferred(roots, args, context, info):
+        calls.append(('deferred', len(roots)))
+        return Promise.resolve([root.value + context['offset'] for root in roots])
+
+    @classmethod
+    def get_node(cls, id, info):
+        return Row(id, int(id))
+
+
+class Failing(graphene.ObjectType):
+    value = graphene.Int()
+    raises = graphene.Int(batch=True)
+    rejects = graphene.Int(batch=True)
+
+    def resolve_raises(roots, args, info):
+        raise Exception('Raised')
+
+    def resolve_rejects(roots, args, info):
+        return Promise.reject(Exception('Rejected'))
+
+
+class Query(graphene.ObjectType):
+    items = graphene.Field(Item.List())
+    item = graphene.Field(Item)
+    connection = relay.ConnectionField(Item)
+    node = relay.NodeField()
+    grid = graphene.List(graphene.List(Item))
+    failing = graphene.List(Failing)
+
+    def resolve_items(self, args, info):
+        return [Row(i, i) for i in range(4)] + [None]
+
+    def resolve_item(self, args, info):
+        return Row(3, 3)
+
+    def resolve_connection(self, args, info):
+        return [Row(i, i) for i in range(10)]
+
+    def resolve_grid(self, args, info):
+        return [[Row(i, i), Row(i + 1, i + 1)] for i in range(0, 6, 2)] + [None]
+
+    def resolve_failing(self, args, info):
+        return [Row(i, i) for i in range(3)]
+
+
+schema = graphene.Schema(query=Query)
+
+
+def setup_function(function):
+    del calls[:]
+
+
+def test_batch_fields_in_list():
+    result = schema.execute('''
+    {
+        items {
+            value
+            double
+            square: power(exponent: 2)
+            cube: power(exponent: 3)
+            ...ItemFragment
+        }
+    }
+    fragment ItemFragment on Item {
+        deferred
+    }
+    ''', context_value={'offset': 10})
+    assert not result.errors
+    assert result.data['items'][:2] == [
+        {'value': 0, 'double': 0, 'square': 0, 'cube': 0, 'deferred': 10},
+        {'value': 1, 'double': 2, 'square': 1, 'cube': 1, 'deferred': 11},
+    ]
+    assert result.data['items'][3] == {'value': 3, 'double': 6, 'square': 9, 'cube': 27, 'deferred': 13}
+    assert result.data['items'][4] is None
+    assert sorted(calls) == [('deferred', 4), ('double', 4), ('power', 4), ('power', 4)]
+
+
+def test_batch_fields_single_object():
+    result = schema.execute('{ item { double } }')
+    assert result.data == {'item': {'double': 6}}
+    assert calls == [('double', 1)]
+
+
+def test_batch_fields_in_connection():
+    result = schema.execute('{ connection(first: 5) { edges { cursor node { id double } } } }')
+    assert not result.errors
+    assert [edge['node']['double'] for edge in result.data['connection']['edges']] == [0, 2, 4, 6, 8]
+    assert calls == [('double', 5)]
+
+
+def test_batch_fields_middleware():
+    roots = []
+
+    class RootsMiddleware(object):
+
+        def resolve(self, next, root, args, context, info):
+            if info.field_name == 'double':
+                roots.append(root)
+            return next(root, args, context, info)
+
+    schema = graphene.Schema(query=Query, middlewares=[RootsMiddleware()])
+    result = schema.execute('{ items { double } }')
+    assert not result.errors
+    # Once for the whole list and once for every item
+    assert len(roots[0]) == 4
+    assert len(roots) == 5
+
+
+def test_batch_fields_in_nested_lists():
+    result = schema.execute('{ grid { value double } }')
+    assert not result.errors
+    assert result.data['grid'][:3] == [
+        [{'value': 0, 'double': 0}, {'value': 1, 'double': 2}],
+        [{'value': 2, 'double': 4}, {'value': 3, 'double': 6}],
+        [{'value': 4, 'double': 8}, {'value': 5, 'double': 10}],
+    ]
+    assert result.data['grid'][3] is None
+    assert calls == [('double', 6)]
+
+
+def test_batch_fields_errors():
+    # Raising and rejecting fail the field of every object, not the list
+    for field, message in [('raises', 'Raised'), ('rejects', 'Rejected')]:
+        result = schema.execute('{ failing { value %s } }' % field)
+        assert result.data == {'failing': [{'value': i, field: None} for i in range(3)]}
+        assert [error.message for error in result.errors] == [message] * 3
@@ -0,0 +1,136 @@
+from graphql import parse
+from py.test import raises
+
+import graphene
+from graphene import relay
+from graphene.core.cost import (QueryComplexityError, QueryCostAnalyzer,
+                                get_query_cost)
+
+
+class Item(relay.Node):
+    name = graphene.String()
+    price = graphene.Float(cost=5)
+
+    @classmethod
+    def get_node(cls, id, info):
+        return Item(id=id, name='item')
+
+
+class Query(graphene.ObjectType):
+    item = relay.NodeField(Item)
+    items = relay.ConnectionField(Item)
+    expensive = graphene.String(cost=50)
+    labels = graphene.List(graphene.String())
+    all_items = graphene.List(Item, required=True)
+
+    def resolve_items(self, args, info):
+        return [Item(id=i, name='item') for i in range(3)]
+
+    def resolve_expensive(self, args, info):
+        return 'expensive'
+
+
+schema = graphene.Schema(query=Query)
+
+
+def analyze(query, **kwargs):
+    return QueryCostAnalyzer(**kwargs).analyze(schema, parse(query))
+
+
+def test_cost_scalar_fields():
+    query_cost = analyze('{ expensive labels }')
+    assert query_cost.cost == 51
+    assert query_cost.depth == 1
+
+
+def test_cost_connection_first():
+    query = '''
+    query Items($n: Int) {
+      items(first: $n) {
+        edges {
+          node {
+            name
+            price
+          }
+        }
+      }
+    }
+    '''
+    analyzer = QueryCostAnalyzer()
+    document = parse(query)
+    # items + 10 * (edges + node + name + price)
+    assert analyzer.analyze(schema, document, variable_values={'n': 10}).cost == 1 + 10 * (1 + 1 + 1 + 5)
+    query_cost = analyzer.analyze(schema, document)
+    assert query_cost.cost == 1 + 100 * (1 + 1 + 1 + 5)
+    assert query_cost.depth == 4
+
+
+def test_cost_list():
+    query_cost = analyze('{ allItems { name price } }', default_list_size=10)
+    # allItems + 10 * (name + price)
+    assert query_cost.cost == 1 + 10 * (1 + 5)
+    assert query_cost.depth == 2
+
+
+def test_cost_fragments():
+    query = '''
+    query {
+      items(last: 2) {
+        ...ItemConnection
+      }
+      item(id: "1") {
+        ... on Item {
+          price
+        }
+      }
+    }
+    fragment ItemConnection on ItemDefaultConnection {
+      edges {
+        node {
+          price
+        }
+      }
+    }
+    '''
+    assert analyze(query).cost == (1 + 2 * (1 + 1 + 5)) + (1 + 5)
+
+
+def test_execute_max_cost():
+    schema = graphene.Schema(query=Query, cost_analyzer=QueryCostAnalyzer(max_cost=50))
+    assert not schema.execute('{ expensive }').errors
+
+    result = schema.execute('{ expensive labels }')
+    assert result.invalid
+    error = result.errors[0]
+    assert isinstance(error, QueryComplexityError)
+    assert error.cost == 51
+    assert error.max_cost == 50
+    assert str(error) == 'Query cost 51 exceeds the maximum cost of 50.'
+
+
+def test_execute_max_depth():
+    schema = graphene.Schema(query=Query, cost_analyzer=QueryCostAnalyzer(max_depth=3))
+    result = schema.execute('{ items { edges { node { name } } } }')
+    assert result.invalid
+    assert result.errors[0].depth == 4
+    with raises(QueryComplexityError):
+        schema.cost_analyzer.check(schema, parse('{ items { edges { node { name } } } }'))
+
+
+def test_query_cost_exposed_to_middlewares():
+    costs = []
+
+    class CostMiddleware(object):
+
+        def resolve(self, next, root, args, context, info):
+            costs.append(get_query_cost(context))
+            return next(root, args, context, info)
+
+    class Context(object):
+        pass
+
+    schema = graphene.Schema(query=Query, cost_analyzer=QueryCostAnalyzer(),
+                             middlewares=[CostMiddleware()])
+    result = schema.execute('{ expensive }', context_value=Context())
+    assert not result.errors
+    assert costs[0].cost == 50
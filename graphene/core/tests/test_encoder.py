@@ -0,0 +1,131 @@
+import json
+from io import StringIO
+
+from graphql import parse
+
+import graphene
+from graphene.core.types.custom_scalars import JSONString
+
+
+class Episode(graphene.Enum):
+    NEWHOPE = 4
+    EMPIRE = 5
+
+
+class Character(graphene.Interface):
+    name = graphene.String()
+    friends = graphene.List('Character')
+
+    def resolve_friends(self, args, info):
+        return [Droid(name='R2-D2', function=u'Astromech ☃'), None, Human(name='Leia', height=1.5)]
+
+
+class Human(Character):
+    height = graphene.Float()
+
+
+class Droid(Character):
+    function = graphene.String()
+    serial = graphene.Int(resolver=lambda *_: 3720)
+
+
+class Query(graphene.ObjectType):
+    hero = graphene.Field(Character)
+    episodes = graphene.List(Episode)
+    numbers = graphene.Int().List
+    flags = graphene.Boolean().NonNull.List
+    extra = graphene.Field(JSONString)
+
+    def resolve_hero(self, args, info):
+        return Human(name='Luke', height=1.72)
+
+    def resolve_episodes(self, args, info):
+        return [Episode.NEWHOPE, Episode.EMPIRE]
+
+    def resolve_numbers(self, args, info):
+        return [1, None, 3]
+
+    def resolve_flags(self, args, info):
+        return [True, False]
+
+    def resolve_extra(self, args, info):
+        return {'a': [1, 2]}
+
+
+class Mutation(graphene.ObjectType):
+    numbers = graphene.String(resolver=lambda *_: '1, 2')
+
+
+schema = graphene.Schema(query=Query, mutation=Mutation)
+schema.register(Human)
+schema.register(Droid)
+
+QUERY = '''
+query Hero {
+    hero {
+        __typename
+        name
+        ...HumanFragment
+        allies: friends {
+            __typename
+            name
+            ... on Droid { function serial }
+            ...HumanFragment
+        }
+        friends { name }
+    }
+    episodes
+    numbers
+    flags
+    extra
+    __schema { queryType { name } }
+}
+fragment HumanFragment on Human {
+    height
+}
+'''
+
+
+def encode(query, operation_name=None, **kwargs):
+    result = schema.execute(query, operation_name=operation_name)
+    assert not result.errors
+    response = {'data': result.data}
+    encoder = schema.response_encoder
+    encoded = encoder.encode(response, parse(query), operation_name, **kwargs)
+    assert encoded == json.dumps(response, separators=(',', ':'))
+    return encoded
+
+
+def test_encode_query():
+    data = json.loads(encode(QUERY))['data']
+    assert data['hero']['allies'][0] == {
+        '__typename': 'Droid', 'name': 'R2-D2', 'function': u'Astromech ☃', 'serial': 3720}
+    assert data['hero']['allies'][1] is None
+    assert data['hero']['allies'][2] == {'__typename': 'Human', 'name': 'Leia', 'height': 1.5}
+    assert data['episodes'] == ['NEWHOPE', 'EMPIRE']
+    assert data['numbers'] == [1, None, 3]
+    assert data['extra'] == '{"a": [1, 2]}'
+
+
+def test_encode_operation():
+    document = 'query A { numbers } mutation B { numbers }'
+    assert encode(document, 'A') == '{"data":{"numbers":[1,null,3]}}'
+    assert encode(document, 'B') == '{"data":{"numbers":"1, 2"}}'
+
+
+def test_encode_chunks():
+    result = schema.execute(QUERY)
+    response = {'data': result.data}
+    encoder = graphene.core.encoder.ResponseEncoder(schema, chunk_size=16)
+    chunks = list(encoder.iterencode(response, parse(QUERY)))
+    assert len(chunks) > 5
+    assert all(len(chunk) < 128 for chunk in chunks)
+    assert json.loads(''.join(chunks)) == json.loads(json.dumps(response))
+
+
+def test_encode_without_document():
+    result = schema.execute('mutation { numbers }')
+    response = {'errors': [{'message': 'Error'}], 'data': result.data}
+    fp = StringIO()
+    schema.response_encoder.dump(response, fp)
+    assert json.loads(fp.getvalue()) == {'errors': [{'message': 'Error'}], 'data': {'numbers': '1, 2'}}
@@ -0,0 +1,113 @@
+import pytest
+
+import graphene
+
+asyncio = pytest.importorskip('asyncio')
+
+
+def run(future):
+    return asyncio.get_event_loop().run_until_complete(future)
+
+
+class Pet(graphene.ObjectType):
+    name = graphene.String()
+    tags = graphene.String().List
+
+    def resolve_name(self, args, info):
+        return asyncio.sleep(0.01, result=self._root)
+
+    def resolve_tags(self, args, info):
+        return asyncio.sleep(0.01, result=['a', 'b'])
+
+
+class Query(graphene.ObjectType):
+    first = graphene.String()
+    second = graphene.String()
+    sync = graphene.String()
+    pets = graphene.Field(Pet.List())
+    fails = graphene.String()
+
+    def resolve_first(self, args, info):
+        return asyncio.sleep(0.05, result='first')
+
+    def resolve_second(self, args, info):
+        return asyncio.sleep(0.05, result='second')
+
+    def resolve_sync(self, args, info):
+        return 'sync'
+
+    def resolve_pets(self, args, info):
+        return asyncio.sleep(0, result=['Lassie', 'Snoopy'])
+
+    @asyncio.coroutine
+    def resolve_fails(self, args, info):
+        raise Exception('Fails')
+
+
+schema = graphene.Schema(query=Query)
+
+
+class OverlapMiddleware(object):
+    '''
+    Records how many resolvers had been called when each of them finished.
+    '''
+
+    def __init__(self):
+        self.called = 0
+        self.finished = []
+
+    def resolve(self, next, root, args, context, info):
+        self.called += 1
+        return next(root, args, context, info).then(self.finish)
+
+    def finish(self, value):
+        self.finished.append(self.called)
+        return value
+
+
+def test_execute_async_runs_siblings_concurrently():
+    overlap = OverlapMiddleware()
+    concurrent_schema = graphene.Schema(query=Query, middlewares=[overlap])
+    result = run(concurrent_schema.execute_async('{ first second }'))
+    assert not result.errors
+    assert result.data == {'first': 'first', 'second': 'second'}
+    # Both were resolving before either finished
+    assert overlap.finished == [2, 2]
+
+
+def test_execute_async_nested():
+    result = run(schema.execute_async('{ pets { name tags } }'))
+    assert not result.errors
+    assert result.data == {'pets': [
+        {'name': 'Lassie', 'tags': ['a', 'b']},
+        {'name': 'Snoopy', 'tags': ['a', 'b']},
+    ]}
+
+
+def test_execute_async_errors():
+    result = run(schema.execute_async('{ fails sync }'))
+    assert result.data == {'fails': None, 'sync': 'sync'}
+    assert str(result.errors[0]) == 'Fails'
+
+    result = run(schema.execute_async('{ unknown }'))
+    assert result.invalid
+
+
+def test_execute_async_middleware():
+    class PrefixMiddleware(object):
+
+        @asyncio.coroutine
+        def resolve(self, next, root, args, context, info):
+            return next(root, args, context, info).then(lambda value: 'prefixed ' + value)
+
+    schema = graphene.Schema(query=Query, middlewares=[PrefixMiddleware()])
+    result = run(schema.execute_async('{ first sync }'))
+    assert result.data == {'first': 'prefixed first', 'sync': 'prefixed sync'}
+
+
+def test_execute_sync_with_async_resolvers():
+    # The loop is not run by Schema.execute, so they fail instead of hanging
+    result = schema.execute('{ first sync }')
+    assert result.data == {'first': None, 'sync': 'sync'}
+    assert str(result.errors[0]) == (
+        'Coroutines can only be awaited in an event loop, execute the operation with Schema.execute_async.')
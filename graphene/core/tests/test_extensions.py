@@ -0,0 +1,117 @@
+import pytest
+from promise import Promise
+
+import graphene
+from graphene.core.extensions import Extension
+from graphene.core.results import add_extension
+
+
+class Query(graphene.ObjectType):
+    hello = graphene.String(name=graphene.String())
+
+    def resolve_hello(self, args, info):
+        return 'Hello {}'.format(args.get('name') or 'World')
+
+
+class Recorder(Extension):
+
+    def __init__(self):
+        self.calls = []
+
+    def on_request_start(self, request):
+        self.calls.append(('request_start', request.document_ast))
+
+    def on_parse(self, request):
+        self.calls.append(('parse', request.operation.name.value if request.operation.name else None))
+
+    def on_validate(self, request):
+        self.calls.append(('validate', len(request.validation_errors)))
+
+    def on_execute(self, request):
+        self.calls.append(('execute', None))
+
+    def on_result(self, request, result):
+        self.calls.append(('result', result.data))
+
+
+def test_extension_hooks():
+    recorder = Recorder()
+    schema = graphene.Schema(query=Query, extensions=[recorder])
+    result = schema.execute('query Hello { hello }')
+    assert result.data == {'hello': 'Hello World'}
+    assert recorder.calls == [
+        ('request_start', None),
+        ('parse', 'Hello'),
+        ('validate', 0),
+        ('execute', None),
+        ('result', {'hello': 'Hello World'}),
+    ]
+
+
+def test_extension_hooks_invalid_operations():
+    recorder = Recorder()
+    schema = graphene.Schema(query=Query, extensions=[recorder])
+    assert schema.execute('{ unknown }').invalid
+    assert [name for name, _ in recorder.calls] == ['request_start', 'parse', 'validate', 'result']
+    del recorder.calls[:]
+    assert schema.execute('{ hello').invalid
+    assert [name for name, _ in recorder.calls] == ['request_start', 'result']
+
+
+def test_extension_changes_request_and_result():
+    class Rewrite(object):
+
+        def on_execute(self, request):
+            request.variable_values = {'name': 'Extension'}
+
+        def on_result(self, request, result):
+            return add_extension(result, 'rewritten', True)
+
+    schema = graphene.Schema(query=Query, extensions=[Rewrite()])
+    result = schema.execute('query Hello($name: String) { hello(name: $name) }')
+    assert result.data == {'hello': 'Hello Extension'}
+    assert result.extensions == {'rewritten': True}
+
+
+def test_extension_returns_promise():
+    calls = []
+
+    class Delayed(object):
+
+        def on_parse(self, request):
+            return Promise(lambda resolve, reject: resolve(calls.append('parse')))
+
+        def on_result(self, request, result):
+            return Promise.resolve(None).then(lambda _: add_extension(result, 'delayed', True))
+
+    schema = graphene.Schema(query=Query, extensions=[Delayed(), Recorder()])
+    result = schema.execute('{ hello }')
+    assert calls == ['parse']
+    assert result.data == {'hello': 'Hello World'}
+    assert result.extensions == {'delayed': True}
+
+
+def test_extension_coroutine_hooks():
+    asyncio = pytest.importorskip('asyncio')
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    calls = []
+
+    class Async(object):
+
+        def on_execute(self, request):
+            future = loop.create_future()
+            loop.call_soon(future.set_result, None)
+            calls.append('execute')
+            return future
+
+        def on_result(self, request, result):
+            return asyncio.sleep(0, result=add_extension(result, 'async', True))
+
+    schema = graphene.Schema(query=Query, extensions=[Async()])
+    result = loop.run_until_complete(schema.execute_async('{ hello }', loop=loop))
+    loop.close()
+    asyncio.set_event_loop(None)
+    assert calls == ['execute']
+    assert result.data == {'hello': 'Hello World'}
+    assert result.extensions == {'async': True}
@@ -0,0 +1,211 @@
+import pytest
+from graphql.execution import ExecutionResult
+
+import graphene
+from graphene import relay
+from graphene.cache import OperationCoalescer, ResponseCache
+from graphene.core.incremental import IncrementalExecutionResult, StopAsyncIteration
+
+resolved = []
+
+
+class Review(graphene.ObjectType):
+    stars = graphene.Int()
+    comment = graphene.String()
+
+    def resolve_comment(self, args, info):
+        resolved.append(('comment', self.stars))
+        return 'Comment {}'.format(self.stars)
+
+
+class Product(relay.Node):
+    name = graphene.String()
+    price = graphene.Int()
+    reviews = graphene.List(Review)
+    related = relay.ConnectionField('Product')
+    rating = graphene.Int()
+
+    def resolve_price(self, args, info):
+        resolved.append(('price', self.name))
+        return len(self.name)
+
+    def resolve_reviews(self, args, info):
+        resolved.append(('reviews', self.name))
+        return [Review(stars=stars) for stars in range(1, 5)]
+
+    def resolve_rating(self, args, info):
+        raise Exception('No rating')
+
+    def resolve_related(self, args, info):
+        return [Product(id=i, name='related {}'.format(i)) for i in range(5)]
+
+    @classmethod
+    def get_node(cls, id, info):
+        return Product(id=id, name='product {}'.format(id))
+
+
+class Query(graphene.ObjectType):
+    product = graphene.Field(Product)
+    products = graphene.List(Product)
+    node = relay.NodeField()
+
+    def resolve_product(self, args, info):
+        return Product(id=1, name='book')
+
+    def resolve_products(self, args, info):
+        return [Product(id=1, name='book'), Product(id=2, name='pen')]
+
+
+class Mutation(graphene.ObjectType):
+    product = graphene.Field(Product, resolver=lambda *_: Product(id=1, name='book'))
+
+
+schema = graphene.Schema(query=Query, mutation=Mutation, incremental=True)
+
+
+def setup_function(function):
+    del resolved[:]
+
+
+def get_patches(result):
+    return [(patch.path, patch.label, patch.data) for patch in result.patches]
+
+
+def test_defer_inline_fragment():
+    result = schema.execute('{ product { name ... @defer { price } } }')
+    assert isinstance(result, IncrementalExecutionResult)
+    assert not result.errors
+    assert result.data == {'product': {'name': 'book'}}
+    assert resolved == []
+    assert get_patches(result) == [(['product'], None, {'price': 4})]
+    assert resolved == [('price', 'book')]
+
+
+def test_defer_fragment_spread_in_list():
+    result = schema.execute('''
+    query Products($defer: Boolean) {
+        products { name ...Price @defer(if: $defer, label: "price") }
+    }
+    fragment Price on Product { price }
+    ''', variable_values={'defer': True})
+    assert result.data == {'products': [{'name': 'book'}, {'name': 'pen'}]}
+    assert get_patches(result) == [
+        (['products', 0], 'price', {'price': 4}),
+        (['products', 1], 'price', {'price': 3}),
+    ]
+
+
+def test_defer_disabled():
+    result = schema.execute('''
+    { product { ... on Product @defer(if: false) { price } } }
+    ''')
+    assert type(result) == ExecutionResult
+    assert result.data == {'product': {'price': 4}}
+
+
+def test_defer_nested():
+    result = schema.execute('''
+    { product { ... @defer { price reviews { stars ... on Review @defer { comment } } } } }
+    ''')
+    assert result.data == {'product': {}}
+    patches = get_patches(result)
+    assert patches[0] == (['product'], None, {'price': 4, 'reviews': [{'stars': s} for s in range(1, 5)]})
+    assert patches[1:] == [(['product', 'reviews', i], None, {'comment': 'Comment {}'.format(i + 1)})
+                           for i in range(4)]
+
+
+def test_stream_list():
+    result = schema.execute('''
+    { products { name reviews @stream(initialCount: 1) { stars ... on Review @defer { comment } } } }
+    ''')
+    assert result.data == {'products': [
+        {'name': 'book', 'reviews': [{'stars': 1}]},
+        {'name': 'pen', 'reviews': [{'stars': 1}]},
+    ]}
+    patches = get_patches(result)
+    assert patches[:3] == [(['products', 0, 'reviews', i], None, {'stars': i + 1}) for i in range(1, 4)]
+    assert len(patches) == 6 + 8
+    assert patches[-1] == (['products', 1, 'reviews', 3], None, {'comment': 'Comment 4'})
+    # The patches are resolved against the values of the first pass
+    assert resolved.count(('reviews', 'book')) == 1
+    assert resolved.count(('reviews', 'pen')) == 1
+
+
+def test_stream_connection():
+    result = schema.execute('''
+    { product { related(first: 4) @stream(initialCount: 2, label: "related") {
+        pageInfo { hasNextPage } edges { node { name } } } } }
+    ''')
+    assert result.data == {'product': {'related': {
+        'pageInfo': {'hasNextPage': True},
+        'edges': [{'node': {'name': 'related 0'}}, {'node': {'name': 'related 1'}}],
+    }}}
+    assert get_patches(result) == [
+        (['product', 'related', 'edges', 2], 'related', {'node': {'name': 'related 2'}}),
+        (['product', 'related', 'edges', 3], 'related', {'node': {'name': 'related 3'}}),
+    ]
+
+
+def test_defer_errors():
+    result = schema.execute('{ product { ... @defer { rating } } }')
+    assert result.data == {'product': {}}
+    patches = list(result.patches)
+    assert len(patches) == 1
+    assert patches[0].data == {'rating': None}
+    assert patches[0].errors[0].message == 'No rating'
+
+
+def test_defer_ignored_in_mutations():
+    result = schema.execute('mutation { product { name ... @defer { price } } }')
+    assert type(result) == ExecutionResult
+    assert result.data == {'product': {'name': 'book', 'price': 4}}
+
+
+def test_defer_in_node():
+    result = schema.execute('{ node(id: "UHJvZHVjdDoy") { id ... on Product @defer { name price } } }')
+    assert result.data == {'node': {'id': 'UHJvZHVjdDoy'}}
+    assert get_patches(result) == [(['node'], None, {'name': 'product 2', 'price': 9})]
+
+
+def test_defer_root():
+    result = schema.execute('{ ... @defer(label: "root") { product { name } } }')
+    assert result.data == {}
+    assert get_patches(result) == [([], 'root', {'product': {'name': 'book'}})]
+
+
+def test_directives_opt_in():
+    plain_schema = graphene.Schema(query=Query)
+    assert '@defer' not in str(plain_schema)
+    result = plain_schema.execute('{ product { ... @defer { price } } }')
+    assert result.errors[0].message == 'Unknown directive "defer".'
+    assert 'directive @defer' in str(schema)
+
+
+def test_incremental_with_response_cache():
+    cached_schema = graphene.Schema(query=Query, incremental=True, response_cache=ResponseCache(default_ttl=10),
+                                    coalescer=OperationCoalescer())
+    for _ in range(2):
+        result = cached_schema.execute('{ product { name ... @defer { price } } }')
+        assert result.data == {'product': {'name': 'book'}}
+        assert get_patches(result) == [(['product'], None, {'price': 4})]
+        result = cached_schema.execute('{ product { reviews @stream(initialCount: 1) { stars } } }')
+        assert result.data == {'product': {'reviews': [{'stars': 1}]}}
+        assert len(get_patches(result)) == 3
+    # The operations without deferred data are still cached
+    cached_schema.execute('{ product { name } }')
+    cached_schema.execute('{ product { name } }')
+    assert cached_schema.response_cache.hits == 1
+
+
+def test_defer_async():
+    asyncio = pytest.importorskip('asyncio')
+    loop = asyncio.new_event_loop()
+    future = schema.execute_async('{ products { name ... on Product @defer { price } } }', loop=loop)
+    result = loop.run_until_complete(future)
+    assert result.data == {'products': [{'name': 'book'}, {'name': 'pen'}]}
+    patches = result.patches.__aiter__()
+    assert loop.run_until_complete(patches.__anext__()).data == {'price': 4}
+    assert loop.run_until_complete(patches.__anext__()).data == {'price': 3}
+    with pytest.raises(StopAsyncIteration):
+        loop.run_until_complete(patches.__anext__())
+    loop.close()
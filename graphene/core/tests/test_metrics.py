@@ -0,0 +1,113 @@
+import graphene
+from graphene.cache import ResponseCache
+from graphene.metrics import Counter, Histogram, MetricsRegistry
+
+
+class Query(graphene.ObjectType):
+    hello = graphene.String()
+    fail = graphene.String()
+    cached = graphene.String(cache_ttl=10)
+
+    def resolve_hello(self, args, info):
+        return 'World'
+
+    def resolve_fail(self, args, info):
+        raise Exception('Failed')
+
+    def resolve_cached(self, args, info):
+        return 'Cached'
+
+
+class Middleware(object):
+
+    def resolve(self, next, root, args, context, info):
+        return next(root, args, context, info)
+
+
+def get_samples(metric):
+    return {(name, labels): value for name, labels, value in metric.samples()}
+
+
+def test_counter_and_histogram():
+    counter = Counter('requests_total', 'Requests.', ('method', ))
+    counter.labels('GET').inc()
+    counter.labels('GET').inc(2)
+    counter.labels('PO"ST').inc()
+    assert counter.render() == '\n'.join([
+        '# HELP requests_total Requests.',
+        '# TYPE requests_total counter',
+        'requests_total{method="GET"} 3.0',
+        'requests_total{method="PO\\"ST"} 1.0',
+    ])
+
+    histogram = Histogram('latency_seconds', 'Latency.', buckets=(.1, 1))
+    for value in (.05, .5, .5, 5):
+        histogram.observe(value)
+    assert histogram.render().split('\n')[2:] == [
+        'latency_seconds_bucket{le="0.1"} 1.0',
+        'latency_seconds_bucket{le="1.0"} 3.0',
+        'latency_seconds_bucket{le="+Inf"} 4.0',
+        'latency_seconds_sum 6.05',
+        'latency_seconds_count 4.0',
+    ]
+
+
+def test_schema_metrics():
+    metrics = MetricsRegistry()
+    schema = graphene.Schema(query=Query, metrics=metrics, middlewares=[Middleware()],
+                             response_cache=ResponseCache(default_ttl=10))
+    assert schema.execute('query Hello { hello }').data == {'hello': 'World'}
+    assert schema.execute('query Hello { hello }').data == {'hello': 'World'}
+    assert schema.execute('{ hello fail cached }').errors
+    assert schema.execute('{ unknown }').invalid
+
+    assert get_samples(metrics.operations) == {
+        ('graphql_operations_total', (('operation_type', 'query'), ('operation_name', 'Hello'))): 2,
+        ('graphql_operations_total', (('operation_type', 'query'), ('operation_name', ''))): 2,
+    }
+    assert get_samples(metrics.errors) == {
+        ('graphql_errors_total', (('operation_name', ''), )): 2,
+    }
+    assert metrics.operation_duration.labels('Hello').count == 2
+    fields = dict((labels[0], value) for labels, value in metrics.field_duration.values.items())
+    # The second query was a hit of the response cache
+    assert fields['Query.hello'].count == 2
+    assert fields['Query.fail'].count == 1
+    assert metrics.middleware_duration.labels().count == 4
+
+    rendered = metrics.render()
+    assert 'graphql_response_cache_total{result="hit"} 1.0' in rendered
+    assert 'graphql_field_cache_total{result="miss"} 1.0' in rendered
+    assert '# TYPE graphql_field_duration_seconds histogram' in rendered
+    assert 'graphql_field_duration_seconds_count{field="Query.fail"} 1.0' in rendered
+
+
+def test_schema_metrics_operation_names():
+    metrics = MetricsRegistry(max_operation_names=2)
+    schema = graphene.Schema(query=Query, metrics=metrics)
+    for name in ('First', 'Second', 'Third', 'Fourth', 'First'):
+        schema.execute('query %s { hello }' % name)
+    schema.execute('{ hello }')
+    assert sorted(labels for labels in metrics.operation_duration.values) == [
+        ('', ), ('First', ), ('Second', ), ('other', ),
+    ]
+    assert metrics.operation_duration.labels('First').count == 2
+    assert metrics.operation_duration.labels('other').count == 2
+
+    metrics = MetricsRegistry(operation_names=['Second'])
+    schema = graphene.Schema(query=Query, metrics=metrics)
+    for name in ('First', 'Second'):
+        schema.execute('query %s { hello }' % name)
+    assert sorted(labels for labels in metrics.operation_duration.values) == [('Second', ), ('other', )]
+
+
+def test_schema_metrics_async():
+    import pytest
+    asyncio = pytest.importorskip('asyncio')
+    metrics = MetricsRegistry()
+    schema = graphene.Schema(query=Query, metrics=metrics)
+    loop = asyncio.new_event_loop()
+    result = loop.run_until_complete(schema.execute_async('{ hello }', loop=loop))
+    loop.close()
+    assert result.data == {'hello': 'World'}
+    assert metrics.operations.labels('query', '').value == 1
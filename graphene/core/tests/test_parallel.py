@@ -0,0 +1,130 @@
+import time
+from threading import Lock, current_thread
+
+import pytest
+
+import graphene
+from graphene.core.parallel import ParallelExecutor
+
+pytest.importorskip('concurrent.futures')
+
+
+class Counter(object):
+
+    def __init__(self):
+        self.current = 0
+        self.max = 0
+        self.lock = Lock()
+
+    def __enter__(self):
+        with self.lock:
+            self.current += 1
+            self.max = max(self.max, self.current)
+
+    def __exit__(self, *args):
+        with self.lock:
+            self.current -= 1
+
+
+counter = Counter()
+threads = []
+
+
+def slow_resolver(name):
+    def resolver(self, args, info):
+        threads.append(current_thread())
+        with counter:
+            time.sleep(0.05)
+        return name
+    return resolver
+
+
+class Detail(graphene.ObjectType):
+    name = graphene.String()
+    slow = graphene.String(resolver=slow_resolver('detail'))
+
+
+class Query(graphene.ObjectType):
+    a = graphene.String(resolver=slow_resolver('a'))
+    b = graphene.String(resolver=slow_resolver('b'))
+    c = graphene.String(resolver=slow_resolver('c'))
+    d = graphene.String(resolver=slow_resolver('d'))
+    detail = graphene.Field(Detail, resolver=lambda *args: Detail(name='detail'))
+
+
+class Mutation(graphene.ObjectType):
+    a = graphene.String(resolver=slow_resolver('a'))
+    b = graphene.String(resolver=slow_resolver('b'))
+
+
+schema = graphene.Schema(query=Query, mutation=Mutation, parallel=True)
+
+
+def setup_function(function):
+    counter.max = 0
+    del threads[:]
+
+
+def test_parallel_siblings():
+    result = schema.execute('{ a b c d detail { name slow } }')
+    assert not result.errors
+    assert result.data == {'a': 'a', 'b': 'b', 'c': 'c', 'd': 'd', 'detail': {'name': 'detail', 'slow': 'detail'}}
+    assert counter.max >= 4
+    assert current_thread() not in threads
+
+
+def test_parallel_max_concurrency():
+    limited_schema = graphene.Schema(query=Query, parallel=True, max_concurrency=2)
+    result = limited_schema.execute('{ a b c d }')
+    assert result.data == {'a': 'a', 'b': 'b', 'c': 'c', 'd': 'd'}
+    assert counter.max == 2
+
+
+def test_parallel_mutations_in_order():
+    result = schema.execute('mutation { a b }')
+    assert result.data == {'a': 'a', 'b': 'b'}
+    assert counter.max == 1
+    assert threads == [current_thread()] * 2
+
+
+def test_parallel_executor_per_operation():
+    serial_schema = graphene.Schema(query=Query)
+    executor = ParallelExecutor(serial_schema, max_concurrency=1)
+    result = serial_schema.execute('{ a b }', executor=executor)
+    assert result.data == {'a': 'a', 'b': 'b'}
+    assert executor.dispatched == 2
+    assert (counter.max, executor.in_flight) == (1, 0)
+
+
+def test_parallel_async_resolvers():
+    asyncio = pytest.importorskip('asyncio')
+    loop_threads = {}
+
+    @asyncio.coroutine
+    def coroutine_resolver(self, args, info):
+        loop_threads['coroutine'] = current_thread()
+        return 'coroutine'
+
+    def awaitable_resolver(self, args, info):
+        loop_threads['awaitable'] = current_thread()
+        return asyncio.sleep(0.01, result='awaitable')
+
+    class AsyncQuery(graphene.ObjectType):
+        coroutine = graphene.String(resolver=coroutine_resolver)
+        awaitable = graphene.String(resolver=awaitable_resolver)
+        sync = graphene.String(resolver=lambda *args: 'sync')
+
+    async_schema = graphene.Schema(query=AsyncQuery, parallel=True)
+    loop = asyncio.new_event_loop()
+    executor = ParallelExecutor(async_schema)
+    try:
+        result = loop.run_until_complete(
+            async_schema.execute_async('{ coroutine awaitable sync }', executor=executor, loop=loop))
+    finally:
+        loop.close()
+    assert not result.errors
+    assert result.data == {'coroutine': 'coroutine', 'awaitable': 'awaitable', 'sync': 'sync'}
+    # The coroutine function is resolved in the loop, the others in the pool
+    assert loop_threads['coroutine'] is current_thread()
+    assert loop_threads['awaitable'] is not current_thread()
+    assert executor.dispatched == 2
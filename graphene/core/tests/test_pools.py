@@ -0,0 +1,156 @@
+import time
+from threading import current_thread
+
+import pytest
+
+import graphene
+from graphene.core.pools import ProcessResolverPool, ThreadResolverPool
+
+pytest.importorskip('concurrent.futures')
+
+
+threads = {}
+spans = {}
+
+
+class Query(graphene.ObjectType):
+    first = graphene.String(run_in='thread')
+    second = graphene.String(run_in='thread')
+    inline = graphene.String(run_in='sync')
+    default = graphene.String()
+    plain = graphene.String()
+    fails = graphene.String(run_in='thread')
+    numbers = graphene.Int().List
+
+    def resolve_first(self, args, info):
+        threads['first'] = current_thread()
+        start = time.time()
+        time.sleep(0.05)
+        spans['first'] = start, time.time()
+        return 'first'
+
+    def resolve_second(self, args, info):
+        threads['second'] = current_thread()
+        start = time.time()
+        time.sleep(0.05)
+        spans['second'] = start, time.time()
+        return 'second'
+
+    def resolve_inline(self, args, info):
+        threads['inline'] = current_thread()
+        return 'inline'
+
+    def resolve_default(self, args, info):
+        threads['default'] = current_thread()
+        return 'default'
+
+    def resolve_fails(self, args, info):
+        raise Exception('Fails')
+
+    def resolve_numbers(self, args, info):
+        threads['numbers'] = current_thread()
+        return [1, 2]
+
+
+schema = graphene.Schema(query=Query)
+
+
+def setup_function(function):
+    threads.clear()
+    spans.clear()
+
+
+def test_run_in_thread():
+    result = schema.execute('{ first second inline default plain fails }')
+    # They slept at the same time
+    assert spans['first'][0] < spans['second'][1] and spans['second'][0] < spans['first'][1]
+    assert result.data == {
+        'first': 'first', 'second': 'second', 'inline': 'inline',
+        'default': 'default', 'plain': None, 'fails': None,
+    }
+    assert str(result.errors[0]) == 'Fails'
+    main = current_thread()
+    assert threads['first'] is not main
+    assert threads['second'] is not main
+    assert threads['inline'] is main
+    assert threads['default'] is main
+
+    pool = schema.thread_pool
+    assert (pool.queued, pool.running, pool.completed) == (0, 0, 3)
+    assert pool.wait_stats['Query.first'].count == 1
+
+
+def test_run_in_thread_schema_default():
+    pool = ThreadResolverPool(max_workers=2)
+    thread_schema = graphene.Schema(query=Query, run_in='thread', thread_pool=pool)
+    result = thread_schema.execute('{ inline default plain numbers }')
+    assert result.data == {'inline': 'inline', 'default': 'default', 'plain': None, 'numbers': [1, 2]}
+    main = current_thread()
+    assert threads['inline'] is main
+    assert threads['default'] is not main
+    assert threads['numbers'] is not main
+    # Fields without a resolver are not dispatched
+    assert pool.completed == 2
+    pool.shutdown()
+
+
+def test_run_in_unknown():
+    class Query(graphene.ObjectType):
+        field = graphene.String(run_in='gpu')
+
+    schema = graphene.Schema(query=Query)
+    with pytest.raises(ValueError):
+        schema.schema
+
+
+class Scored(graphene.ObjectType):
+    score = graphene.Int(power=graphene.Int(), run_in='process')
+    fails = graphene.Int(run_in='process')
+
+    def resolve_score(self, args, info):
+        return self.value ** args.get('power', 1)
+
+    def resolve_fails(self, args, info):
+        raise ValueError('Fails')
+
+
+class ScoredQuery(graphene.ObjectType):
+    items = graphene.Field(Scored.List())
+
+    def resolve_items(self, args, info):
+        return [Value(i) for i in range(5)]
+
+
+class Value(object):
+
+    def __init__(self, value):
+        self.value = value
+
+
+@pytest.mark.parametrize('batch_size,tasks', [(1, 10), (3, 4)])
+def test_run_in_process(batch_size, tasks):
+    pool = ProcessResolverPool(max_workers=2, batch_size=batch_size, batch_wait=0.2)
+    schema = graphene.Schema(query=ScoredQuery, process_pool=pool)
+    try:
+        result = schema.execute('{ items { score(power: 2) fails } }')
+    finally:
+        pool.shutdown()
+    assert result.data == {'items': [{'score': i ** 2, 'fails': None} for i in range(5)]}
+    assert len(result.errors) == 5
+    assert str(result.errors[0]) == 'Fails'
+    assert (pool.queued, pool.running, pool.completed) == (0, 0, 10)
+    assert pool.tasks == tasks
+    assert pool.wait_stats['Scored.score'].count == 5
+
+
+def test_run_in_process_not_picklable():
+    def resolver(self, args, info):
+        return 1
+
+    class Query(graphene.ObjectType):
+        field = graphene.Int(resolver=resolver, run_in='process')
+
+    schema = graphene.Schema(query=Query)
+    with pytest.raises(AssertionError) as excinfo:
+        schema.schema
+    assert 'picklable' in str(excinfo.value)
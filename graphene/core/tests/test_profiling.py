@@ -0,0 +1,94 @@
+import os
+import pstats
+import time
+
+import graphene
+from graphene.middlewares import ProfilingMiddleware
+
+
+def count_words(name):
+    return len(name.split())
+
+
+class Product(graphene.ObjectType):
+    name = graphene.String()
+    words = graphene.Int()
+
+    def resolve_words(self, args, info):
+        return count_words(self.name)
+
+
+class Query(graphene.ObjectType):
+    products = graphene.List(Product)
+    slow = graphene.Int()
+
+    def resolve_products(self, args, info):
+        return [Product(name='a book'), Product(name='a red pen')]
+
+    def resolve_slow(self, args, info):
+        end = time.time() + .1
+        while time.time() < end:
+            pass
+        return 1
+
+
+class Context(object):
+
+    def __init__(self, profile=None):
+        self.graphene_profile = profile
+
+
+def test_profiling_cprofile(tmpdir):
+    schema = graphene.Schema(query=Query, profiling=ProfilingMiddleware(directory=str(tmpdir), top=1000))
+    result = schema.execute('query Products { products { name words } }', context_value=Context(True))
+    assert result.data == {'products': [{'name': 'a book', 'words': 2}, {'name': 'a red pen', 'words': 3}]}
+    profile = result.extensions['profile']
+    assert profile['mode'] == 'cprofile'
+    assert profile['calls'] > 0
+    counts = {field['path']: field['count'] for field in profile['fields']}
+    assert counts == {'products': 1, 'products.name': 2, 'products.words': 2}
+    functions = [function['function'] for function in profile['functions']]
+    assert any(function.endswith('(count_words [products.words])') for function in functions)
+
+    filename = profile['file']
+    assert os.path.dirname(filename) == str(tmpdir)
+    assert filename.endswith('-Products.prof')
+    stats = pstats.Stats(filename)
+    assert [name for _, _, name in stats.stats if name == 'resolve_products [products]']
+
+
+def test_profiling_sampling(tmpdir):
+    profiling = ProfilingMiddleware(mode='sampling', directory=str(tmpdir), interval=.001)
+    schema = graphene.Schema(query=Query, profiling=profiling)
+    result = schema.execute('{ slow }', context_value=Context(True))
+    assert result.data == {'slow': 1}
+    profile = result.extensions['profile']
+    assert profile['mode'] == 'sampling'
+    assert profile['samples'] > 0
+    slow, = profile['fields']
+    assert slow['path'] == 'slow'
+    assert slow['count'] == 1
+    assert slow['samples'] > 0
+    assert any('(resolve_slow)' in function['function'] for function in profile['functions'])
+
+    with open(profile['file']) as f:
+        lines = f.read().splitlines()
+    assert profile['file'].endswith('-anonymous.folded')
+    assert any(line.startswith('slow;') and 'resolve_slow' in line for line in lines)
+
+
+def test_profiling_per_request():
+    schema = graphene.Schema(query=Query, profiling=True)
+    result = schema.execute('{ products { name } }', context_value=Context())
+    assert not result.errors
+    assert not getattr(result, 'extensions', None)
+    result = schema.execute('{ products { name } }', context_value=Context('sampling'))
+    assert result.extensions['profile']['mode'] == 'sampling'
+    # The profile of the user in the context does not turn it on
+    context = Context()
+    context.profile = object()
+    result = schema.execute('{ products { name } }', context_value=context)
+    assert not getattr(result, 'extensions', None)
+    result = schema.execute('{ unknown }', context_value=Context(True))
+    assert result.invalid
+    assert not getattr(result, 'extensions', None)
@@ -227,3 +227,69 @@ type Pet {
 }
 """.lstrip()
     assert str(schema) == expected
+
+
+def test_schema_is_built_once():
+    schema = Schema(query=Human)
+    graphql_schema = schema.schema
+    assert schema.schema is graphql_schema
+
+    @schema.register
+    class Other(ObjectType):
+        name = String()
+
+    assert schema.schema is not graphql_schema
+    assert 'Other' in schema.schema.get_type_map()
+    graphql_schema = schema.schema
+
+    schema.query = Pet
+    assert schema.schema is not graphql_schema
+    assert schema.schema.get_query_type() == schema.T(Pet)
+
+
+def test_schema_is_built_again_when_a_type_is_replaced():
+    schema = Schema(query=Human)
+
+    @schema.register
+    class Other(ObjectType):
+        x = String()
+
+    assert list(schema.schema.get_type('Other').get_fields()) == ['x']
+    graphql_schema = schema.schema
+    schema.register(Other)
+    assert schema.schema is graphql_schema
+
+    class OtherReplacement(ObjectType):
+        y = String()
+
+        class Meta:
+            type_name = 'Other'
+
+    schema.register(OtherReplacement, force=True)
+    assert list(schema.schema.get_type('Other').get_fields()) == ['y']
+    assert schema.objecttype(schema.schema.get_type('Other')) == OtherReplacement
+
+
+def test_schema_objecttype_lookup():
+    schema = Schema(query=Human)
+    schema.schema
+    assert schema.objecttype(schema.T(Human)) == Human
+    assert schema.objecttype(schema.T(Pet)) == Pet
+    assert schema.objecttype(schema.T(List(Pet))) is None
+
+
+def test_get_type_does_not_setup_registered_types():
+    schema = Schema(query=Human)
+    schema.setup()
+    schema.setup = None
+    assert schema.get_type('Human') == Human
+
+
+def test_get_type_for_instance():
+    class SpecialHuman(Human):
+        pass
+
+    schema = Schema(query=Human)
+    assert schema.get_type_for_instance(Human()) == schema.T(Human)
+    assert schema.get_type_for_instance(SpecialHuman()) == schema.T(SpecialHuman)
+    assert schema.get_type_for_instance(object()) is None
@@ -0,0 +1,105 @@
+import logging
+
+import graphene
+from graphene.middlewares import SlowOperationLog
+from graphene.middlewares.slow_operations import redact_variables
+
+
+class Review(graphene.ObjectType):
+    stars = graphene.Int()
+
+
+class Product(graphene.ObjectType):
+    name = graphene.String()
+    reviews = graphene.List(Review)
+
+    def resolve_reviews(self, args, info):
+        return [Review(stars=stars) for stars in range(1, 4)]
+
+
+class Query(graphene.ObjectType):
+    products = graphene.List(Product, token=graphene.String(), limit=graphene.Int())
+
+    def resolve_products(self, args, info):
+        return [Product(name='book'), Product(name='pen')]
+
+
+class Context(object):
+    pass
+
+
+class RecordingHandler(logging.Handler):
+
+    def __init__(self):
+        super(RecordingHandler, self).__init__()
+        self.records = []
+
+    def emit(self, record):
+        self.records.append(record)
+
+
+def get_logger(name):
+    handler = RecordingHandler()
+    logger = logging.getLogger(name)
+    logger.propagate = False
+    logger.addHandler(handler)
+    return logger, handler
+
+
+QUERY = '''
+query Products($token: String, $limit: Int) {
+  products(token: $token, limit: $limit) { name reviews { stars } }
+}
+'''
+
+
+def test_slow_operation_log():
+    logger, handler = get_logger('graphene.tests.slow_operations')
+    schema = graphene.Schema(query=Query, slow_operation_log=SlowOperationLog(threshold=0, logger=logger))
+    result = schema.execute(QUERY, context_value=Context(), variable_values={'token': 'secret', 'limit': 2})
+    assert not result.errors
+    record, = handler.records
+    assert record.getMessage().startswith('Slow operation Products (')
+    entry = record.slow_operation
+    assert entry['operation_name'] == 'Products'
+    assert len(entry['document_hash']) == 40
+    assert entry['variables'] == {'token': '[REDACTED]', 'limit': 2}
+    assert entry['duration'] > 0
+    counts = {field['path']: field['count'] for field in entry['fields']}
+    assert counts == {'products': 1, 'products.name': 2, 'products.reviews': 2, 'products.reviews.stars': 6}
+    durations = [field['duration'] for field in entry['fields']]
+    assert durations == sorted(durations, reverse=True)
+
+
+def test_slow_operation_log_threshold():
+    logger, handler = get_logger('graphene.tests.slow_operations_threshold')
+    schema = graphene.Schema(query=Query, slow_operation_log=SlowOperationLog(threshold=60, logger=logger))
+    result = schema.execute(QUERY, context_value=Context())
+    assert not result.errors
+    assert not handler.records
+    assert isinstance(graphene.Schema(query=Query, slow_operation_log=1.5).slow_operation_log, SlowOperationLog)
+
+
+def test_slow_operation_log_top_fields():
+    entries = []
+
+    class Log(SlowOperationLog):
+
+        def log(self, entry):
+            entries.append(entry)
+
+    schema = graphene.Schema(query=Query, slow_operation_log=Log(threshold=0, top=2))
+    schema.execute(QUERY, context_value=Context())
+    schema.execute('{ products { name } }')
+    first, second = entries
+    assert len(first['fields']) == 2
+    assert second['operation_name'] is None
+    assert second['variables'] == {}
+    # Without a context the fields are not counted
+    assert second['fields'] == []
+
+
+def test_redact_variables():
+    variables = {'input': {'password': 'x', 'names': [{'apiKey': 'y', 'name': 'z'}]}, 'first': 1}
+    assert redact_variables(variables) == {
+        'input': {'password': '[REDACTED]', 'names': [{'apiKey': '[REDACTED]', 'name': 'z'}]}, 'first': 1}
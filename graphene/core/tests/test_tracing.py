@@ -0,0 +1,90 @@
+import graphene
+from graphene.middlewares import TracingMiddleware
+
+
+class Review(graphene.ObjectType):
+    stars = graphene.Int()
+
+
+class Product(graphene.ObjectType):
+    name = graphene.String()
+    reviews = graphene.List(Review)
+
+    def resolve_reviews(self, args, info):
+        return [Review(stars=stars) for stars in range(1, 3)]
+
+
+class Query(graphene.ObjectType):
+    products = graphene.List(Product)
+    fail = graphene.String()
+
+    def resolve_products(self, args, info):
+        return [Product(name='book'), Product(name='pen')]
+
+    def resolve_fail(self, args, info):
+        raise Exception('Failed')
+
+
+class Context(object):
+    pass
+
+
+def test_tracing():
+    schema = graphene.Schema(query=Query, tracing=True)
+    result = schema.execute('{ products { name reviews { rating: stars } } fail }', context_value=Context())
+    assert result.errors[0].message == 'Failed'
+    assert result.data['products'][1] == {'name': 'pen', 'reviews': [{'rating': 1}, {'rating': 2}]}
+    tracing = result.extensions['tracing']
+    assert tracing['version'] == 1
+    assert list(tracing) == ['version', 'startTime', 'endTime', 'duration', 'parsing', 'validation', 'execution']
+    parsing, validation, execution = tracing['parsing'], tracing['validation'], tracing['execution']
+    assert parsing['startOffset'] + parsing['duration'] <= validation['startOffset']
+    assert validation['startOffset'] + validation['duration'] <= execution['startOffset']
+    assert execution['startOffset'] + execution['duration'] <= tracing['duration']
+
+    resolvers = {tuple(resolver['path']): resolver for resolver in execution['resolvers']}
+    assert sorted(resolvers, key=str) == sorted([
+        ('fail', ), ('products', ),
+        ('products', 0, 'name'), ('products', 0, 'reviews'),
+        ('products', 0, 'reviews', 0, 'rating'), ('products', 0, 'reviews', 1, 'rating'),
+        ('products', 1, 'name'), ('products', 1, 'reviews'),
+        ('products', 1, 'reviews', 0, 'rating'), ('products', 1, 'reviews', 1, 'rating'),
+    ], key=str)
+    reviews = resolvers[('products', 1, 'reviews')]
+    assert reviews['parentType'] == 'Product'
+    assert reviews['fieldName'] == 'reviews'
+    assert reviews['returnType'] == '[Review]'
+    assert reviews['startOffset'] >= execution['startOffset']
+    assert reviews['duration'] >= 0
+
+
+def test_tracing_invalid_operation():
+    schema = graphene.Schema(query=Query, tracing=True)
+    result = schema.execute('{ unknown }', context_value=Context())
+    assert result.invalid
+    tracing = result.extensions['tracing']
+    assert list(tracing) == ['version', 'startTime', 'endTime', 'duration', 'parsing', 'validation', 'execution']
+    assert tracing['execution'] == {'resolvers': []}
+
+
+def test_tracing_aggregate():
+    tracing = TracingMiddleware(aggregate=True)
+    schema = graphene.Schema(query=Query, tracing=tracing)
+    for _ in range(3):
+        result = schema.execute('{ products { name reviews { stars } } }', context_value=Context())
+        assert not result.errors
+        assert not getattr(result, 'extensions', None)
+    assert sorted(tracing.fields) == ['products', 'products.name', 'products.reviews', 'products.reviews.stars']
+    assert tracing.fields['products'].count == 3
+    assert tracing.fields['products.reviews.stars'].count == 12
+    assert sorted(tracing.phases) == ['execution', 'parsing', 'validation']
+    histogram = tracing.phases['execution']
+    assert list(histogram.cumulative_counts())[-1] == (float('inf'), 3)
+    assert histogram.sum > 0
+
+
+def test_tracing_without_context():
+    schema = graphene.Schema(query=Query, tracing=True)
+    result = schema.execute('{ products { name } }')
+    assert result.data == {'products': [{'name': 'book'}, {'name': 'pen'}]}
+    assert result.extensions['tracing']['execution']['resolvers'] == []
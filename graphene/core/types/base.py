@@ -143,13 +143,16 @@ class GroupNamedType(InstanceType):
     def __init__(self, *types):
         self.types = types
 
-    def get_named_type(self, schema, type):
+    def get_name(self, schema, type):
         name = type.name
         if not name and schema.auto_camelcase:
             name = to_camel_case(type.default_name)
         elif not name:
             name = type.default_name
-        return name, schema.T(type)
+        return name
+
+    def get_named_type(self, schema, type):
+        return self.get_name(schema, type), schema.T(type)
 
     def iter_types(self, schema):
         return map(partial(self.get_named_type, schema), self.types)
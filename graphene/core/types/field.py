@@ -6,6 +6,7 @@ from graphql.type import GraphQLField, GraphQLInputObjectField
 
 from ...utils import maybe_func
 from ...utils.wrap_resolver_function import wrap_resolver_function
+from ..batching import batch_resolver, get_batch_target, prefetch_resolver
 from ..classtypes.base import FieldsClassType
 from ..classtypes.inputobjecttype import InputObjectType
 from ..classtypes.mutation import Mutation
@@ -13,7 +14,16 @@ from ..exceptions import SkipField
 from .argument import Argument, ArgumentsGroup
 from .base import (ArgumentType, GroupNamedType, LazyType, MountType,
                    NamedType, OrderedType)
-from .definitions import NonNull
+from .definitions import List, NonNull
+from .scalars import coerce_list_resolver, is_scalar_list
+
+
+def pop_option(kwargs, name, default=None):
+    # The options share the keyword arguments with the GraphQL arguments
+    # of the field, an argument with the same name is kept as such
+    if isinstance(kwargs.get(name), (Argument, ArgumentType)):
+        return default
+    return kwargs.pop(name, default)
 
 
 class Field(NamedType, OrderedType):
@@ -23,6 +33,18 @@ class Field(NamedType, OrderedType):
             source=None, required=False, default=None, deprecation_reason=None,
             *args_list, **kwargs):
         _creation_counter = kwargs.pop('_creation_counter', None)
+        # Cost hint used by the query cost analysis
+        self.cost = pop_option(kwargs, 'cost')
+        # Result caching, see graphene.cache.FieldCache
+        self.cache_ttl = pop_option(kwargs, 'cache_ttl')
+        self.cache_key = pop_option(kwargs, 'cache_key')
+        self.cache_scope = pop_option(kwargs, 'cache_scope')
+        # Where the resolver runs: 'sync', 'thread', 'process' or the schema default
+        self.run_in = pop_option(kwargs, 'run_in')
+        # Batch fields resolve the field for a whole list of objects at once
+        self.batch = pop_option(kwargs, 'batch', False)
+        # Topic of the events of subscription fields: a string or topic(args, context)
+        self.topic = pop_option(kwargs, 'topic')
         if isinstance(name, (Argument, ArgumentType)):
             kwargs['name'] = name
             name = None
@@ -84,6 +106,28 @@ class Field(NamedType, OrderedType):
             return maybe_func(value)
         return default_getter
 
+    def has_custom_resolver(self):
+        return bool(self.resolver_fn) or hasattr(self.object_type, 'resolve_%s' % self.attname)
+
+    def get_run_in(self, schema):
+        if self.run_in:
+            return self.run_in
+        # The default getters are cheaper to run than to dispatch
+        if schema.run_in and self.has_custom_resolver():
+            return schema.run_in
+
+    def get_cost_multiplier(self, args):
+        '''
+        Number of times the selection of the field is resolved for each
+        parent object, None when it is not known before execution.
+        '''
+        type = self.type
+        if isinstance(type, NonNull):
+            type = type.of_type
+        if isinstance(type, List):
+            return None
+        return 1
+
     def get_type(self, schema):
         if self.required:
             return NonNull(self.type)
@@ -104,6 +148,8 @@ class Field(NamedType, OrderedType):
             arguments = type_objecttype.get_arguments()
             resolver = getattr(type_objecttype, 'mutate')
             resolver = wrap_resolver_function(resolver)
+        elif self.batch:
+            resolver = batch_resolver(self, resolver)
         else:
             my_resolver = wrap_resolver_function(resolver)
 
@@ -114,6 +160,20 @@ class Field(NamedType, OrderedType):
                 return my_resolver(instance, args, context, info)
             resolver = wrapped_func
 
+        batch_target = get_batch_target(schema, type)
+        if batch_target:
+            resolver = prefetch_resolver(resolver, *batch_target)
+
+        run_in = self.get_run_in(schema)
+        if run_in and run_in != 'sync':
+            resolver = schema.get_resolver_pool(run_in).wrap(self, resolver)
+
+        if is_scalar_list(type):
+            resolver = coerce_list_resolver(resolver)
+
+        if self.cache_ttl is not None and not (type_objecttype and issubclass(type_objecttype, Mutation)):
+            resolver = schema.field_cache.wrap(self, resolver)
+
         assert type, 'Internal type for field %s is None' % str(self)
         return GraphQLField(
             type,
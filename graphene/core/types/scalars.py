@@ -1,8 +1,17 @@
+import array
+from functools import wraps
+
 from graphql.type import (GraphQLBoolean, GraphQLFloat, GraphQLID, GraphQLInt,
-                          GraphQLString)
+                          GraphQLList, GraphQLNonNull, GraphQLString)
+from promise import Promise, is_thenable
 
 from .base import MountedType
 
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
 
 class ScalarType(MountedType):
 
@@ -28,3 +37,49 @@ class ID(ScalarType):
 
 class Float(ScalarType):
     _internal_type = GraphQLFloat
+
+
+BUILTIN_SCALARS = (GraphQLString, GraphQLInt, GraphQLBoolean, GraphQLID, GraphQLFloat)
+
+# Containers whose ``tolist`` converts every item to a native python value
+# in C, so the per-item ``serialize`` of the executor only sees cheap types.
+BUFFER_TYPES = (array.array, memoryview)
+if numpy is not None:
+    BUFFER_TYPES += (numpy.ndarray, )
+
+
+def is_scalar_list(type):
+    '''
+    Returns True if the given GraphQL type is a (possibly nested or non null)
+    list of the builtin scalars.
+    '''
+    if isinstance(type, GraphQLNonNull):
+        type = type.of_type
+    if not isinstance(type, GraphQLList):
+        return False
+    of_type = type.of_type
+    if isinstance(of_type, GraphQLNonNull):
+        of_type = of_type.of_type
+    if isinstance(of_type, (GraphQLList, GraphQLNonNull)):
+        return is_scalar_list(of_type)
+    return of_type in BUILTIN_SCALARS
+
+
+def coerce_list(value):
+    '''
+    Converts typed buffers (NumPy arrays, ``array.array`` and memoryviews)
+    into plain lists in bulk. Any other value is returned untouched.
+    '''
+    if isinstance(value, BUFFER_TYPES):
+        return value.tolist()
+    return value
+
+
+def coerce_list_resolver(resolver):
+    @wraps(resolver)
+    def inner(instance, args, context, info):
+        result = resolver(instance, args, context, info)
+        if is_thenable(result):
+            return Promise.resolve(result).then(coerce_list)
+        return coerce_list(result)
+    return inner
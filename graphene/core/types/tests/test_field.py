@@ -1,12 +1,13 @@
 from graphql.type import GraphQLField, GraphQLInputObjectField, GraphQLString
 
+from graphene.core.cost import QueryCostAnalyzer
 from graphene.core.schema import Schema
 from graphene.core.types import InputObjectType, ObjectType
 
 from ..base import LazyType
 from ..definitions import List
 from ..field import Field, InputField
-from ..scalars import String
+from ..scalars import Int, String
 
 
 def test_field_internal_type():
@@ -234,3 +235,26 @@ def test_field_resolve_source_object():
         att_func = field_func
 
     assert field.resolver(Root, {}, None) is True
+
+
+def test_field_arguments_with_option_names():
+    names = ('cost', 'cache_ttl', 'cache_key', 'cache_scope', 'run_in', 'batch', 'topic')
+
+    def resolver(root, args, info):
+        return ','.join('{}={}'.format(name, args[name]) for name in names if name in args)
+
+    field = Field(String(), resolver=resolver, **{name: Int() for name in names})
+
+    class Query(ObjectType):
+        options = field
+
+    assert field.cost is None
+    assert field.cache_ttl is None
+    assert field.run_in is None
+    assert field.batch is False
+    assert sorted(argument.default_name for argument in field.arguments) == sorted(names)
+    schema = Schema(query=Query, cost_analyzer=QueryCostAnalyzer(max_cost=10))
+    result = schema.execute(
+        '{ options(cost: 1, cacheTtl: 2, cacheKey: 3, cacheScope: 4, runIn: 5, batch: 6, topic: 7) }')
+    assert not result.errors
+    assert result.data == {'options': 'cost=1,cache_ttl=2,cache_key=3,cache_scope=4,run_in=5,batch=6,topic=7'}
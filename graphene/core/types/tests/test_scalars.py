@@ -1,9 +1,16 @@
+import array
+
+import pytest
 from graphql.type import (GraphQLBoolean, GraphQLFloat, GraphQLID, GraphQLInt,
+                          GraphQLList, GraphQLNonNull, GraphQLObjectType,
                           GraphQLString)
 
+from graphene.core.classtypes import ObjectType
 from graphene.core.schema import Schema
 
-from ..scalars import ID, Boolean, Float, Int, String
+from ..definitions import List, NonNull
+from ..scalars import (ID, Boolean, Float, Int, String, coerce_list,
+                       is_scalar_list)
 
 schema = Schema()
 
@@ -26,3 +33,76 @@ def test_id_scalar():
 
 def test_float_scalar():
     assert schema.T(Float()) == GraphQLFloat
+
+
+def test_is_scalar_list():
+    assert is_scalar_list(GraphQLList(GraphQLFloat))
+    assert is_scalar_list(GraphQLNonNull(GraphQLList(GraphQLNonNull(GraphQLInt))))
+    assert is_scalar_list(GraphQLList(GraphQLList(GraphQLBoolean)))
+    assert not is_scalar_list(GraphQLFloat)
+    assert not is_scalar_list(GraphQLList(GraphQLObjectType('Other', fields={})))
+
+
+def test_coerce_list_array():
+    assert coerce_list(array.array('d', [1.5, 2.5])) == [1.5, 2.5]
+    assert coerce_list(memoryview(array.array('l', [1, 2]))) == [1, 2]
+    values = [1, 2]
+    assert coerce_list(values) is values
+
+
+def test_coerce_list_numpy():
+    numpy = pytest.importorskip('numpy')
+    coerced = coerce_list(numpy.array([1.5, 2.5], dtype=numpy.float32))
+    assert coerced == [1.5, 2.5]
+    assert all(type(v) is float for v in coerced)
+
+
+def test_scalar_list_field_arrays():
+
+    class Query(ObjectType):
+        floats = List(Float())
+        ints = NonNull(List(Int()))
+        nested = List(List(Int()))
+
+        def resolve_floats(self, args, info):
+            return array.array('d', [0, 0.5, 1])
+
+        def resolve_ints(self, args, info):
+            return array.array('i', [1, 2, 3])
+
+        def resolve_nested(self, args, info):
+            return [memoryview(array.array('l', [1, 2])), array.array('i')]
+
+    result = Schema(query=Query).execute('{ floats ints nested }')
+    assert not result.errors
+    assert result.data == {
+        'floats': [0, 0.5, 1],
+        'ints': [1, 2, 3],
+        'nested': [[1, 2], []],
+    }
+
+
+def test_scalar_list_field_buffers():
+    numpy = pytest.importorskip('numpy')
+
+    class Query(ObjectType):
+        floats = List(Float())
+        ints = NonNull(List(Int()))
+        flags = List(Boolean())
+
+        def resolve_floats(self, args, info):
+            return numpy.arange(3, dtype=numpy.float64) / 2
+
+        def resolve_ints(self, args, info):
+            return numpy.arange(1, 4, dtype=numpy.int32)
+
+        def resolve_flags(self, args, info):
+            return numpy.array([True, False])
+
+    result = Schema(query=Query).execute('{ floats ints flags }')
+    assert not result.errors
+    assert result.data == {
+        'floats': [0, 0.5, 1],
+        'ints': [1, 2, 3],
+        'flags': [True, False],
+    }
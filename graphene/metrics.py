@@ -0,0 +1,270 @@
+from bisect import bisect_left
+from threading import Lock, local
+
+try:
+    from time import perf_counter as clock
+except ImportError:
+    from time import time as clock
+
+OTHER_OPERATION = 'other'
+
+DEFAULT_BUCKETS = (.0001, .00025, .0005, .001, .0025, .005, .01, .025, .05, .1, .25, .5, 1, 2.5, 5, 10)
+
+
+def format_value(value):
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value))
+
+
+def format_labels(labels):
+    if not labels:
+        return ''
+    return '{' + ','.join('{}="{}"'.format(
+        name, str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+    ) for name, value in labels) + '}'
+
+
+class CounterValue(object):
+
+    def __init__(self):
+        self.value = 0
+        self._lock = Lock()
+
+    def inc(self, amount=1):
+        with self._lock:
+            self.value += amount
+
+    def samples(self):
+        yield '', (), self.value
+
+
+class HistogramValue(object):
+    '''
+    Counts of the observed values (durations in seconds) up to every
+    bucket.
+    '''
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0
+        self._lock = Lock()
+
+    def observe(self, value):
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            self.counts[index] += 1
+            self.count += 1
+            self.sum += value
+
+    def cumulative_counts(self):
+        total = 0
+        for bucket, count in zip(self.buckets + (float('inf'), ), self.counts):
+            total += count
+            yield bucket, total
+
+    def samples(self):
+        for bucket, count in self.cumulative_counts():
+            yield '_bucket', (('le', format_value(bucket)), ), count
+        yield '_sum', (), self.sum
+        yield '_count', (), self.count
+
+
+class Metric(object):
+    '''
+    A metric with a value for every combination of its labels.
+    '''
+    type = None
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.values = {}
+        self._lock = Lock()
+
+    def create_value(self):
+        raise NotImplementedError('create_value is not implemented in {}'.format(self.__class__.__name__))
+
+    def labels(self, *labelvalues):
+        value = self.values.get(labelvalues)
+        if value is None:
+            assert len(labelvalues) == len(self.labelnames), 'Expected the labels {}'.format(self.labelnames)
+            with self._lock:
+                value = self.values.setdefault(labelvalues, self.create_value())
+        return value
+
+    def samples(self):
+        for labelvalues, value in sorted(self.values.items()):
+            labels = tuple(zip(self.labelnames, labelvalues))
+            for suffix, extra_labels, sample in value.samples():
+                yield self.name + suffix, labels + extra_labels, sample
+
+    def render(self):
+        lines = [
+            '# HELP {} {}'.format(self.name, self.documentation.replace('\\', '\\\\').replace('\n', '\\n')),
+            '# TYPE {} {}'.format(self.name, self.type),
+        ]
+        for name, labels, value in self.samples():
+            lines.append('{}{} {}'.format(name, format_labels(labels), format_value(value)))
+        return '\n'.join(lines)
+
+
+class Counter(Metric):
+    type = 'counter'
+
+    def create_value(self):
+        return CounterValue()
+
+    def inc(self, amount=1):
+        self.labels().inc(amount)
+
+
+class Histogram(Metric):
+    type = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super(Histogram, self).__init__(name, documentation, labelnames)
+        self.buckets = buckets
+
+    def create_value(self):
+        return HistogramValue(self.buckets)
+
+    def observe(self, value):
+        self.labels().observe(value)
+
+
+class CallbackCounter(Metric):
+    '''
+    A counter kept by another object, ``callback`` returns its values
+    by labels when it is rendered.
+    '''
+    type = 'counter'
+
+    def __init__(self, name, documentation, labelnames, callback):
+        super(CallbackCounter, self).__init__(name, documentation, labelnames)
+        self.callback = callback
+
+    def samples(self):
+        for labelvalues, value in sorted(self.callback().items()):
+            yield self.name, tuple(zip(self.labelnames, labelvalues)), value
+
+
+class MetricsRegistry(object):
+    '''
+    In process metrics of the schemas created with ``metrics=registry``:
+    their operations (by name), errors, the time spent in every resolver
+    (by Type.field, without waiting for the promises they return) and in
+    the middlewares around them, and the hits of their caches.
+
+    ``render()`` returns them in the Prometheus text format.
+
+    The operation names come from the clients, so only the names in
+    ``operation_names`` (when it is given) or else the first
+    ``max_operation_names`` names seen are used as labels, the others
+    are counted as ``other``.
+    '''
+
+    def __init__(self, buckets=DEFAULT_BUCKETS, prefix='graphql', operation_names=None, max_operation_names=100):
+        self.prefix = prefix
+        self.allowed_operation_names = frozenset(operation_names) if operation_names is not None else None
+        self.max_operation_names = max_operation_names
+        self.operation_names = set()
+        self._operation_names_lock = Lock()
+        self.metrics = []
+        self.schemas = []
+        self.operations = self.register(Counter(
+            prefix + '_operations_total', 'Executed operations.', ('operation_type', 'operation_name')))
+        self.operation_duration = self.register(Histogram(
+            prefix + '_operation_duration_seconds', 'Duration of the operations.', ('operation_name', ), buckets))
+        self.errors = self.register(Counter(
+            prefix + '_errors_total', 'Errors in the results of the operations.', ('operation_name', )))
+        self.field_duration = self.register(Histogram(
+            prefix + '_field_duration_seconds', 'Time spent in the resolvers of the fields.', ('field', ), buckets))
+        self.middleware_duration = self.register(Histogram(
+            prefix + '_middleware_overhead_seconds', 'Time spent in the middlewares of the fields.', (), buckets))
+        self.register(CallbackCounter(
+            prefix + '_response_cache_total', 'Lookups in the response caches.', ('result', ),
+            self.get_response_cache_counts))
+        self.register(CallbackCounter(
+            prefix + '_field_cache_total', 'Lookups in the field caches.', ('result', ),
+            self.get_field_cache_counts))
+        self._local = local()
+
+    def register(self, metric):
+        self.metrics.append(metric)
+        return metric
+
+    def add_schema(self, schema):
+        self.schemas.append(schema)
+
+    def get_response_cache_counts(self):
+        caches = [schema.response_cache for schema in self.schemas if schema.response_cache]
+        if not caches:
+            return {}
+        return {
+            ('hit', ): sum(cache.hits for cache in caches),
+            ('stale', ): sum(cache.stale_hits for cache in caches),
+            ('miss', ): sum(cache.misses for cache in caches),
+        }
+
+    def get_field_cache_counts(self):
+        # Not created until a field with cache_ttl is built
+        caches = [schema._field_cache for schema in self.schemas if schema._field_cache]
+        if not caches:
+            return {}
+        return {
+            ('hit', ): sum(cache.hits for cache in caches),
+            ('miss', ): sum(cache.misses for cache in caches),
+        }
+
+    def get_operation_name(self, name):
+        if not name:
+            return ''
+        if self.allowed_operation_names is not None:
+            return name if name in self.allowed_operation_names else OTHER_OPERATION
+        if name not in self.operation_names:
+            with self._operation_names_lock:
+                if len(self.operation_names) >= self.max_operation_names:
+                    return OTHER_OPERATION
+                self.operation_names.add(name)
+        return name
+
+    def on_result(self, request, result):
+        # Called as an extension of the schemas
+        operation = request.operation
+        name = self.get_operation_name(operation.name.value if operation and operation.name else '')
+        self.operations.labels(operation.operation if operation else '', name).inc()
+        self.operation_duration.labels(name).observe(clock() - request.start)
+        if result.errors:
+            self.errors.labels(name).inc(len(result.errors))
+
+    def wrap_resolver(self, resolver):
+        '''
+        Times the resolver of a field, it has to be wrapped with
+        ``wrap_middlewares`` after its middlewares.
+        '''
+        def timed_resolver(root, args, context, info):
+            start = clock()
+            try:
+                return resolver(root, args, context, info)
+            finally:
+                duration = clock() - start
+                self._local.resolver_duration = duration
+                self.field_duration.labels('{}.{}'.format(info.parent_type.name, info.field_name)).observe(duration)
+        return timed_resolver
+
+    def wrap_middlewares(self, resolver):
+        def timed_middlewares(root, args, context, info):
+            self._local.resolver_duration = 0
+            start = clock()
+            try:
+                return resolver(root, args, context, info)
+            finally:
+                self.middleware_duration.observe(clock() - start - self._local.resolver_duration)
+        return timed_middlewares
+
+    def render(self):
+        return '\n'.join(metric.render() for metric in self.metrics) + '\n'
@@ -1,6 +1,10 @@
 from .base import MiddlewareManager
 from .camel_case import CamelCaseArgsMiddleware
+from .profiling import ProfilingMiddleware
+from .slow_operations import SlowOperationLog
+from .tracing import TracingMiddleware
 
 __all__ = [
-    'MiddlewareManager', 'CamelCaseArgsMiddleware'
+    'MiddlewareManager', 'CamelCaseArgsMiddleware', 'TracingMiddleware', 'SlowOperationLog',
+    'ProfilingMiddleware'
 ]
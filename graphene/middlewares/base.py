@@ -1,4 +1,5 @@
 from ..utils import promise_middleware
+from ..utils.awaitables import iscoroutinefunction, promise_coroutine_function
 
 MIDDLEWARE_RESOLVER_FUNCTION = 'resolve'
 
@@ -16,8 +17,16 @@ class MiddlewareManager(object):
         for middleware in self.middlewares:
             if not hasattr(middleware, MIDDLEWARE_RESOLVER_FUNCTION):
                 continue
-            yield getattr(middleware, MIDDLEWARE_RESOLVER_FUNCTION)
+            resolve = getattr(middleware, MIDDLEWARE_RESOLVER_FUNCTION)
+            if iscoroutinefunction(resolve):
+                # The next middleware gets a Promise, as from any other one
+                resolve = promise_coroutine_function(resolve)
+            yield resolve
 
     def wrap(self, resolver):
         middleware_resolvers = self.get_middleware_resolvers()
+        metrics = getattr(self.schema, 'metrics', None)
+        if metrics:
+            return metrics.wrap_middlewares(
+                promise_middleware(metrics.wrap_resolver(resolver), middleware_resolvers))
         return promise_middleware(resolver, middleware_resolvers)
@@ -0,0 +1,325 @@
+import cProfile
+import os
+import pstats
+import sys
+from collections import defaultdict
+from datetime import datetime
+from threading import Event, Thread, current_thread
+
+from ..utils.paths import PathTracker, format_path
+
+DEFAULT_INTERVAL = .001
+
+MODES = ('cprofile', 'sampling')
+
+
+def format_function(filename, line, name):
+    if filename == '~':
+        # The builtins
+        return name
+    return '{}:{}({})'.format(filename, line, name)
+
+
+def get_profile_name(request):
+    operation = request.operation
+    name = operation.name.value if operation and operation.name else 'anonymous'
+    return '{:%Y%m%d-%H%M%S-%f}-{}'.format(datetime.utcnow(), name)
+
+
+class Profile(object):
+    '''
+    A profile of the thread executing an operation. The middleware
+    tells it which field is being resolved, to annotate its frames with
+    the path of the field.
+    '''
+    extension = None
+
+    def __init__(self):
+        self.paths = PathTracker(indices=False)
+        # Calls of the resolvers by field path
+        self.counts = defaultdict(int)
+        self.path = None
+        self.started = False
+        self.finished = False
+
+    def start(self):
+        self.started = True
+
+    def stop(self):
+        self.finished = True
+        self.paths.clear()
+
+    def enter_field(self, path):
+        previous, self.path = self.path, path
+        return previous
+
+    def exit_field(self, previous):
+        self.path = previous
+
+    def summary(self, top):
+        raise NotImplementedError('summary is not implemented in {}'.format(self.__class__.__name__))
+
+    def save(self, filename):
+        raise NotImplementedError('save is not implemented in {}'.format(self.__class__.__name__))
+
+
+class CProfile(Profile):
+    '''
+    A deterministic profile, with a cProfile profiler for the resolvers
+    of every field path and another for the rest of the execution. The
+    functions called by the resolvers are named ``function [path]``.
+    '''
+    extension = '.prof'
+
+    def __init__(self):
+        super(CProfile, self).__init__()
+        self.profiler = self.active = cProfile.Profile()
+        self.fields = {}
+        self.field_times = {}
+        self._stats = None
+
+    def start(self):
+        super(CProfile, self).start()
+        self.profiler.enable()
+
+    def stop(self):
+        self.profiler.disable()
+        super(CProfile, self).stop()
+
+    def enter_field(self, path):
+        profiler = self.fields.get(path)
+        if profiler is None:
+            profiler = self.fields[path] = cProfile.Profile()
+        previous = self.active, super(CProfile, self).enter_field(path)
+        self.active.disable()
+        self.active = profiler
+        profiler.enable()
+        return previous
+
+    def exit_field(self, previous):
+        self.active.disable()
+        self.active, path = previous
+        self.active.enable()
+        super(CProfile, self).exit_field(path)
+
+    def get_stats(self):
+        if self._stats is None:
+            self._stats = pstats.Stats()
+            self._stats.add(self.load_stats(self.profiler))
+            for path, profiler in self.fields.items():
+                stats = self.load_stats(profiler, path)
+                self.field_times[path] = stats.total_tt
+                self._stats.add(stats)
+        return self._stats
+
+    def load_stats(self, profiler, path=None):
+        def annotate(function):
+            if path is None:
+                return function
+            filename, line, name = function
+            return filename, line, '{} [{}]'.format(name, path)
+
+        profiler.create_stats()
+        stats = pstats.Stats()
+        stats.stats = {
+            annotate(function): (cc, nc, tt, ct, {annotate(caller): value for caller, value in callers.items()})
+            for function, (cc, nc, tt, ct, callers) in profiler.stats.items()
+        }
+        stats.get_top_level_stats()
+        return stats
+
+    def summary(self, top):
+        stats = self.get_stats()
+        functions = sorted(stats.stats.items(), key=lambda item: item[1][2], reverse=True)[:top]
+        fields = sorted(self.field_times.items(), key=lambda item: item[1], reverse=True)[:top]
+        return {
+            'mode': 'cprofile',
+            'calls': stats.total_calls,
+            'time': stats.total_tt,
+            'fields': [{'path': path, 'count': self.counts[path], 'time': time} for path, time in fields],
+            'functions': [{
+                'function': format_function(*function),
+                'calls': nc,
+                'time': tt,
+                'cumulativeTime': ct,
+            } for function, (cc, nc, tt, ct, callers) in functions],
+        }
+
+    def save(self, filename):
+        self.get_stats().dump_stats(filename)
+
+
+class Sampler(Thread):
+
+    def __init__(self, profile, interval):
+        super(Sampler, self).__init__(name='graphene-profiler')
+        self.daemon = True
+        self.profile = profile
+        self.interval = interval
+        self.stopped = Event()
+
+    def run(self):
+        while not self.stopped.wait(self.interval):
+            self.profile.sample()
+
+
+class SamplingProfile(Profile):
+    '''
+    A statistical profile, that samples the stack of the thread every
+    ``interval`` seconds from another thread. The stacks are rooted in
+    the field path being resolved when they are sampled.
+    '''
+    extension = '.folded'
+
+    def __init__(self, interval=DEFAULT_INTERVAL):
+        super(SamplingProfile, self).__init__()
+        self.interval = interval
+        self.stacks = defaultdict(int)
+        self.thread_id = None
+        self._sampler = None
+
+    def start(self):
+        super(SamplingProfile, self).start()
+        self.thread_id = current_thread().ident
+        self._sampler = Sampler(self, self.interval)
+        self._sampler.start()
+
+    def stop(self):
+        self._sampler.stopped.set()
+        self._sampler.join()
+        super(SamplingProfile, self).stop()
+
+    def sample(self):
+        path = self.path
+        frame = sys._current_frames().get(self.thread_id)
+        stack = []
+        while frame is not None:
+            code = frame.f_code
+            stack.append(format_function(code.co_filename, code.co_firstlineno, code.co_name))
+            frame = frame.f_back
+        self.stacks[path, tuple(reversed(stack))] += 1
+
+    def get_stacks(self):
+        # Without the frames that called the execution, which all of
+        # the stacks share
+        stacks = [stack for _, stack in self.stacks]
+        common = 0
+        if stacks:
+            for frames in zip(*stacks):
+                if len(set(frames)) > 1:
+                    break
+                common += 1
+            common = min(common, min(len(stack) for stack in stacks) - 1)
+        return [(path, stack[common:], count) for (path, stack), count in self.stacks.items()]
+
+    def summary(self, top):
+        fields = defaultdict(int)
+        functions = defaultdict(int)
+        cumulative = defaultdict(int)
+        stacks = self.get_stacks()
+        for path, stack, count in stacks:
+            if path is not None:
+                fields[path] += count
+            functions[stack[-1]] += count
+            for function in set(stack):
+                cumulative[function] += count
+        return {
+            'mode': 'sampling',
+            'interval': self.interval,
+            'samples': sum(count for _, _, count in stacks),
+            'fields': [{
+                'path': path,
+                'count': self.counts[path],
+                'samples': samples,
+            } for path, samples in sorted(fields.items(), key=lambda item: item[1], reverse=True)[:top]],
+            'functions': [{
+                'function': function,
+                'samples': samples,
+                'cumulativeSamples': cumulative[function],
+            } for function, samples in sorted(functions.items(), key=lambda item: item[1], reverse=True)[:top]],
+        }
+
+    def save(self, filename):
+        # The collapsed stacks of flame graph tools
+        with open(filename, 'w') as f:
+            for path, stack, count in sorted(self.get_stacks(), key=lambda item: (item[0] or '', item[1])):
+                f.write('{} {}\n'.format(';'.join((path or '<execution>', ) + stack), count))
+
+
+class ProfilingMiddleware(object):
+    '''
+    Profiles the execution of the operations run with Schema.execute
+    (and GraphQLView) whose context has a truthy ``graphene_profile``
+    attribute, with cProfile or, when it (or ``mode``) is ``'sampling'``,
+    by sampling the stack every ``interval`` seconds.
+
+    The frames of the resolvers are annotated with the path of their
+    fields. A summary of the ``top`` fields and functions is added to
+    the ``profile`` entry of the response extensions (unless
+    ``summary=False``), and the whole profile is saved to ``directory``
+    when it is set: a pstats file for cProfile or collapsed stacks for
+    the sampling profiler.
+
+    It is an extension of the schema too. The profile of an operation is
+    kept in ``context.graphene_profiling``.
+    '''
+
+    def __init__(self, mode='cprofile', directory=None, summary=True, top=20, interval=DEFAULT_INTERVAL):
+        assert mode in MODES, 'Expected one of the modes {}'.format(MODES)
+        self.mode = mode
+        self.directory = directory
+        self.summary = summary
+        self.top = top
+        self.interval = interval
+
+    def create_profile(self, mode):
+        if mode == 'sampling':
+            return SamplingProfile(self.interval)
+        return CProfile()
+
+    def on_request_start(self, request):
+        mode = getattr(request.context_value, 'graphene_profile', None)
+        if not mode:
+            request.profile = None
+            return
+        request.profile = self.create_profile(mode if mode in MODES else self.mode)
+        try:
+            request.context_value.graphene_profiling = request.profile
+        except AttributeError:
+            pass
+
+    def on_execute(self, request):
+        if request.profile:
+            request.profile.start()
+
+    def on_result(self, request, result):
+        profile = request.profile
+        # The invalid operations are not executed
+        if not profile or not profile.started or profile.finished:
+            return
+        profile.stop()
+        summary = profile.summary(self.top) if self.summary else None
+        if self.directory:
+            filename = os.path.join(self.directory, get_profile_name(request) + profile.extension)
+            profile.save(filename)
+            if summary is not None:
+                summary['file'] = filename
+        if summary is not None:
+            from ..core.results import add_extension
+            return add_extension(result, 'profile', summary)
+
+    def resolve(self, next, root, args, context, info):
+        profile = getattr(context, 'graphene_profiling', None)
+        # Only while the profiler runs
+        if not isinstance(profile, Profile) or profile.finished:
+            return next(root, args, context, info)
+        paths = profile.paths
+        path = paths.get_path(root, info)
+        field_path = format_path(path)
+        profile.counts[field_path] += 1
+        previous = profile.enter_field(field_path)
+        try:
+            promise = next(root, args, context, info)
+        finally:
+            profile.exit_field(previous)
+        return promise.then(lambda value: paths.add_value(path, value, info))
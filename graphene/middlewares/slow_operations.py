@@ -0,0 +1,132 @@
+import logging
+import re
+
+from promise import Promise
+
+from ..metrics import clock
+from ..utils.paths import PathTracker, format_path
+
+logger = logging.getLogger('graphene.slow_operations')
+
+SENSITIVE_VARIABLES = re.compile(r'pass|secret|token|key|auth|credential|card|ssn', re.IGNORECASE)
+
+REDACTED = '[REDACTED]'
+
+
+def redact_variables(variables, pattern=SENSITIVE_VARIABLES):
+    if isinstance(variables, dict):
+        return {
+            name: REDACTED if pattern.search(name) else redact_variables(value, pattern)
+            for name, value in variables.items()
+        }
+    if isinstance(variables, (list, tuple)):
+        return [redact_variables(value, pattern) for value in variables]
+    return variables
+
+
+class OperationStats(object):
+    '''
+    The number of calls and the time spent in the resolvers of every
+    field path of an operation (like ``products.reviews.stars``, without
+    the list indices), counted in the resolvers without waiting for the
+    promises they return.
+    '''
+
+    def __init__(self):
+        self.fields = {}
+        self.finished = False
+        self.paths = PathTracker(indices=False)
+
+    def add_field(self, path, duration):
+        stats = self.fields.get(path)
+        if stats is None:
+            self.fields[path] = [1, duration]
+        else:
+            stats[0] += 1
+            stats[1] += duration
+
+    def finish(self):
+        self.finished = True
+        self.paths.clear()
+
+    def slowest_fields(self, top):
+        fields = sorted(self.fields.items(), key=lambda item: item[1][1], reverse=True)[:top]
+        return [{
+            'path': format_path(path),
+            'count': count,
+            'duration': duration,
+        } for path, (count, duration) in fields]
+
+
+class SlowOperationLog(object):
+    '''
+    Logs (to the ``graphene.slow_operations`` logger) the operations run
+    with Schema.execute that take more than ``threshold`` seconds, with
+    their name, the hash of their document, their variables (redacted
+    when their name matches ``sensitive_variables``), their duration and
+    the ``top`` field paths where most time was spent.
+
+    Only counters by field path are kept while the operations are
+    executed, the details are built for the slow ones. The stats of an
+    operation are kept in ``context.operation_stats``, the fields of
+    operations without a writable context are not counted.
+    '''
+
+    def __init__(self, threshold=1, top=10, sensitive_variables=SENSITIVE_VARIABLES, logger=logger):
+        self.threshold = threshold
+        self.top = top
+        if isinstance(sensitive_variables, (list, tuple)):
+            sensitive_variables = '|'.join(re.escape(name) for name in sensitive_variables)
+        if not hasattr(sensitive_variables, 'search'):
+            sensitive_variables = re.compile(sensitive_variables, re.IGNORECASE)
+        self.sensitive_variables = sensitive_variables
+        self.logger = logger
+
+    def on_request_start(self, request):
+        request.operation_stats = OperationStats()
+        try:
+            request.context_value.operation_stats = request.operation_stats
+        except AttributeError:
+            pass
+
+    def on_result(self, request, result):
+        stats = request.operation_stats
+        stats.finish()
+        duration = clock() - request.start
+        if duration >= self.threshold:
+            self.log(self.get_entry(request, stats, duration))
+
+    def get_entry(self, request, stats, duration):
+        from ..cache.responses import get_document_hash
+        operation = request.operation
+        return {
+            'operation_name': operation.name.value if operation and operation.name else None,
+            'document_hash': get_document_hash(request.document_ast) if request.document_ast else None,
+            'variables': redact_variables(request.variable_values or {}, self.sensitive_variables),
+            'duration': duration,
+            'fields': stats.slowest_fields(self.top),
+        }
+
+    def log(self, entry):
+        self.logger.warning(
+            'Slow operation %s (%s) took %.3fs, variables: %r, slowest fields: %s',
+            entry['operation_name'] or '<anonymous>', entry['document_hash'], entry['duration'],
+            entry['variables'], ', '.join('{path} ({count} calls, {duration:.3f}s)'.format(**field)
+                                          for field in entry['fields']),
+            extra={'slow_operation': entry})
+
+    def resolve(self, next, root, args, context, info):
+        stats = getattr(context, 'operation_stats', None)
+        # The fields resolved once the operation is logged are not counted
+        if not isinstance(stats, OperationStats) or stats.finished:
+            return next(root, args, context, info)
+        path = stats.paths.get_path(root, info)
+        start = clock()
+        try:
+            promise = next(root, args, context, info)
+        finally:
+            stats.add_field(path, clock() - start)
+        if promise.is_fulfilled:
+            value = stats.paths.add_value(path, promise.value, info)
+            return promise if value is promise.value else Promise.resolve(value)
+        return promise.then(lambda value: stats.paths.add_value(path, value, info))
@@ -0,0 +1,142 @@
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from threading import Lock
+
+from ..metrics import DEFAULT_BUCKETS, HistogramValue, clock
+from ..utils.paths import PathTracker, format_path
+
+
+def format_time(time):
+    return time.strftime('%Y-%m-%dT%H:%M:%S.%f')[:-3] + 'Z'
+
+
+class Trace(object):
+    '''
+    The timings of an operation: its phases and every resolved field.
+    '''
+
+    def __init__(self):
+        self.start_time = datetime.utcnow()
+        self.start = self.mark = clock()
+        self.end = None
+        self.phases = OrderedDict()
+        self.resolvers = []
+        self.paths = PathTracker()
+
+    def end_phase(self, name):
+        now = clock()
+        self.phases[name] = self.mark, now
+        self.mark = now
+
+    def add_resolver(self, path, info, start, end):
+        self.resolvers.append((path, info.parent_type, info.field_name, info.return_type, start, end))
+
+    def finish(self):
+        self.end = clock()
+        self.paths.clear()
+
+    def offset(self, time):
+        return int((time - self.start) * 1e9)
+
+    def format(self):
+        trace = OrderedDict()
+        trace['version'] = 1
+        trace['startTime'] = format_time(self.start_time)
+        trace['endTime'] = format_time(self.start_time + timedelta(seconds=self.end - self.start))
+        trace['duration'] = self.offset(self.end)
+        for name, (start, end) in self.phases.items():
+            trace[name] = OrderedDict([('startOffset', self.offset(start)), ('duration', int((end - start) * 1e9))])
+        execution = trace.setdefault('execution', OrderedDict())
+        execution['resolvers'] = [OrderedDict([
+            ('path', list(path)),
+            ('parentType', str(parent_type)),
+            ('fieldName', field_name),
+            ('returnType', str(return_type)),
+            ('startOffset', self.offset(start)),
+            ('duration', int((end - start) * 1e9)),
+        ]) for path, parent_type, field_name, return_type, start, end in self.resolvers]
+        return trace
+
+
+class TracingMiddleware(object):
+    '''
+    Times the phases of the operations run with Schema.execute and every
+    resolved field, and adds them to the ``tracing`` entry of the
+    response extensions in the Apollo tracing format (durations and
+    offsets in nanoseconds).
+
+    With ``aggregate=True`` the traces are not returned, their durations
+    are added to the histograms of every phase (``phases``) and field
+    path (``fields``, like ``products.reviews.stars``) instead.
+
+    It is an extension of the schema too, that times the phases. The
+    trace of an operation is kept in ``context.tracing``, the fields of
+    operations without a writable context are not traced.
+    '''
+
+    def __init__(self, aggregate=False, buckets=DEFAULT_BUCKETS):
+        self.aggregate = aggregate
+        self.buckets = buckets
+        self.phases = {}
+        self.fields = {}
+        self._lock = Lock()
+
+    def on_request_start(self, request):
+        request.trace = Trace()
+        try:
+            request.context_value.tracing = request.trace
+        except AttributeError:
+            pass
+
+    def on_parse(self, request):
+        request.trace.end_phase('parsing')
+
+    def on_validate(self, request):
+        request.trace.end_phase('validation')
+
+    def on_result(self, request, result):
+        trace = request.trace
+        if not result.invalid:
+            trace.end_phase('execution')
+        trace.finish()
+        if self.aggregate:
+            self.add_trace(trace)
+            return result
+        from ..core.results import add_extension
+        return add_extension(result, 'tracing', trace.format())
+
+    def add_trace(self, trace):
+        with self._lock:
+            for name, (start, end) in trace.phases.items():
+                self.get_histogram(self.phases, name).observe(end - start)
+            for path, _, _, _, start, end in trace.resolvers:
+                self.get_histogram(self.fields, format_path(path)).observe(end - start)
+
+    def get_histogram(self, histograms, key):
+        histogram = histograms.get(key)
+        if histogram is None:
+            histogram = histograms[key] = HistogramValue(self.buckets)
+        return histogram
+
+    def resolve(self, next, root, args, context, info):
+        trace = getattr(context, 'tracing', None)
+        # The patches of incremental results are executed after it ends
+        if not isinstance(trace, Trace) or trace.end is not None:
+            return next(root, args, context, info)
+        path = trace.paths.get_path(root, info)
+        start = clock()
+
+        def on_resolve(value):
+            trace.add_resolver(path, info, start, clock())
+            return trace.paths.add_value(path, value, info)
+
+        def on_reject(error):
+            trace.add_resolver(path, info, start, clock())
+            raise error
+
+        try:
+            promise = next(root, args, context, info)
+        except Exception:
+            trace.add_resolver(path, info, start, clock())
+            raise
+        return promise.then(on_resolve, on_reject)
@@ -15,7 +15,16 @@ from .connection import (
     Edge,
 )
 
+from .codecs import (
+    GlobalIDCodec,
+    Base64GlobalIDCodec,
+    CompactGlobalIDCodec,
+    InvalidGlobalID
+)
+
 from .utils import is_node
 
 __all__ = ['ConnectionField', 'NodeField', 'GlobalIDField', 'Node',
-           'PageInfo', 'Edge', 'Connection', 'ClientIDMutation', 'is_node']
+           'PageInfo', 'Edge', 'Connection', 'ClientIDMutation', 'is_node',
+           'GlobalIDCodec', 'Base64GlobalIDCodec', 'CompactGlobalIDCodec',
+           'InvalidGlobalID']
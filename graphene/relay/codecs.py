@@ -0,0 +1,149 @@
+import binascii
+from base64 import b64decode, b64encode, urlsafe_b64decode, urlsafe_b64encode
+
+import six
+
+
+class InvalidGlobalID(ValueError):
+    pass
+
+
+class GlobalIDCodec(object):
+    '''
+    Translates a type name and the id of an object of that type into the
+    opaque global ID exposed by Relay, and back.
+    '''
+    schema = None
+
+    def bind(self, schema):
+        self.schema = schema
+        return self
+
+    def types_changed(self):
+        '''
+        Called when types are registered in the schema.
+        '''
+
+    def encode(self, type_name, id):
+        raise NotImplementedError('encode is not implemented in {}'.format(self.__class__.__name__))
+
+    def decode(self, global_id):
+        raise NotImplementedError('decode is not implemented in {}'.format(self.__class__.__name__))
+
+    def encode_many(self, type_name, ids):
+        encode = self.encode
+        return [encode(type_name, id) for id in ids]
+
+    def decode_many(self, global_ids):
+        '''
+        Decodes a list of global IDs, returning None in place of the
+        IDs that are not valid.
+        '''
+        decoded = []
+        for global_id in global_ids:
+            try:
+                decoded.append(self.decode(global_id))
+            except InvalidGlobalID:
+                decoded.append(None)
+        return decoded
+
+
+def to_bytes(value):
+    if isinstance(value, six.binary_type):
+        return value
+    return six.text_type(value).encode('utf-8')
+
+
+class Base64GlobalIDCodec(GlobalIDCodec):
+    '''
+    The graphql-relay format: base64 of "TypeName:id".
+
+    Base64 works in blocks of three bytes, so the encoded form of the
+    largest prefix of "TypeName:" with a length multiple of three is
+    cached per type and only the rest is encoded for every id.
+    '''
+
+    def __init__(self):
+        self._prefixes = {}
+
+    def get_prefix(self, type_name):
+        prefix = self._prefixes.get(type_name)
+        if prefix is None:
+            raw = to_bytes(type_name) + b':'
+            split = len(raw) - len(raw) % 3
+            prefix = self._prefixes[type_name] = (b64encode(raw[:split]), raw[split:])
+        return prefix
+
+    def encode(self, type_name, id):
+        head, tail = self.get_prefix(type_name)
+        return (head + b64encode(tail + to_bytes(id))).decode('ascii')
+
+    def decode(self, global_id):
+        try:
+            type_name, id = b64decode(global_id).split(b':', 1)
+            return type_name.decode('utf-8'), id.decode('utf-8')
+        except (TypeError, ValueError, binascii.Error, UnicodeDecodeError):
+            raise InvalidGlobalID('Invalid global ID {!r}'.format(global_id))
+
+
+class CompactGlobalIDCodec(GlobalIDCodec):
+    '''
+    Encodes the type as a small integer tag instead of its name, using
+    unpadded urlsafe base64 of "tag:id".
+
+    Tags are assigned from the sorted type names of the schema unless an
+    explicit ``tags`` mapping (type name to int) is given. Pass ``tags``
+    if the IDs have to remain valid when types are added to the schema.
+    The tables are built once, and again when types are registered.
+    '''
+
+    def __init__(self, tags=None):
+        self.tags = tags
+        self._tags = None
+        self._names = None
+        self._prefixes = {}
+
+    def types_changed(self):
+        if self.tags is None:
+            self._tags = self._names = None
+
+    def build_tables(self):
+        tags = self.tags
+        if tags is None:
+            assert self.schema, 'The codec {} is not bound to any schema'.format(self)
+            # Building the GraphQL schema registers every reachable type
+            self.schema.schema
+            tags = {name: tag for tag, name in enumerate(sorted(self.schema.types))}
+        self._prefixes = {}
+        self._tags = {name: str(tag).encode('ascii') for name, tag in tags.items()}
+        self._names = {tag: name for name, tag in self._tags.items()}
+
+    def get_prefix(self, type_name):
+        if self._tags is None:
+            self.build_tables()
+        prefix = self._prefixes.get(type_name)
+        if prefix is None:
+            if type_name not in self._tags:
+                raise KeyError('Type {!r} has no tag in {}'.format(type_name, self))
+            prefix = self._prefixes[type_name] = self._tags[type_name] + b':'
+        return prefix
+
+    def encode(self, type_name, id):
+        encoded = urlsafe_b64encode(self.get_prefix(type_name) + to_bytes(id))
+        return encoded.rstrip(b'=').decode('ascii')
+
+    def decode(self, global_id):
+        if self._names is None:
+            self.build_tables()
+        try:
+            global_id = to_bytes(global_id)
+            tag, id = urlsafe_b64decode(global_id + b'=' * (-len(global_id) % 4)).split(b':', 1)
+            id = id.decode('utf-8')
+        except (TypeError, ValueError, binascii.Error, UnicodeDecodeError):
+            raise InvalidGlobalID('Invalid global ID {!r}'.format(global_id))
+        if tag not in self._names:
+            raise InvalidGlobalID('Invalid global ID {!r}'.format(global_id))
+        return self._names[tag], id
+
+
+default_codec = Base64GlobalIDCodec()
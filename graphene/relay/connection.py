@@ -44,6 +44,13 @@ class Edge(ObjectType):
             {'node_type': node, 'node': node_field})
 
 
+class EdgesField(Field):
+
+    def get_cost_multiplier(self, args):
+        # The edges are counted by the connection field
+        return 1
+
+
 class Connection(ObjectType):
     '''A connection to a list of items.'''
 
@@ -64,7 +71,7 @@ class Connection(ObjectType):
     @memoize
     def for_node(cls, node, edge_type=None):
         edge_type = edge_type or Edge.for_node(node)
-        edges = List(edge_type, description='Information to aid in pagination.')
+        edges = EdgesField(List(edge_type), description='Information to aid in pagination.')
         return type(
             '%s%s' % (node._meta.type_name, cls._meta.type_name),
             (cls,),
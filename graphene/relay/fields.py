@@ -1,11 +1,10 @@
 import six
 
-from graphql_relay.node.node import from_global_id
-
 from ..core.fields import Field
 from ..core.types.definitions import NonNull
 from ..core.types.scalars import ID, Int, String
 from ..utils.wrap_resolver_function import has_context, with_context
+from .codecs import InvalidGlobalID
 from .connection import Connection, Edge
 
 
@@ -45,6 +44,9 @@ class ConnectionField(Field):
     def from_list(self, connection_type, resolved, args, context, info):
         return connection_type.from_list(resolved, args, context, info)
 
+    def get_cost_multiplier(self, args):
+        return args.get('first') or args.get('last')
+
     def get_connection_type(self, node):
         return self.connection_type.for_node(node)
 
@@ -74,8 +76,8 @@ class NodeField(Field):
         from graphene.relay.utils import is_node
         schema = info.schema.graphene_schema
         try:
-            _type, _id = from_global_id(global_id)
-        except:
+            _type, _id = schema.global_id_codec.decode(global_id)
+        except InvalidGlobalID:
             return None
         object_type = schema.get_type(_type)
         if isinstance(self.field_object_type, six.string_types):
@@ -100,4 +102,4 @@ class GlobalIDField(Field):
         super(GlobalIDField, self).__init__(NonNull(ID()), *args, **kwargs)
 
     def resolver(self, instance, args, info):
-        return instance.to_global_id()
+        return instance.to_global_id(info.schema.graphene_schema.global_id_codec)
@@ -0,0 +1,139 @@
+from graphql_relay.node.node import from_global_id, to_global_id
+from pytest import raises
+
+import graphene
+from graphene import relay
+
+
+class MyNode(relay.Node):
+    name = graphene.String()
+
+    @classmethod
+    def get_node(cls, id, info):
+        return MyNode(id=id, name='mo')
+
+
+class Query(graphene.ObjectType):
+    my_node = relay.NodeField(MyNode)
+    node = relay.NodeField()
+
+
+def test_base64_codec_is_relay_compatible():
+    codec = relay.Base64GlobalIDCodec()
+    for type_name in ('A', 'AB', 'ABC', 'MyNode', u'N\xf6de'):
+        for id in (1, 'abc', u'\xe9', ''):
+            global_id = codec.encode(type_name, id)
+            assert global_id == to_global_id(type_name, str(id) if isinstance(id, int) else id)
+            assert codec.decode(global_id) == from_global_id(global_id)
+
+
+def test_base64_codec_invalid():
+    codec = relay.Base64GlobalIDCodec()
+    for global_id in ('badvalue', 'TXlUeXBl', None, 1):
+        with raises(relay.InvalidGlobalID):
+            codec.decode(global_id)
+
+
+def test_codec_many():
+    codec = relay.Base64GlobalIDCodec()
+    global_ids = codec.encode_many('MyNode', [1, 2])
+    assert global_ids == [codec.encode('MyNode', 1), codec.encode('MyNode', 2)]
+    assert codec.decode_many(global_ids + ['bad']) == [('MyNode', '1'), ('MyNode', '2'), None]
+
+
+def test_compact_codec_tags_from_schema():
+    schema = graphene.Schema(query=Query, global_id_codec=relay.CompactGlobalIDCodec())
+    codec = schema.global_id_codec
+    global_id = codec.encode('MyNode', 1)
+    assert len(global_id) < len(to_global_id('MyNode', '1'))
+    assert codec.decode(global_id) == ('MyNode', '1')
+
+
+def test_compact_codec_tables_built_once():
+    schema = graphene.Schema(query=Query, global_id_codec=relay.CompactGlobalIDCodec())
+    codec = schema.global_id_codec
+    codec.encode('MyNode', 1)
+    tags = codec._tags
+    with raises(relay.InvalidGlobalID):
+        codec.decode('OTk5OjE')
+    with raises(KeyError):
+        codec.encode('Unknown', 1)
+    assert codec._tags is tags
+
+    @schema.register
+    class Other(graphene.ObjectType):
+        name = graphene.String()
+
+    assert codec._tags is None
+    assert codec.decode(codec.encode('Other', 1)) == ('Other', '1')
+    assert codec.decode(codec.encode('MyNode', 1))[0] == 'MyNode'
+
+
+def test_compact_codec_explicit_tags():
+    codec = relay.CompactGlobalIDCodec(tags={'MyNode': 7})
+    assert codec.decode(codec.encode('MyNode', 'abc')) == ('MyNode', 'abc')
+    with raises(KeyError):
+        codec.encode('Other', 1)
+    with raises(relay.InvalidGlobalID):
+        codec.decode(relay.CompactGlobalIDCodec(tags={'Other': 8}).encode('Other', 1))
+
+
+def test_schema_default_codec():
+    schema = graphene.Schema(query=Query)
+    assert isinstance(schema.global_id_codec, relay.Base64GlobalIDCodec)
+    assert schema.global_id_codec.schema == schema
+
+
+def test_nodefield_with_compact_codec():
+    schema = graphene.Schema(query=Query, global_id_codec=relay.CompactGlobalIDCodec())
+    global_id = schema.global_id_codec.encode('MyNode', 1)
+    query = '''
+    query {
+      myNode(id: "%s") {
+        id
+        name
+      }
+      node(id: "%s") {
+        id
+      }
+      invalid: node(id: "%s") {
+        id
+      }
+    }
+    ''' % (global_id, global_id, to_global_id('MyNode', '1'))
+    result = schema.execute(query)
+    assert not result.errors
+    assert result.data == {
+        'myNode': {
+            'id': global_id,
+            'name': 'mo'
+        },
+        'node': {
+            'id': global_id
+        },
+        'invalid': None
+    }
+
+
+class LegacyNode(relay.Node):
+
+    @classmethod
+    def get_node(cls, id, info):
+        return LegacyNode(id=id)
+
+    def to_global_id(self):
+        return 'legacy-{}'.format(self.id)
+
+
+class LegacyQuery(graphene.ObjectType):
+    legacy = graphene.Field(LegacyNode)
+
+    def resolve_legacy(self, args, info):
+        return LegacyNode(id=1)
+
+
+def test_to_global_id_without_codec():
+    schema = graphene.Schema(query=LegacyQuery, global_id_codec=relay.CompactGlobalIDCodec())
+    result = schema.execute('{ legacy { id } }')
+    assert not result.errors
+    assert result.data == {'legacy': {'id': 'legacy-1'}}
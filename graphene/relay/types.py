@@ -4,8 +4,6 @@ from functools import wraps
 
 import six
 
-from graphql_relay.node.node import to_global_id
-
 from ..core.classtypes import InputObjectType, Interface, Mutation
 from ..core.classtypes.interface import InterfaceMeta
 from ..core.classtypes.mutation import MutationMeta
@@ -13,6 +11,7 @@ from ..core.types import String
 from ..core.types.argument import ArgumentsGroup
 from ..core.types.definitions import NonNull
 from ..utils.wrap_resolver_function import has_context, with_context
+from .codecs import default_codec
 from .fields import GlobalIDField
 
 
@@ -44,10 +43,23 @@ class NodeMeta(InterfaceMeta):
             node_func = wrapped_node
             setattr(cls, 'get_node', node_func)
 
+    def construct_to_global_id(cls):
+        to_global_id = cls.to_global_id
+        argspec = inspect.getargspec(to_global_id)
+        if len(argspec.args) > 1 or argspec.varargs:
+            return
+        # Written before the codecs, it keeps its own format
+
+        @wraps(to_global_id)
+        def wrapped_to_global_id(self, codec=default_codec):
+            return to_global_id(self)
+        setattr(cls, 'to_global_id', wrapped_to_global_id)
+
     def construct(cls, *args, **kwargs):
         cls = super(NodeMeta, cls).construct(*args, **kwargs)
         if not cls._meta.abstract:
             cls.construct_get_node()
+            cls.construct_to_global_id()
         return cls
 
 
@@ -59,12 +71,12 @@ class Node(six.with_metaclass(NodeMeta, Interface)):
         abstract = True
 
     @classmethod
-    def global_id(cls, id):
+    def global_id(cls, id, codec=default_codec):
         type_name = cls._meta.type_name
-        return to_global_id(type_name, id)
+        return codec.encode(type_name, id)
 
-    def to_global_id(self):
-        return self.global_id(self.id)
+    def to_global_id(self, codec=default_codec):
+        return self.global_id(self.id, codec)
 
 
 class MutationInputType(InputObjectType):
@@ -0,0 +1,4 @@
+from .brokers import BaseBroker, InMemoryBroker
+from .engine import SubscriptionEngine, SubscriptionStream
+
+__all__ = ['BaseBroker', 'InMemoryBroker', 'SubscriptionEngine', 'SubscriptionStream']
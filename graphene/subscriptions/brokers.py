@@ -0,0 +1,66 @@
+from collections import defaultdict
+from itertools import count
+from threading import Lock
+
+
+class BaseBroker(object):
+    '''
+    Interface of the pub/sub brokers that deliver the events of the
+    subscriptions.
+
+    ``subscribe(topic, callback)`` returns a token for ``unsubscribe``,
+    and ``callback(payload)`` has to be called for every payload
+    published in the topic, from any thread. External brokers (redis,
+    a message queue...) are plugged in by implementing the three
+    methods.
+    '''
+
+    def subscribe(self, topic, callback):
+        raise NotImplementedError('subscribe is not implemented in {}'.format(self.__class__.__name__))
+
+    def unsubscribe(self, token):
+        raise NotImplementedError('unsubscribe is not implemented in {}'.format(self.__class__.__name__))
+
+    def publish(self, topic, payload):
+        raise NotImplementedError('publish is not implemented in {}'.format(self.__class__.__name__))
+
+
+class InMemoryBroker(BaseBroker):
+    '''
+    In process broker, for tests and single node deployments. The
+    callbacks are called in the thread that publishes.
+    '''
+
+    def __init__(self):
+        self._topics = defaultdict(dict)
+        self._tokens = {}
+        self._counter = count()
+        self._lock = Lock()
+
+    def subscribe(self, topic, callback):
+        with self._lock:
+            token = next(self._counter)
+            self._topics[topic][token] = callback
+            self._tokens[token] = topic
+        return token
+
+    def unsubscribe(self, token):
+        with self._lock:
+            topic = self._tokens.pop(token, None)
+            callbacks = self._topics.get(topic)
+            if callbacks is None:
+                return
+            callbacks.pop(token, None)
+            if not callbacks:
+                del self._topics[topic]
+
+    def publish(self, topic, payload):
+        with self._lock:
+            callbacks = list(self._topics.get(topic, {}).values())
+        for callback in callbacks:
+            callback(payload)
+        return len(callbacks)
+
+    def topics(self):
+        with self._lock:
+            return list(self._topics)
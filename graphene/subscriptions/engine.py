@@ -0,0 +1,282 @@
+import hashlib
+from collections import OrderedDict, deque
+
+from graphql import Source, parse, validate
+from graphql.error import GraphQLError, format_error as format_graphql_error
+from graphql.execution import ExecutionResult
+from graphql.execution.values import get_argument_values
+from graphql.language import ast
+from graphql.utils.get_operation_ast import get_operation_ast
+from promise import Promise
+
+from ..cache.fields import freeze
+from ..cache.responses import get_document_hash
+from ..core.incremental import StopAsyncIteration
+from ..utils.awaitables import asyncio, future_from_promise
+from ..utils.proxy_snake_dict import ProxySnakeDict
+from .brokers import InMemoryBroker
+
+
+def format_error(error):
+    if isinstance(error, GraphQLError):
+        return format_graphql_error(error)
+    return {'message': str(error)}
+
+
+class SubscriptionStream(object):
+    '''
+    The payloads (JSON strings) of the events of a subscription, for
+    ``async for``. At most ``max_size`` payloads wait for the
+    subscriber: when it falls behind, the oldest ones are dropped or,
+    with ``overflow='close'``, the stream is closed.
+    '''
+
+    def __init__(self, group, max_size, overflow, loop):
+        self.group = group
+        self.max_size = max_size
+        self.overflow = overflow
+        self.loop = loop
+        self.closed = False
+        self.dropped = 0
+        self._payloads = deque()
+        self._waiter = None
+
+    def __aiter__(self):
+        return self
+
+    def __anext__(self):
+        future = asyncio.Future(loop=self.loop)
+        if self._payloads:
+            future.set_result(self._payloads.popleft())
+        elif self.closed:
+            future.set_exception(StopAsyncIteration())
+        else:
+            self._waiter = future
+        return future
+
+    def __len__(self):
+        return len(self._payloads)
+
+    def push(self, payload):
+        if self.closed:
+            return
+        waiter, self._waiter = self._waiter, None
+        if waiter and not waiter.done():
+            waiter.set_result(payload)
+            return
+        if len(self._payloads) >= self.max_size:
+            if self.overflow == 'close':
+                self.close()
+                return
+            self._payloads.popleft()
+            self.dropped += 1
+        self._payloads.append(payload)
+
+    def close(self):
+        if self.closed:
+            return
+        self.closed = True
+        waiter, self._waiter = self._waiter, None
+        if waiter and not waiter.done():
+            waiter.set_exception(StopAsyncIteration())
+        if self.group:
+            self.group.remove(self)
+
+
+class SubscriptionGroup(object):
+    '''
+    The subscribers of the same selection in the same topic and scope.
+    Every event of the topic is executed once for all of them, with the
+    context of the first one, and the same payload is pushed to all of
+    them.
+    '''
+
+    def __init__(self, engine, key, topic, document_ast, operation_name, variable_values, context_value):
+        self.engine = engine
+        self.key = key
+        self.topic = topic
+        self.document_ast = document_ast
+        self.operation_name = operation_name
+        self.variable_values = variable_values
+        self.context_value = context_value
+        self.streams = []
+        self.running = False
+        self._events = deque(maxlen=engine.max_pending_events)
+        self._token = engine.broker.subscribe(topic, self.publish)
+
+    def add(self, stream):
+        self.streams.append(stream)
+
+    def remove(self, stream):
+        if stream in self.streams:
+            self.streams.remove(stream)
+        if not self.streams:
+            self.close()
+
+    def close(self):
+        self.engine.broker.unsubscribe(self._token)
+        if self.engine.groups.get(self.key) is self:
+            del self.engine.groups[self.key]
+        self._events.clear()
+        for stream in list(self.streams):
+            stream.close()
+
+    def publish(self, event):
+        # Called by the broker, maybe in another thread
+        self.engine.loop.call_soon_threadsafe(self.add_event, event)
+
+    def add_event(self, event):
+        if len(self._events) == self._events.maxlen:
+            self.engine.dropped_events += 1
+        self._events.append(event)
+        if not self.running:
+            self.execute_next()
+
+    def execute_next(self):
+        # Events are executed one at a time and in order
+        if not self._events or not self.streams:
+            self.running = False
+            return
+        self.running = True
+        event = self._events.popleft()
+        self.engine.executions += 1
+        try:
+            result = self.engine.schema.execute_document(
+                self.document_ast,
+                root_value=event,
+                variable_values=self.variable_values,
+                context_value=self.context_value,
+                operation_name=self.operation_name,
+                return_promise=True
+            )
+        except Exception as e:
+            # Delivered as the payload of the event, like the rejections
+            result = Promise.reject(e)
+        future_from_promise(result, self.engine.loop).add_done_callback(self.deliver)
+
+    def deliver(self, future):
+        if future.exception() is not None:
+            result = ExecutionResult(errors=[future.exception()])
+        else:
+            result = future.result()
+        payload = self.engine.encode(result, self.document_ast, self.operation_name)
+        for stream in list(self.streams):
+            stream.push(payload)
+        self.engine.delivered += len(self.streams)
+        self.execute_next()
+
+
+class SubscriptionEngine(object):
+    '''
+    Delivers the events of the subscription operations of a schema.
+
+    The root field of a subscription listens to a topic of the
+    ``broker``: ``Field(..., topic=...)`` with a string or a function of
+    the arguments and the context, or the name of the field. Every
+    event published in the topic is executed with the event as root
+    value.
+
+    Subscriptions with the same document, operation name, variables,
+    topic and context share one execution per event. With a ``scope``,
+    the subscriptions with the same ``scope(context)`` share it instead,
+    with the context of the first one: give one that tells apart the
+    contexts the result depends on (like the user), or
+    ``lambda context: None`` when it does not depend on them. Up to ``max_pending_events`` events wait to be executed
+    and up to ``max_queue_size`` payloads wait for every subscriber,
+    the oldest ones are dropped first.
+
+    The engine has to be used from the thread of its event loop, events
+    can be published from any thread.
+    '''
+
+    def __init__(self, schema, broker=None, scope=None, max_queue_size=100, overflow='drop',
+                 max_pending_events=100, loop=None):
+        assert asyncio, 'Subscriptions require asyncio'
+        assert overflow in ('drop', 'close'), 'overflow has to be "drop" or "close", not {!r}'.format(overflow)
+        self.schema = schema
+        self.broker = broker or InMemoryBroker()
+        self.scope = scope
+        self.max_queue_size = max_queue_size
+        self.overflow = overflow
+        self.max_pending_events = max_pending_events
+        self.loop = loop or asyncio.get_event_loop()
+        self.groups = {}
+        self.executions = 0
+        self.delivered = 0
+        self.dropped_events = 0
+
+    def subscribe(self, request_string, variable_values=None, context_value=None, operation_name=None):
+        '''
+        Returns the SubscriptionStream of the payloads of a subscription
+        operation. Invalid operations get a stream with just their
+        errors.
+        '''
+        try:
+            document_ast = parse(Source(request_string, 'GraphQL request'))
+            errors = validate(self.schema.schema, document_ast)
+        except Exception as e:
+            errors = [e]
+        if errors:
+            return self.get_error_stream(errors)
+        operation = get_operation_ast(document_ast, operation_name)
+        if not operation or operation.operation != 'subscription':
+            return self.get_error_stream([GraphQLError('Only subscription operations can be subscribed.')])
+        try:
+            topic = self.get_topic(operation, variable_values, context_value)
+        except Exception as e:
+            return self.get_error_stream([e])
+
+        key = self.get_key(document_ast, operation_name, variable_values, context_value, topic)
+        group = self.groups.get(key)
+        if group is None:
+            group = self.groups[key] = SubscriptionGroup(
+                self, key, topic, document_ast, operation_name, variable_values, context_value)
+        stream = SubscriptionStream(group, self.max_queue_size, self.overflow, self.loop)
+        group.add(stream)
+        return stream
+
+    def get_topic(self, operation, variable_values, context_value):
+        type = self.schema.schema.get_subscription_type()
+        field_ast = operation.selection_set.selections[0]
+        assert isinstance(field_ast, ast.Field), 'The root field of subscriptions can not be in a fragment'
+        field_def = type.get_fields().get(field_ast.name.value)
+        if not field_def:
+            # Not caught by the validation of subscriptions in graphql-core
+            raise GraphQLError('Cannot query field "{}" on type "{}".'.format(field_ast.name.value, type), [field_ast])
+        field = self.schema.get_field(type, field_ast.name.value)
+        topic = getattr(field, 'topic', None)
+        if topic is None:
+            return field.attname if field else field_ast.name.value
+        if callable(topic):
+            args = get_argument_values(field_def.args, field_ast.arguments, variable_values or {})
+            if self.schema.auto_camelcase:
+                args = ProxySnakeDict(args)
+            topic = topic(args, context_value)
+        return topic
+
+    def get_key(self, document_ast, operation_name, variable_values, context_value, topic):
+        if self.scope:
+            scope = self.scope(context_value)
+        else:
+            # The group keeps the context, so its id is not reused
+            scope = 'context', id(context_value)
+        key = repr((operation_name, freeze(variable_values or {}), topic, scope))
+        return get_document_hash(document_ast), hashlib.sha1(key.encode('utf-8')).hexdigest()
+
+    def get_error_stream(self, errors):
+        stream = SubscriptionStream(None, 1, self.overflow, self.loop)
+        stream.push(self.encode(ExecutionResult(errors=errors, invalid=True)))
+        stream.close()
+        return stream
+
+    def encode(self, result, document_ast=None, operation_name=None):
+        response = OrderedDict()
+        if result.errors:
+            response['errors'] = [format_error(error) for error in result.errors]
+        if not result.invalid:
+            response['data'] = result.data
+        return self.schema.response_encoder.encode(response, document_ast, operation_name)
+
+    def close(self):
+        for group in list(self.groups.values()):
+            group.close()
@@ -0,0 +1,15 @@
+from ..brokers import InMemoryBroker
+
+
+def test_in_memory_broker():
+    broker = InMemoryBroker()
+    received = []
+    first = broker.subscribe('a', lambda payload: received.append(('first', payload)))
+    broker.subscribe('a', lambda payload: received.append(('second', payload)))
+    broker.subscribe('b', lambda payload: received.append(('b', payload)))
+    assert broker.publish('a', 1) == 2
+    assert broker.publish('c', 2) == 0
+    broker.unsubscribe(first)
+    broker.publish('a', 3)
+    assert received == [('first', 1), ('second', 1), ('second', 3)]
+    assert sorted(broker.topics()) == ['a', 'b']
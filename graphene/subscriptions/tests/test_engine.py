@@ -0,0 +1,167 @@
+import json
+from threading import Thread
+
+import pytest
+
+import graphene
+from graphene.core.cost import QueryCostAnalyzer
+
+from ...core.incremental import StopAsyncIteration
+from ..brokers import InMemoryBroker
+
+asyncio = pytest.importorskip('asyncio')
+
+from ..engine import SubscriptionEngine  # noqa
+
+
+class Message(graphene.ObjectType):
+    channel = graphene.String()
+    text = graphene.String()
+
+
+class Query(graphene.ObjectType):
+    base = graphene.String()
+
+
+class Subscription(graphene.ObjectType):
+    message = graphene.Field(
+        Message,
+        channel=graphene.String(),
+        topic=lambda args, context: 'messages:{}'.format(args.get('channel'))
+    )
+    count = graphene.Int()
+    user = graphene.String()
+
+    def resolve_message(self, args, info):
+        executed.append(self._root)
+        return Message(channel=args.get('channel'), text=self._root)
+
+    def resolve_count(self, args, info):
+        return self._root
+
+    @graphene.with_context
+    def resolve_user(self, args, context, info):
+        return context['user']
+
+
+schema = graphene.Schema(query=Query, subscription=Subscription)
+executed = []
+
+MESSAGES = '''
+subscription Messages($channel: String) { message(channel: $channel) { channel text } }
+'''
+
+
+@pytest.fixture
+def loop():
+    loop = asyncio.new_event_loop()
+    yield loop
+    loop.close()
+
+
+def setup_function(function):
+    del executed[:]
+
+
+def next_payload(loop, stream):
+    return json.loads(loop.run_until_complete(asyncio.wait_for(stream.__anext__(), 1, loop=loop)))
+
+
+def test_fan_out(loop):
+    broker = InMemoryBroker()
+    engine = SubscriptionEngine(schema, broker, loop=loop)
+    streams = [engine.subscribe(MESSAGES, {'channel': 'news'}) for _ in range(3)]
+    other = engine.subscribe(MESSAGES, {'channel': 'sports'})
+    assert len(engine.groups) == 2
+    assert sorted(broker.topics()) == ['messages:news', 'messages:sports']
+
+    broker.publish('messages:news', 'hello')
+    payloads = [next_payload(loop, stream) for stream in streams]
+    assert payloads == [{'data': {'message': {'channel': 'news', 'text': 'hello'}}}] * 3
+    assert executed == ['hello']
+    assert (engine.executions, engine.delivered) == (1, 3)
+    assert len(other) == 0
+
+    Thread(target=broker.publish, args=('messages:sports', 'goal')).start()
+    assert next_payload(loop, other)['data']['message']['text'] == 'goal'
+
+
+def test_unsubscribe(loop):
+    broker = InMemoryBroker()
+    engine = SubscriptionEngine(schema, broker, loop=loop)
+    first = engine.subscribe('subscription { count }')
+    second = engine.subscribe('subscription { count }')
+    assert broker.topics() == ['count']
+    first.close()
+    broker.publish('count', 1)
+    assert next_payload(loop, second) == {'data': {'count': 1}}
+    second.close()
+    assert engine.groups == {}
+    assert broker.topics() == []
+    with pytest.raises(StopAsyncIteration):
+        loop.run_until_complete(second.__anext__())
+
+
+def test_bounded_queues(loop):
+    broker = InMemoryBroker()
+    engine = SubscriptionEngine(schema, broker, max_queue_size=2, loop=loop)
+    slow = engine.subscribe('subscription { count }')
+    engine.overflow = 'close'
+    closing = engine.subscribe('subscription { count }')
+    for count in range(5):
+        broker.publish('count', count)
+    loop.run_until_complete(asyncio.sleep(0.01, loop=loop))
+    assert engine.executions == 5
+    assert slow.dropped == 3
+    assert [next_payload(loop, slow)['data']['count'] for _ in range(2)] == [3, 4]
+    assert closing.closed
+    assert [next_payload(loop, closing)['data']['count'] for _ in range(2)] == [0, 1]
+    with pytest.raises(StopAsyncIteration):
+        loop.run_until_complete(closing.__anext__())
+
+
+def test_scope(loop):
+    engine = SubscriptionEngine(schema, loop=loop, scope=lambda context: context['user'])
+    alice = engine.subscribe('subscription { user }', context_value={'user': 'alice'})
+    bob = engine.subscribe('subscription { user }', context_value={'user': 'bob'})
+    engine.broker.publish('user', None)
+    assert next_payload(loop, alice) == {'data': {'user': 'alice'}}
+    assert next_payload(loop, bob) == {'data': {'user': 'bob'}}
+
+
+def test_context_not_shared_by_default(loop):
+    engine = SubscriptionEngine(schema, loop=loop)
+    alice = engine.subscribe('subscription { user }', context_value={'user': 'alice'})
+    bob = engine.subscribe('subscription { user }', context_value={'user': 'bob'})
+    assert len(engine.groups) == 2
+    engine.broker.publish('user', None)
+    assert next_payload(loop, alice) == {'data': {'user': 'alice'}}
+    assert next_payload(loop, bob) == {'data': {'user': 'bob'}}
+
+    shared = SubscriptionEngine(schema, loop=loop, scope=lambda context: None)
+    shared.subscribe('subscription { count }', context_value={})
+    shared.subscribe('subscription { count }', context_value={})
+    assert len(shared.groups) == 1
+
+
+def test_execution_errors(loop):
+    # The cost analysis raises before the execution starts
+    costly_schema = graphene.Schema(
+        query=Query, subscription=Subscription, cost_analyzer=QueryCostAnalyzer(max_depth=1))
+    engine = SubscriptionEngine(costly_schema, loop=loop)
+    stream = engine.subscribe(MESSAGES, {'channel': 'news'})
+    for text in ('first', 'second'):
+        engine.broker.publish('messages:news', text)
+        payload = next_payload(loop, stream)
+        assert payload['errors'][0]['message'] == 'Query depth 2 exceeds the maximum depth of 1.'
+    assert executed == []
+
+
+def test_invalid_subscriptions(loop):
+    engine = SubscriptionEngine(schema, loop=loop)
+    stream = engine.subscribe('subscription { unknown }')
+    assert next_payload(loop, stream)['errors'][0]['message'] == 'Cannot query field "unknown" on type "Subscription".'
+    stream = engine.subscribe('{ base }')
+    assert next_payload(loop, stream) == {'errors': [{'message': 'Only subscription operations can be subscribed.'}]}
+    with pytest.raises(StopAsyncIteration):
+        loop.run_until_complete(stream.__anext__())
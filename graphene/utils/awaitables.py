@@ -0,0 +1,143 @@
+from contextlib import contextmanager
+from functools import wraps
+from threading import local
+
+from promise import Promise, is_thenable
+
+try:
+    import asyncio
+except ImportError:
+    asyncio = None
+
+try:
+    from concurrent.futures import CancelledError
+except ImportError:
+    class CancelledError(Exception):
+        pass
+
+
+_state = local()
+
+
+def iscoroutine(value):
+    return asyncio is not None and asyncio.iscoroutine(value)
+
+
+def iscoroutinefunction(func):
+    return asyncio is not None and asyncio.iscoroutinefunction(func)
+
+
+def promise_from_future(future):
+    '''
+    Returns a Promise for the result of an asyncio or concurrent.futures
+    future.
+    '''
+    def executor(resolve, reject):
+        def on_done(future):
+            if future.cancelled():
+                reject(CancelledError())
+            elif future.exception() is not None:
+                reject(future.exception())
+            else:
+                resolve(future.result())
+        future.add_done_callback(on_done)
+    return Promise(executor)
+
+
+@contextmanager
+def awaiting_in(loop, threadsafe=False):
+    '''
+    Awaits the coroutines of the resolvers called in the block in
+    ``loop``, which is running or runs once the block ends (see
+    Schema.execute_async). Blocks run in other threads than the one of
+    the loop have to be ``threadsafe``.
+    '''
+    previous = getattr(_state, 'awaiting', None)
+    _state.awaiting = loop, threadsafe
+    try:
+        yield
+    finally:
+        _state.awaiting = previous
+
+
+def get_awaiting_loop():
+    awaiting = getattr(_state, 'awaiting', None)
+    if awaiting is not None:
+        return awaiting[0]
+    try:
+        loop = asyncio.get_event_loop()
+    except RuntimeError:
+        # Threads other than the main one have no loop by default
+        return None
+    if loop.is_running():
+        return loop
+
+
+def promise_from_awaitable(awaitable):
+    '''
+    Schedules a coroutine (or future) in the current event loop and
+    returns a Promise for its result. The loop has to be running, or
+    to be run after the execution (as in Schema.execute_async), for the
+    promise to be resolved.
+    '''
+    loop = get_awaiting_loop()
+    if loop is None:
+        if iscoroutine(awaitable):
+            # Not awaited, without the warning
+            awaitable.close()
+        raise RuntimeError(
+            'Coroutines can only be awaited in an event loop, '
+            'execute the operation with Schema.execute_async.')
+    awaiting = getattr(_state, 'awaiting', None)
+    if awaiting and awaiting[1]:
+        return promise_from_awaitable_threadsafe(awaitable, loop)
+    return promise_from_future(asyncio.ensure_future(awaitable, loop=loop))
+
+
+def promise_from_awaitable_threadsafe(awaitable, loop):
+    def executor(resolve, reject):
+        def schedule():
+            promise_from_future(asyncio.ensure_future(awaitable, loop=loop)).then(resolve, reject)
+        loop.call_soon_threadsafe(schedule)
+    return Promise(executor)
+
+
+def call_awaiting_in(loop, fn, *args):
+    with awaiting_in(loop, threadsafe=True):
+        return fn(*args)
+
+
+def future_from_promise(value, loop=None):
+    '''
+    Returns an asyncio future for a Promise (or plain value), that can be
+    awaited in ``loop``. The promise can be resolved in any thread.
+    '''
+    loop = loop or asyncio.get_event_loop()
+    future = asyncio.Future(loop=loop)
+    if not is_thenable(value):
+        future.set_result(value)
+        return future
+
+    def set_result(result):
+        if not future.done():
+            future.set_result(result)
+
+    def set_exception(error):
+        if not future.done():
+            future.set_exception(error)
+
+    Promise.resolve(value).then(
+        lambda result: loop.call_soon_threadsafe(set_result, result),
+        lambda error: loop.call_soon_threadsafe(set_exception, error)
+    )
+    return future
+
+
+def promise_coroutine_function(func):
+    '''
+    Makes a coroutine function return a Promise instead of a coroutine.
+    '''
+    @wraps(func)
+    def inner(*args, **kwargs):
+        return promise_from_awaitable(func(*args, **kwargs))
+    return inner
@@ -0,0 +1,60 @@
+from graphql.type import (GraphQLEnumType, GraphQLList, GraphQLNonNull,
+                          GraphQLScalarType)
+from graphql.type.definition import get_named_type
+
+from .selections import get_response_key
+
+
+def is_list_type(type):
+    if isinstance(type, GraphQLNonNull):
+        type = type.of_type
+    return isinstance(type, GraphQLList)
+
+
+def is_leaf_type(type):
+    return isinstance(get_named_type(type), (GraphQLScalarType, GraphQLEnumType))
+
+
+def format_path(path):
+    return '.'.join(key for key in path if not isinstance(key, int))
+
+
+class PathTracker(object):
+    '''
+    Rebuilds the response paths of the resolved fields (tuples of
+    response keys and, with ``indices``, of list indices).
+
+    graphql-core does not give the path of the fields to the resolvers,
+    so it is rebuilt from the values returned by the parents, which are
+    the roots of their children. The values are kept until ``clear()``,
+    so their ids are not reused.
+    '''
+
+    def __init__(self, indices=True):
+        self.indices = indices
+        self._paths = {}
+
+    def get_path(self, root, info):
+        key = get_response_key(info.field_asts[0])
+        parent = self._paths.get(id(root))
+        if parent and parent[0] is root:
+            return parent[1] + (key, )
+        return key,
+
+    def add_value(self, path, value, info):
+        '''
+        Keeps the paths of the roots of the children of a field, returning
+        its value (iterables of list fields are returned as lists).
+        '''
+        if value is None or is_leaf_type(info.return_type):
+            return value
+        if is_list_type(info.return_type):
+            value = value if isinstance(value, (list, tuple)) else list(value)
+            for index, item in enumerate(value):
+                self._paths[id(item)] = item, (path + (index, ) if self.indices else path)
+        else:
+            self._paths[id(value)] = value, path
+        return value
+
+    def clear(self):
+        self._paths = {}
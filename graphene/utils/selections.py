@@ -0,0 +1,15 @@
+from graphql.language import ast
+
+
+def get_fragments(document_ast):
+    '''
+    Returns the fragment definitions of a document by name.
+    '''
+    return {
+        definition.name.value: definition for definition in document_ast.definitions
+        if isinstance(definition, ast.FragmentDefinition)
+    }
+
+
+def get_response_key(field_ast):
+    return (field_ast.alias or field_ast.name).value
@@ -1,5 +1,7 @@
 from functools import wraps
 
+from .awaitables import iscoroutine, promise_from_awaitable
+
 
 def with_context(func):
     setattr(func, 'with_context', 'context')
@@ -14,7 +16,12 @@ def wrap_resolver_function(func):
     @wraps(func)
     def inner(self, args, context, info):
         if has_context(func):
-            return func(self, args, context, info)
-        # For old compatibility
-        return func(self, args, info)
+            result = func(self, args, context, info)
+        else:
+            # For old compatibility
+            result = func(self, args, info)
+        if iscoroutine(result):
+            # async def resolvers run in the event loop
+            return promise_from_awaitable(result)
+        return result
     return inner